@@ -3,6 +3,13 @@ from database.repository import content_repository
 import json
 
 
+# 채널 표시 이름
+CHANNEL_LABELS = {
+    "instagram": "📸 인스타그램",
+    "blog": "📝 블로그",
+    "email": "📧 이메일"
+}
+
 def render_sidebar():
     """사이드바 렌더링 - 입력 폼 및 히스토리"""
     
@@ -48,19 +55,30 @@ def render_input_form():
     
     st.subheader("마케팅 설정")
     
+    # 멀티 채널 모드
+    multi_channel = st.checkbox(
+        "📢 여러 채널 동시 생성",
+        value=st.session_state.get("multi_channel", False),
+        help="전략을 한 번만 수립하고, 선택한 채널별 콘텐츠를 병렬로 생성합니다."
+    )
+    
     # 채널 선택
-    channel = st.selectbox(
-        "마케팅 채널 *",
-        options=["instagram", "blog", "email"],
-        format_func=lambda x: {
-            "instagram": "📸 인스타그램",
-            "blog": "📝 블로그",
-            "email": "📧 이메일"
-        }[x],
-        index=["instagram", "blog", "email"].index(
-            st.session_state.get("channel", "instagram")
+    channel = st.session_state.get("channel", "instagram")
+    channels = []
+    if multi_channel:
+        channels = st.multiselect(
+            "마케팅 채널 * (2개 이상)",
+            options=list(CHANNEL_LABELS),
+            format_func=lambda x: CHANNEL_LABELS[x],
+            default=st.session_state.get("channels") or list(CHANNEL_LABELS)
+        )
+    else:
+        channel = st.selectbox(
+            "마케팅 채널 *",
+            options=list(CHANNEL_LABELS),
+            format_func=lambda x: CHANNEL_LABELS[x],
+            index=list(CHANNEL_LABELS).index(channel)
         )
-    )
     
     # 톤앤매너
     tone = st.selectbox(
@@ -78,6 +96,13 @@ def render_input_form():
         help="최신 마케팅 트렌드와 채널별 모범 사례를 검색하여 더 효과적인 콘텐츠를 생성합니다."
     )
     
+    # 전략 재사용
+    reuse_strategy = st.checkbox(
+        "♻️ 저장된 전략 재사용",
+        value=st.session_state.get("reuse_strategy", False),
+        help="비즈니스명, 특징, 타겟 고객, 채널이 같으면 이전에 수립한 전략을 재사용합니다. (톤만 바꾸거나 초안을 다시 받을 때)"
+    )
+    
     st.divider()
     
     # 생성 버튼
@@ -87,15 +112,23 @@ def render_input_form():
             st.error("모든 필수 항목(*)을 입력해주세요.")
             return
         
+        if multi_channel and len(channels) < 2:
+            st.error("여러 채널 동시 생성은 채널을 2개 이상 선택해주세요.")
+            return
+        
         # 세션 상태 업데이트
         st.session_state.business_name = business_name
         st.session_state.business_features = business_features
         st.session_state.target_customer = target_customer
         st.session_state.channel = channel
+        st.session_state.multi_channel = multi_channel
+        st.session_state.channels = channels
         st.session_state.tone = tone
         st.session_state.enable_rag = enable_rag
+        st.session_state.reuse_strategy = reuse_strategy
         st.session_state.app_mode = "generating"
         st.session_state.viewing_history = False
+        st.session_state.resume = None
         
         st.rerun()
 
@@ -130,6 +163,8 @@ def render_history():
             st.write(f"**타겟 고객:** {history.target_customer}")
             st.write(f"**채널:** {history.channel}")
             st.write(f"**톤:** {history.tone}")
+            if history.group_id:
+                st.caption("🔗 여러 채널 동시 생성")
             
             if st.button("이 콘텐츠 보기", key=f"view_{history.id}"):
                 # 히스토리 로드
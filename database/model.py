@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text
+from sqlalchemy import Column, Float, Integer, String, Text
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -18,3 +18,42 @@ class ContentHistory(Base):
     final_content = Column(Text, nullable=False)
     trend_docs = Column(Text, nullable=True)  # JSON string
     best_practice_docs = Column(Text, nullable=True)  # JSON string
+    group_id = Column(String, nullable=True)  # 멀티 채널로 함께 생성된 레코드 묶음
+    business_features = Column(Text, nullable=True)  # 전략 캐시 키 (이전 레코드는 없음)
+
+
+class LLMResponseCache(Base):
+    """LLM 응답 캐시 테이블 (정확히 같은 요청에 대한 응답 재사용)"""
+    __tablename__ = "llm_response_cache"
+    
+    key = Column(String, primary_key=True)  # 배포 + 온도 + 메시지 해시
+    deployment = Column(String, nullable=False)
+    response = Column(Text, nullable=False)
+    latency_ms = Column(Float, nullable=False)  # 원래 생성에 걸린 시간
+    created_at = Column(Float, nullable=False)
+    last_used = Column(Float, nullable=False)
+    hits = Column(Integer, nullable=False, default=0)
+
+
+class StrategyCache(Base):
+    """전략 캐시 테이블 (같은 비즈니스 브리프의 전략 재사용)"""
+    __tablename__ = "strategy_cache"
+    
+    key = Column(String, primary_key=True)  # 정규화한 브리프 해시
+    business_name = Column(String, nullable=False)  # 무효화용
+    channel = Column(String, nullable=False)
+    strategy = Column(Text, nullable=False)
+    latency_ms = Column(Float, nullable=True)  # 원래 생성에 걸린 시간 (히스토리에서 가져온 항목은 없음)
+    created_at = Column(Float, nullable=False)
+    hits = Column(Integer, nullable=False, default=0)
+
+
+class RunCheckpoint(Base):
+    """그래프 실행 노드별 상태 체크포인트 (실패 시 이어서 실행, 초안 재생성)"""
+    __tablename__ = "run_checkpoints"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)  # 저장 순서
+    run_id = Column(String, nullable=False, index=True)
+    node = Column(String, nullable=False)  # 완료된 노드
+    state = Column(Text, nullable=False)  # 노드 완료 후 ContentState (JSON string)
+    created_at = Column(Float, nullable=False)
@@ -1,8 +1,9 @@
 import json
+import time
 from datetime import datetime
-from database.model import ContentHistory
+from database.model import ContentHistory, LLMResponseCache, RunCheckpoint, StrategyCache
 from database.session import db_session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class ContentRepository:
@@ -17,11 +18,17 @@ class ContentRepository:
         strategy: str,
         final_content: str,
         trend_docs: List[str] = None,
-        best_practice_docs: List[str] = None
+        best_practice_docs: List[str] = None,
+        group_id: Optional[str] = None,
+        business_features: Optional[str] = None
     ) -> int:
         """
         콘텐츠 생성 결과 저장
         
+        Args:
+            group_id: 멀티 채널로 함께 생성된 레코드 묶음 ID
+            business_features: 비즈니스 특징 (전략 캐시 시드용)
+        
         Returns:
             생성된 레코드의 ID
         """
@@ -37,7 +44,9 @@ class ContentRepository:
                 strategy=strategy,
                 final_content=final_content,
                 trend_docs=json.dumps(trend_docs or [], ensure_ascii=False),
-                best_practice_docs=json.dumps(best_practice_docs or [], ensure_ascii=False)
+                best_practice_docs=json.dumps(best_practice_docs or [], ensure_ascii=False),
+                group_id=group_id,
+                business_features=business_features
             )
             
             session.add(content)
@@ -52,6 +61,48 @@ class ContentRepository:
         finally:
             session.close()
     
+    def save_many(self, records: List[Dict[str, Any]]) -> List[int]:
+        """
+        여러 생성 결과를 하나의 트랜잭션으로 저장 (배치 생성용)
+        
+        Args:
+            records: save()의 인자와 같은 키를 가진 딕셔너리 목록
+            
+        Returns:
+            생성된 레코드의 ID 목록
+        """
+        session = db_session.get_session()
+        
+        try:
+            date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            contents = [
+                ContentHistory(
+                    business_name=record["business_name"],
+                    target_customer=record["target_customer"],
+                    channel=record["channel"],
+                    tone=record["tone"],
+                    date=date,
+                    strategy=record.get("strategy") or "",
+                    final_content=record["final_content"],
+                    trend_docs=json.dumps(record.get("trend_docs") or [], ensure_ascii=False),
+                    best_practice_docs=json.dumps(record.get("best_practice_docs") or [], ensure_ascii=False),
+                    group_id=record.get("group_id"),
+                    business_features=record.get("business_features")
+                )
+                for record in records
+            ]
+            
+            session.add_all(contents)
+            session.commit()
+            
+            return [content.id for content in contents]
+            
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
     def get_all(self, limit: int = 50) -> List[ContentHistory]:
         """
         모든 히스토리 조회 (최신순)
@@ -93,6 +144,48 @@ class ContentRepository:
         finally:
             session.close()
     
+    def get_group(self, group_id: str) -> List[ContentHistory]:
+        """
+        함께 생성된 채널별 히스토리 조회
+        
+        Args:
+            group_id: 묶음 ID
+            
+        Returns:
+            히스토리 목록 (생성 순)
+        """
+        session = db_session.get_session()
+        
+        try:
+            histories = session.query(ContentHistory)\
+                .filter(ContentHistory.group_id == group_id)\
+                .order_by(ContentHistory.id.asc())\
+                .all()
+            return histories
+        finally:
+            session.close()
+    
+    def get_with_strategy(self) -> List[ContentHistory]:
+        """
+        전략이 저장된 히스토리 조회 (전략 캐시 시드용)
+        
+        비즈니스 특징 컬럼이 추가되기 전의 레코드(business_features가 NULL)도 포함합니다.
+        
+        Returns:
+            히스토리 목록 (최신순)
+        """
+        session = db_session.get_session()
+        
+        try:
+            histories = session.query(ContentHistory)\
+                .filter(ContentHistory.strategy.isnot(None))\
+                .filter(ContentHistory.strategy != "")\
+                .order_by(ContentHistory.id.desc())\
+                .all()
+            return histories
+        finally:
+            session.close()
+    
     def search_by_business(self, business_name: str) -> List[ContentHistory]:
         """
         비즈니스명으로 검색
@@ -144,5 +237,365 @@ class ContentRepository:
             session.close()
 
 
+class ResponseCacheRepository:
+    """LLM 응답 캐시 저장소"""
+    
+    def get(self, key: str, ttl_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        캐시된 응답 조회 (만료된 항목은 삭제)
+        
+        Args:
+            key: 캐시 키
+            ttl_seconds: 유효 기간 (초)
+            
+        Returns:
+            {"response", "latency_ms"} 또는 None
+        """
+        session = db_session.get_session()
+        
+        try:
+            entry = session.query(LLMResponseCache)\
+                .filter(LLMResponseCache.key == key)\
+                .first()
+            if entry is None:
+                return None
+            
+            now = time.time()
+            if now - entry.created_at > ttl_seconds:
+                session.delete(entry)
+                session.commit()
+                return None
+            
+            entry.last_used = now
+            entry.hits = (entry.hits or 0) + 1
+            session.commit()
+            return {"response": entry.response, "latency_ms": entry.latency_ms}
+            
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def put(
+        self,
+        key: str,
+        deployment: str,
+        response: str,
+        latency_ms: float,
+        max_entries: int
+    ):
+        """
+        응답 저장 후 최대 개수를 넘으면 가장 오래 사용되지 않은 항목부터 삭제
+        
+        Args:
+            key: 캐시 키
+            deployment: 배포 이름
+            response: LLM 응답
+            latency_ms: 생성에 걸린 시간 (ms)
+            max_entries: 최대 저장 개수
+        """
+        session = db_session.get_session()
+        
+        try:
+            now = time.time()
+            session.merge(LLMResponseCache(
+                key=key,
+                deployment=deployment,
+                response=response,
+                latency_ms=latency_ms,
+                created_at=now,
+                last_used=now,
+                hits=0
+            ))
+            session.flush()
+            
+            # 최근 사용한 max_entries개를 제외하고 삭제 (개수 조회 없이 한 번의 DELETE)
+            recent = session.query(LLMResponseCache.key)\
+                .order_by(LLMResponseCache.last_used.desc())\
+                .limit(max_entries)\
+                .subquery()
+            session.query(LLMResponseCache)\
+                .filter(LLMResponseCache.key.notin_(session.query(recent.c.key)))\
+                .delete(synchronize_session=False)
+            
+            session.commit()
+            
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+
+
+class StrategyCacheRepository:
+    """전략 캐시 저장소"""
+    
+    def get(self, key: str, ttl_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        캐시된 전략 조회 (만료된 항목은 삭제)
+        
+        Args:
+            key: 캐시 키
+            ttl_seconds: 유효 기간 (초)
+            
+        Returns:
+            {"strategy", "latency_ms"} 또는 None
+        """
+        session = db_session.get_session()
+        
+        try:
+            entry = session.query(StrategyCache)\
+                .filter(StrategyCache.key == key)\
+                .first()
+            if entry is None:
+                return None
+            
+            if time.time() - entry.created_at > ttl_seconds:
+                session.delete(entry)
+                session.commit()
+                return None
+            
+            entry.hits = (entry.hits or 0) + 1
+            session.commit()
+            return {"strategy": entry.strategy, "latency_ms": entry.latency_ms}
+            
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def put(
+        self,
+        key: str,
+        business_name: str,
+        channel: str,
+        strategy: str,
+        latency_ms: Optional[float] = None,
+        created_at: Optional[float] = None,
+        replace: bool = True,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None
+    ) -> bool:
+        """
+        전략 저장 후 만료된 항목과 최대 개수를 넘는 오래된 항목 삭제
+        
+        Args:
+            key: 캐시 키
+            business_name: 비즈니스명 (무효화용)
+            channel: 채널
+            strategy: 전략
+            latency_ms: 생성에 걸린 시간 (ms)
+            created_at: 생성 시각 (기본값: 현재)
+            replace: False면 이미 있는 항목은 유지
+            max_entries: 최대 저장 개수 (없으면 제한 없음)
+            ttl_seconds: 유효 기간 (초, 지난 항목은 삭제)
+            
+        Returns:
+            저장 여부
+        """
+        session = db_session.get_session()
+        
+        try:
+            if not replace and session.query(StrategyCache.key)\
+                    .filter(StrategyCache.key == key).first():
+                return False
+            
+            session.merge(StrategyCache(
+                key=key,
+                business_name=business_name,
+                channel=channel,
+                strategy=strategy,
+                latency_ms=latency_ms,
+                created_at=created_at or time.time(),
+                hits=0
+            ))
+            session.flush()
+            
+            if ttl_seconds is not None:
+                session.query(StrategyCache)\
+                    .filter(StrategyCache.created_at < time.time() - ttl_seconds)\
+                    .delete(synchronize_session=False)
+            if max_entries is not None:
+                # 최근 생성된 max_entries개를 제외하고 삭제
+                recent = session.query(StrategyCache.key)\
+                    .order_by(StrategyCache.created_at.desc())\
+                    .limit(max_entries)\
+                    .subquery()
+                session.query(StrategyCache)\
+                    .filter(StrategyCache.key.notin_(session.query(recent.c.key)))\
+                    .delete(synchronize_session=False)
+            
+            session.commit()
+            return True
+            
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def invalidate(self, key: Optional[str] = None, business_name: Optional[str] = None) -> int:
+        """
+        캐시된 전략 삭제 (둘 다 없으면 전체 삭제)
+        
+        Args:
+            key: 삭제할 캐시 키
+            business_name: 이 비즈니스의 전략 모두 삭제
+            
+        Returns:
+            삭제된 개수
+        """
+        session = db_session.get_session()
+        
+        try:
+            query = session.query(StrategyCache)
+            if key:
+                query = query.filter(StrategyCache.key == key)
+            if business_name:
+                query = query.filter(StrategyCache.business_name == business_name)
+            deleted = query.delete(synchronize_session=False)
+            session.commit()
+            return deleted
+            
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+
+
+class CheckpointRepository:
+    """실행 체크포인트 저장소"""
+    
+    def save(self, run_id: str, node: str, state: Dict[str, Any]):
+        """
+        노드 완료 상태 저장 (같은 실행의 같은 노드는 최신 상태로 교체)
+        
+        Args:
+            run_id: 실행 ID
+            node: 완료된 노드 이름
+            state: 노드 완료 후 상태
+        """
+        session = db_session.get_session()
+        
+        try:
+            session.query(RunCheckpoint)\
+                .filter(RunCheckpoint.run_id == run_id, RunCheckpoint.node == node)\
+                .delete(synchronize_session=False)
+            session.add(RunCheckpoint(
+                run_id=run_id,
+                node=node,
+                state=json.dumps(state, ensure_ascii=False),
+                created_at=time.time()
+            ))
+            session.commit()
+            
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def get_all(self, run_id: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        실행의 체크포인트 목록 조회
+        
+        Returns:
+            저장 순서대로 (노드 이름, 상태) 목록
+        """
+        session = db_session.get_session()
+        
+        try:
+            checkpoints = session.query(RunCheckpoint)\
+                .filter(RunCheckpoint.run_id == run_id)\
+                .order_by(RunCheckpoint.id.asc())\
+                .all()
+            return [(checkpoint.node, json.loads(checkpoint.state)) for checkpoint in checkpoints]
+        finally:
+            session.close()
+    
+    def latest(self, run_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        마지막으로 완료된 노드와 상태 조회
+        
+        Returns:
+            (노드 이름, 상태) 또는 None
+        """
+        checkpoints = self.get_all(run_id)
+        return checkpoints[-1] if checkpoints else None
+    
+    def get(self, run_id: str, node: str) -> Optional[Dict[str, Any]]:
+        """
+        특정 노드 완료 시점의 상태 조회
+        
+        Returns:
+            상태 또는 None
+        """
+        session = db_session.get_session()
+        
+        try:
+            checkpoint = session.query(RunCheckpoint)\
+                .filter(RunCheckpoint.run_id == run_id, RunCheckpoint.node == node)\
+                .first()
+            return json.loads(checkpoint.state) if checkpoint else None
+        finally:
+            session.close()
+    
+    def delete(self, run_ids: List[str], nodes: Optional[List[str]] = None) -> int:
+        """
+        실행 체크포인트 삭제 (결과 저장이 끝난 실행)
+        
+        Args:
+            run_ids: 실행 ID 목록
+            nodes: 삭제할 노드 이름 목록 (없으면 실행의 모든 체크포인트)
+        
+        Returns:
+            삭제된 개수
+        """
+        session = db_session.get_session()
+        
+        try:
+            query = session.query(RunCheckpoint)\
+                .filter(RunCheckpoint.run_id.in_(run_ids))
+            if nodes is not None:
+                query = query.filter(RunCheckpoint.node.in_(nodes))
+            deleted = query.delete(synchronize_session=False)
+            session.commit()
+            return deleted
+            
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def prune(self, ttl_seconds: float) -> int:
+        """
+        오래된 체크포인트 삭제
+        
+        Returns:
+            삭제된 개수
+        """
+        session = db_session.get_session()
+        
+        try:
+            deleted = session.query(RunCheckpoint)\
+                .filter(RunCheckpoint.created_at < time.time() - ttl_seconds)\
+                .delete(synchronize_session=False)
+            session.commit()
+            return deleted
+            
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+
+
 # 전역 인스턴스
 content_repository = ContentRepository()
+response_cache_repository = ResponseCacheRepository()
+strategy_cache_repository = StrategyCacheRepository()
+checkpoint_repository = CheckpointRepository()
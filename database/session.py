@@ -1,5 +1,6 @@
 import os
-from sqlalchemy import create_engine
+import threading
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, scoped_session
 from database.model import Base
 from dotenv import load_dotenv
@@ -7,11 +8,20 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+# 기존 DB 파일에 추가할 컬럼 (테이블, 컬럼, 타입)
+# create_all은 이미 있는 테이블을 변경하지 않으므로 initialize에서 직접 추가
+ADDED_COLUMNS = [
+    ("content_history", "group_id", "VARCHAR"),
+    ("content_history", "business_features", "TEXT"),
+]
+
+
 class DatabaseSession:
     """데이터베이스 세션 관리 싱글톤"""
     
     _instance = None
     _initialized = False
+    _lock = threading.Lock()
     
     def __new__(cls):
         if cls._instance is None:
@@ -19,10 +29,16 @@ class DatabaseSession:
         return cls._instance
     
     def initialize(self):
-        """데이터베이스 초기화"""
+        """데이터베이스 초기화 (여러 스레드에서 동시에 호출해도 한 번만 실행)"""
         if self._initialized:
             return
         
+        with self._lock:
+            if not self._initialized:
+                self._initialize()
+    
+    def _initialize(self):
+        """엔진 생성, 테이블 생성, 마이그레이션"""
         db_path = os.getenv("DB_PATH", "content_history.db")
         db_url = f"sqlite:///{db_path}"
         
@@ -34,6 +50,7 @@ class DatabaseSession:
         
         # 테이블 생성
         Base.metadata.create_all(self.engine)
+        self._migrate()
         
         # 세션 팩토리 생성
         session_factory = sessionmaker(bind=self.engine)
@@ -41,6 +58,15 @@ class DatabaseSession:
         
         self._initialized = True
     
+    def _migrate(self):
+        """기존 테이블에 없는 컬럼 추가 (가벼운 스키마 마이그레이션)"""
+        inspector = inspect(self.engine)
+        with self.engine.begin() as connection:
+            for table, column, column_type in ADDED_COLUMNS:
+                existing = {col["name"] for col in inspector.get_columns(table)}
+                if column not in existing:
+                    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+    
     def get_session(self):
         """세션 반환"""
         if not self._initialized:
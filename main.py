@@ -1,11 +1,18 @@
 import streamlit as st
 from components.sidebar import render_sidebar
-from workflow.state import AgentType, ContentState
-from workflow.graph import create_content_graph
+from workflow.state import AgentType, create_initial_state
+from workflow.graph import content_graph_nodes, get_content_graph
+from workflow.streaming import stream_with_tokens
+from workflow.agents.agent import CACHE_BYPASS_KEY
+from workflow.strategy_cache import invalidate_strategy
+from workflow.prompt import context_packing_stats
+from workflow.review_gate import review_gate_stats
 from database.session import db_session
-from database.repository import content_repository
-from utils.config import validate_env
+from database.repository import checkpoint_repository, content_repository
+from utils.config import get_rate_limiter, validate_env
+from utils.model_tiers import tier_stats
 import json
+import uuid
 
 
 def init_session_state():
@@ -16,15 +23,23 @@ def init_session_state():
         "business_features": "",
         "target_customer": "",
         "channel": "instagram",
+        "multi_channel": False,
+        "channels": [],
         "tone": "친근한",
         "enable_rag": True,
+        "reuse_strategy": False,
         "viewing_history": False,
         "loaded_history": None,
         "current_strategy": None,
         "current_draft": None,
         "current_final": None,
         "trend_docs": [],
-        "best_practice_docs": []
+        "best_practice_docs": [],
+        "channel_results": {},
+        "run_metadata": {},
+        "run_id": None,  # 체크포인트 조회용 현재 실행 ID
+        "resume": None,  # 이어서 실행할 체크포인트 (run_id, start_after, redraft)
+        "generation_error": None
     }
     
     for key, value in defaults.items():
@@ -41,42 +56,132 @@ def reset_session_state():
     st.session_state.current_final = None
     st.session_state.trend_docs = []
     st.session_state.best_practice_docs = []
+    st.session_state.channel_results = {}
+    st.session_state.run_metadata = {}
+    st.session_state.run_id = None
+    st.session_state.resume = None
+    st.session_state.generation_error = None
+
+
+def load_checkpoint(run_id, start_after, nodes):
+    """
+    체크포인트에서 이어서 실행할 상태 로드
+    
+    start_after까지 완료된 노드의 결과는 그래프 순서대로 화면에 다시 표시하고,
+    이후 노드의 체크포인트는 다시 실행되므로 삭제합니다.
+    
+    Args:
+        run_id: 실행 ID
+        start_after: 이 노드 다음부터 실행
+        nodes: 그래프의 노드 이름 목록 (실행 순서)
+    
+    Returns:
+        start_after 노드 완료 시점의 상태
+    """
+    if start_after not in nodes:
+        raise ValueError(f"체크포인트를 찾을 수 없습니다: {start_after}")
+    
+    index = nodes.index(start_after)
+    checkpoints = dict(checkpoint_repository.get_all(run_id))
+    if start_after not in checkpoints:
+        raise ValueError(f"체크포인트를 찾을 수 없습니다: {start_after}")
+    
+    for node in nodes[:index + 1]:
+        if node in checkpoints:
+            process_generation_chunk({node: checkpoints[node]})
+    
+    checkpoint_repository.delete([run_id], nodes=nodes[index + 1:])
+    return checkpoints[start_after]
 
 
 def generate_content():
     """콘텐츠 생성 실행"""
     
-    # 그래프 생성
-    content_graph = create_content_graph(st.session_state.enable_rag)
+    # 멀티 채널 모드면 선택된 채널 목록으로 그래프 생성
+    channels = st.session_state.channels if st.session_state.multi_channel else []
+    resume = st.session_state.resume
+    configurable = {}
     
-    # 초기 상태 설정
-    initial_state: ContentState = {
-        "business_name": st.session_state.business_name,
-        "business_features": st.session_state.business_features,
-        "target_customer": st.session_state.target_customer,
-        "channel": st.session_state.channel,
-        "tone": st.session_state.tone,
-        "messages": [],
-        "strategy": None,
-        "draft_content": None,
-        "final_content": None,
-        "trend_docs": [],
-        "best_practice_docs": [],
-        "prev_node": "START"
-    }
+    if resume:
+        # 체크포인트 이후 노드만 실행 (초안 재생성은 응답 캐시를 사용하지 않음)
+        nodes = content_graph_nodes(st.session_state.enable_rag, channels)
+        initial_state = load_checkpoint(resume["run_id"], resume["start_after"], nodes)
+        if resume.get("redraft"):
+            configurable[CACHE_BYPASS_KEY] = True
+        st.session_state.resume = None
+    else:
+        # 초기 상태 설정
+        initial_state = create_initial_state(
+            business_name=st.session_state.business_name,
+            business_features=st.session_state.business_features,
+            target_customer=st.session_state.target_customer,
+            channel=st.session_state.channel,
+            tone=st.session_state.tone,
+            channels=channels,
+            reuse_strategy=st.session_state.reuse_strategy
+        )
+    
+    st.session_state.run_id = initial_state["run_id"]
+    st.session_state.generation_error = None
+    
+    # 그래프 (설정별로 컴파일된 그래프 재사용)
+    content_graph = get_content_graph(
+        st.session_state.enable_rag,
+        channels,
+        start_after=resume["start_after"] if resume else None
+    )
     
     # 콘텐츠 생성 시작
     with st.spinner("🎨 AI가 마케팅 콘텐츠를 생성하고 있습니다... 잠시만 기다려주세요."):
         
-        # 스트리밍으로 각 Agent의 진행 상황 표시
-        for chunk in content_graph.stream(
-            initial_state,
-            stream_mode="updates"
-        ):
-            process_generation_chunk(chunk)
+        # Agent별 토큰 스트리밍 영역 (생성 중인 텍스트를 실시간으로 표시)
+        live_panels = {}
+        live_texts = {}
+        
+        try:
+            for kind, payload in stream_with_tokens(content_graph, initial_state, configurable):
+                if kind == "token":
+                    role, token = payload
+                    if role not in live_panels:
+                        live_panels[role] = st.empty()
+                        live_texts[role] = ""
+                    live_texts[role] += token
+                    live_panels[role].markdown(
+                        f"**✍️ {AgentType.to_korean(role)} 중...**\n\n{live_texts[role]}"
+                    )
+                else:
+                    # Agent 완료 시 스트리밍 영역을 결과 패널로 교체 (채널 분기는 모든 분기 완료 시)
+                    for role in payload:
+                        for panel_role, panel in live_panels.items():
+                            if panel_role == role or (
+                                role == AgentType.CHANNELS and AgentType.SCOPE_SEPARATOR in panel_role
+                            ):
+                                panel.empty()
+                    process_generation_chunk(payload)
+        
+        except Exception as e:
+            # 완료된 노드까지는 체크포인트로 저장되어 있으므로 실패 화면에서 이어서 실행
+            st.session_state.generation_error = str(e)
+            st.session_state.app_mode = "failed"
+            st.rerun()
     
-    # 결과 저장
-    if st.session_state.current_final:
+    # 결과 저장 (멀티 채널은 같은 group_id로 채널별 저장)
+    if st.session_state.channel_results:
+        group_id = uuid.uuid4().hex
+        for channel, result in st.session_state.channel_results.items():
+            content_repository.save(
+                business_name=st.session_state.business_name,
+                target_customer=st.session_state.target_customer,
+                channel=channel,
+                tone=st.session_state.tone,
+                strategy=st.session_state.current_strategy or "",
+                final_content=result.get("final_content") or "",
+                trend_docs=st.session_state.trend_docs,
+                best_practice_docs=result.get("best_practice_docs", []),
+                group_id=group_id,
+                business_features=st.session_state.business_features
+            )
+    elif st.session_state.current_final:
         content_repository.save(
             business_name=st.session_state.business_name,
             target_customer=st.session_state.target_customer,
@@ -85,7 +190,8 @@ def generate_content():
             strategy=st.session_state.current_strategy or "",
             final_content=st.session_state.current_final,
             trend_docs=st.session_state.trend_docs,
-            best_practice_docs=st.session_state.best_practice_docs
+            best_practice_docs=st.session_state.best_practice_docs,
+            business_features=st.session_state.business_features
         )
 
 
@@ -97,9 +203,14 @@ def process_generation_chunk(chunk):
     # Agent 타입 추출
     agent_type = list(chunk.keys())[0]
     state = chunk[agent_type]
+    st.session_state.run_metadata = state.get("run_metadata") or {}
     
     # 각 Agent별 처리
-    if agent_type == AgentType.STRATEGY:
+    if agent_type == AgentType.RETRIEVAL:
+        st.session_state.trend_docs = state.get("trend_docs", [])
+        st.session_state.best_practice_docs = state.get("best_practice_docs", [])
+    
+    elif agent_type == AgentType.STRATEGY:
         st.session_state.current_strategy = state.get("strategy")
         st.session_state.trend_docs = state.get("trend_docs", [])
         
@@ -113,12 +224,28 @@ def process_generation_chunk(chunk):
         with st.expander("2️⃣ 콘텐츠 초안 생성 완료", expanded=True):
             st.markdown(state.get("draft_content", ""))
     
+    elif agent_type == AgentType.REVIEW_GATE:
+        # 채널 규칙을 모두 통과하여 검토를 생략하면 초안이 최종 콘텐츠
+        if (state.get("review_gate") or {}).get("skip_review"):
+            st.session_state.current_final = state.get("final_content")
+            st.session_state.app_mode = "results"
+            
+            with st.expander("3️⃣ 채널 규칙 확인 완료 (검토 생략)", expanded=True):
+                st.success("✅ 초안이 채널 규칙을 모두 통과하여 최종 콘텐츠로 사용합니다!")
+    
     elif agent_type == AgentType.REVIEW:
         st.session_state.current_final = state.get("final_content")
         st.session_state.app_mode = "results"
         
         with st.expander("3️⃣ 검토 및 최적화 완료", expanded=True):
             st.success("✅ 최종 콘텐츠가 생성되었습니다!")
+    
+    elif agent_type == AgentType.CHANNELS:
+        st.session_state.channel_results = state.get("channel_results") or {}
+        st.session_state.app_mode = "results"
+        
+        with st.expander("2️⃣ 채널별 콘텐츠 생성 및 검토 완료", expanded=True):
+            st.success(f"✅ {len(st.session_state.channel_results)}개 채널의 최종 콘텐츠가 생성되었습니다!")
 
 
 def display_results():
@@ -143,14 +270,12 @@ def display_results():
             with st.expander("📊 마케팅 전략"):
                 st.markdown(history.strategy)
         
-        # 최종 콘텐츠
-        st.subheader("✨ 최종 콘텐츠")
-        st.markdown("---")
-        st.markdown(history.final_content)
-        st.markdown("---")
-        
-        # 복사 버튼
-        st.code(history.final_content, language=None)
+        # 최종 콘텐츠 (함께 생성된 채널이 있으면 채널별 탭)
+        if history.group_id:
+            group = content_repository.get_group(history.group_id)
+            render_channel_contents({h.channel: h.final_content for h in group})
+        else:
+            render_final_content(history.final_content)
         
         # RAG 참고 자료
         if history.trend_docs or history.best_practice_docs:
@@ -165,7 +290,9 @@ def display_results():
         
         st.header(f"🎯 {st.session_state.business_name}")
         st.write(f"**타겟 고객:** {st.session_state.target_customer}")
-        st.write(f"**채널:** {st.session_state.channel} | **톤:** {st.session_state.tone}")
+        channel_results = st.session_state.channel_results
+        channel_label = ", ".join(channel_results) if channel_results else st.session_state.channel
+        st.write(f"**채널:** {channel_label} | **톤:** {st.session_state.tone}")
         
         st.divider()
         
@@ -173,22 +300,36 @@ def display_results():
         if st.session_state.current_strategy:
             with st.expander("📊 마케팅 전략", expanded=False):
                 st.markdown(st.session_state.current_strategy)
+                strategy_metadata = st.session_state.run_metadata.get(AgentType.STRATEGY, {})
+                if strategy_metadata.get("strategy_reused"):
+                    st.caption("♻️ 같은 브리프로 이전에 수립한 전략을 재사용했습니다.")
+                    if st.button("🗑️ 저장된 전략 삭제 후 새로 수립"):
+                        invalidate_strategy_and_regenerate()
         
         # 최종 콘텐츠
-        st.subheader("✨ 최종 콘텐츠")
-        st.markdown("---")
-        st.markdown(st.session_state.current_final)
-        st.markdown("---")
-        
-        # 복사 버튼
-        st.code(st.session_state.current_final, language=None)
+        if channel_results:
+            render_channel_contents({
+                channel: result.get("final_content") or ""
+                for channel, result in channel_results.items()
+            })
+            best_practice_docs = [
+                doc for result in channel_results.values()
+                for doc in result.get("best_practice_docs", [])
+            ]
+        else:
+            render_final_content(st.session_state.current_final)
+            best_practice_docs = st.session_state.best_practice_docs
         
         # RAG 참고 자료
-        if st.session_state.trend_docs or st.session_state.best_practice_docs:
+        if st.session_state.trend_docs or best_practice_docs:
             render_reference_materials(
                 st.session_state.trend_docs,
-                st.session_state.best_practice_docs
+                best_practice_docs
             )
+        
+        # 실행 정보
+        if st.session_state.run_metadata:
+            render_run_metadata(st.session_state.run_metadata)
     
     # 액션 버튼
     col1, col2 = st.columns(2)
@@ -200,6 +341,89 @@ def display_results():
     with col2:
         if st.button("📝 수정 요청", use_container_width=True):
             st.info("💡 사이드바에서 설정을 변경하고 다시 생성해보세요!")
+    
+    # 전략은 유지하고 초안부터 다시 생성 (전략 수립 체크포인트가 있을 때)
+    run_id = st.session_state.run_id
+    if not st.session_state.viewing_history and run_id and \
+            checkpoint_repository.get(run_id, AgentType.STRATEGY):
+        if st.button("✏️ 초안 다시 생성 (전략 유지)", use_container_width=True):
+            st.session_state.current_draft = None
+            st.session_state.current_final = None
+            st.session_state.channel_results = {}
+            st.session_state.resume = {
+                "run_id": run_id,
+                "start_after": AgentType.STRATEGY,
+                "redraft": True
+            }
+            st.session_state.app_mode = "generating"
+            st.rerun()
+
+
+def invalidate_strategy_and_regenerate():
+    """캐시된 전략을 삭제하고 전략 수립부터 다시 생성 (검색 결과는 체크포인트에서 재사용)"""
+    invalidate_strategy({
+        "business_name": st.session_state.business_name,
+        "business_features": st.session_state.business_features,
+        "target_customer": st.session_state.target_customer,
+        "channel": st.session_state.channel,
+        "channels": st.session_state.channels if st.session_state.multi_channel else [],
+    })
+    
+    run_id = st.session_state.run_id
+    reset_session_state()
+    if run_id and checkpoint_repository.get(run_id, AgentType.RETRIEVAL):
+        st.session_state.resume = {
+            "run_id": run_id,
+            "start_after": AgentType.RETRIEVAL,
+            "redraft": True
+        }
+    st.session_state.app_mode = "generating"
+    st.rerun()
+
+
+def display_failure():
+    """생성 실패 화면 (마지막으로 완료된 노드부터 이어서 실행)"""
+    st.error(f"❌ 콘텐츠 생성 중 오류 발생: {st.session_state.generation_error}")
+    
+    run_id = st.session_state.run_id
+    latest = checkpoint_repository.latest(run_id) if run_id else None
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if latest:
+            node, _ = latest
+            st.caption(f"'{AgentType.to_korean(node)}' 단계까지 완료되었습니다.")
+            if st.button("▶️ 이어서 생성", use_container_width=True):
+                st.session_state.resume = {"run_id": run_id, "start_after": node}
+                st.session_state.app_mode = "generating"
+                st.rerun()
+    
+    with col2:
+        if st.button("🔄 처음부터 다시", use_container_width=True):
+            st.session_state.run_id = None
+            st.session_state.app_mode = "generating"
+            st.rerun()
+
+
+def render_final_content(final_content):
+    """최종 콘텐츠 및 복사용 코드 블록 표시"""
+    
+    st.subheader("✨ 최종 콘텐츠")
+    st.markdown("---")
+    st.markdown(final_content)
+    st.markdown("---")
+    
+    # 복사 버튼
+    st.code(final_content, language=None)
+
+
+def render_channel_contents(contents):
+    """채널별 최종 콘텐츠를 탭으로 표시"""
+    
+    tabs = st.tabs(list(contents))
+    for tab, final_content in zip(tabs, contents.values()):
+        with tab:
+            render_final_content(final_content)
 
 
 def render_reference_materials(trend_docs, best_practice_docs):
@@ -221,6 +445,75 @@ def render_reference_materials(trend_docs, best_practice_docs):
                 st.divider()
 
 
+def render_run_metadata(run_metadata):
+    """Agent별 실행 정보 (지연 시간, 캐시 적중) 표시"""
+    
+    with st.expander("⏱️ 실행 정보"):
+        for role, metadata in run_metadata.items():
+            line = f"**{AgentType.to_korean(role)}**: {metadata.get('latency_ms', 0) / 1000:.1f}초"
+            if metadata.get("review_skipped"):
+                line += f" (검토 생략, 약 {metadata.get('saved_ms', 0) / 1000:.1f}초 절약)"
+            elif metadata.get("failures"):
+                line += f" (미통과: {', '.join(metadata['failures'])})"
+            if metadata.get("strategy_reused"):
+                line += f" (저장된 전략 재사용, {metadata.get('saved_ms', 0) / 1000:.1f}초 절약)"
+            elif metadata.get("cache_hit"):
+                line += f" (캐시 적중, {metadata.get('saved_ms', 0) / 1000:.1f}초 절약)"
+            if metadata.get("context_tokens_saved"):
+                line += f" · 컨텍스트 {metadata['context_tokens']:,} 토큰 ({metadata['context_tokens_saved']:,} 토큰 절감)"
+            if metadata.get("tier"):
+                line += f" · {metadata['tier']} ({metadata.get('deployment')})"
+            if metadata.get("prompt_tokens"):
+                line += f" · 입력 {metadata['prompt_tokens']:,} 토큰"
+                if metadata.get("prompt_tokens_saved"):
+                    line += f" ({metadata['prompt_tokens_saved']:,} 토큰 절감)"
+            if metadata.get("review_mode") == "edits":
+                if metadata.get("edit_fallback"):
+                    line += " · 편집 목록 적용 실패로 전체 재작성"
+                else:
+                    line += (
+                        f" · 편집 {metadata.get('edits_applied', 0)}개 적용, "
+                        f"출력 {metadata.get('output_tokens_saved', 0):,} 토큰 절감"
+                    )
+            st.write(line)
+        
+        # 모델 등급별 지연 시간 / 토큰 통계 (프로세스 전체 누적)
+        for tier, stats in tier_stats.stats().items():
+            st.caption(
+                f"{tier}: 호출 {stats['calls']}회, 평균 {stats['avg_latency_ms'] / 1000:.1f}초 "
+                f"(p95 {stats['p95_latency_ms'] / 1000:.1f}초), 입력 {stats['input_tokens']:,} / "
+                f"출력 {stats['output_tokens']:,} 토큰, 출력 토큰당 {stats['ms_per_output_token']:.0f}ms"
+            )
+        
+        # 검토 사전 확인 통계 (프로세스 전체 누적)
+        gate = review_gate_stats.stats()
+        if gate["checked"]:
+            st.caption(
+                f"검토 사전 확인: {gate['checked']}회 중 {gate['skipped']}회 검토 생략, "
+                f"약 {gate['saved_ms'] / 1000:.1f}초 절약"
+            )
+        
+        # 컨텍스트 패킹 통계 (프로세스 전체 누적)
+        packing = context_packing_stats.stats()
+        if packing["calls"]:
+            st.caption(
+                f"컨텍스트 패킹: {packing['calls']}회, {packing['raw_tokens']:,} → {packing['packed_tokens']:,} 토큰 "
+                f"({packing['saved_tokens']:,} 토큰 절감, 중복 문서 {packing['duplicates']}개 제외)"
+            )
+        
+        # Azure 호출 제한기 통계 (프로세스 전체 누적)
+        for deployment, stats in get_rate_limiter().stats().items():
+            st.caption(
+                f"{deployment}: 호출 {stats['calls']}회, 평균 대기 {stats['avg_wait_ms']:.0f}ms, "
+                f"현재 대기열 {stats['queue_depth']} (최대 {stats['max_queue_depth']}), 429 응답 {stats['throttled']}회"
+            )
+            for priority, priority_stats in stats["by_priority"].items():
+                st.caption(
+                    f"└ {priority}: 평균 대기 {priority_stats['avg_wait_ms']:.0f}ms, "
+                    f"p95 {priority_stats['p95_wait_ms']:.0f}ms, 대기열 {priority_stats['queue_depth']}"
+                )
+
+
 def render_ui():
     """메인 UI 렌더링"""
     
@@ -252,6 +545,8 @@ def render_ui():
         generate_content()
     elif current_mode == "results":
         display_results()
+    elif current_mode == "failed":
+        display_failure()
     else:
         # 초기 화면
         st.info("👈 사이드바에서 비즈니스 정보를 입력하고 '콘텐츠 생성' 버튼을 클릭하세요!")
@@ -0,0 +1,268 @@
+"""
+벡터 스토어 백엔드 벤치마크 (Chroma vs NumPy)
+
+합성 벡터로 인덱스를 만들고 쿼리 지연 시간과 콜드 스타트 시간을 비교합니다.
+임베딩 API는 호출하지 않습니다.
+
+--quantization-report 를 지정하면 차원 축소 / 저장 형식 / 재채점 조합별
+recall@k, 쿼리 지연 시간, 디스크 사용량을 비교합니다. --texts 로 실제 문서
+파일(줄 단위 텍스트 또는 content 필드가 있는 JSONL)을 주면 Azure 임베딩(캐시 사용)으로
+측정하고, 없으면 앞쪽 차원에 분산이 집중된 합성 벡터로 측정합니다.
+
+사용법:
+    python -m retrieval.benchmark --docs 5000 --dim 3072 --queries 200
+    python -m retrieval.benchmark --quantization-report --docs 20000
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+BACKENDS = ["chroma", "numpy"]
+CHANNELS = ["instagram", "blog", "email", "general"]
+COLLECTION_NAME = "benchmark"
+BATCH_SIZE = 1000
+
+
+class StaticEmbeddings(Embeddings):
+    """미리 계산된 벡터를 반환하는 벤치마크용 임베딩 (API 호출 없음)"""
+
+    def __init__(self, vectors: Dict[str, List[float]]):
+        self.vectors = vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.vectors[text] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.vectors[text]
+
+
+def _open(backend: str, directory: str, embeddings: Embeddings):
+    """백엔드별 스토어 열기 (import 비용도 콜드 스타트에 포함되도록 지연 import)"""
+    if backend == "numpy":
+        from retrieval.numpy_store import NumpyVectorStore
+        return NumpyVectorStore(COLLECTION_NAME, embeddings, directory)
+
+    from langchain_community.vectorstores import Chroma
+    return Chroma(
+        collection_name=COLLECTION_NAME,
+        embedding_function=embeddings,
+        persist_directory=directory
+    )
+
+
+def _percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def _build(backend: str, directory: str, vectors: np.ndarray) -> float:
+    """인덱스 생성 후 소요 시간(초) 반환"""
+    texts = [f"doc-{i}" for i in range(len(vectors))]
+    metadatas = [{"channel": CHANNELS[i % len(CHANNELS)]} for i in range(len(vectors))]
+    store = _open(backend, directory, StaticEmbeddings(dict(zip(texts, vectors.tolist()))))
+
+    start = time.perf_counter()
+    for i in range(0, len(texts), BATCH_SIZE):
+        store.add_texts(
+            texts[i:i + BATCH_SIZE],
+            metadatas=metadatas[i:i + BATCH_SIZE],
+            ids=texts[i:i + BATCH_SIZE]
+        )
+    return time.perf_counter() - start
+
+
+def _query_latencies(backend: str, directory: str, queries: np.ndarray, k: int, channel_filter: bool) -> List[float]:
+    """쿼리별 지연 시간(ms) 측정"""
+    store = _open(backend, directory, StaticEmbeddings({}))
+    where = {"channel": {"$in": ["blog", "general"]}} if channel_filter else None
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        store.similarity_search_by_vector(query.tolist(), k=k, filter=where)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _cold_start(backend: str, directory: str, dim: int, k: int) -> float:
+    """새 프로세스에서 import + 스토어 열기 + 첫 쿼리까지 시간(ms) 측정"""
+    output = subprocess.run(
+        [
+            sys.executable, "-m", "retrieval.benchmark",
+            "--cold-start", backend,
+            "--directory", directory,
+            "--dim", str(dim),
+            "--k", str(k),
+        ],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def _run_cold_start_child(args):
+    """콜드 스타트 측정용 자식 프로세스"""
+    start = time.perf_counter()
+    store = _open(args.cold_start, args.directory, StaticEmbeddings({}))
+    query = np.random.default_rng(0).standard_normal(args.dim).astype(np.float32)
+    store.similarity_search_by_vector(query.tolist(), k=args.k)
+    print((time.perf_counter() - start) * 1000)
+
+
+def _synthetic_matryoshka(n: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    """앞쪽 차원에 분산이 집중된 합성 벡터 (text-embedding-3의 차원 축소 특성 근사)"""
+    decay = 1.0 / np.sqrt(1.0 + np.arange(dim) / 64.0)
+    return (rng.standard_normal((n, dim)) * decay).astype(np.float32)
+
+
+def _load_texts(path: str, limit: int) -> List[str]:
+    """줄 단위 텍스트 또는 JSONL(content/text 필드) 파일 읽기"""
+    texts = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if path.endswith(".jsonl"):
+                record = json.loads(line)
+                line = record.get("content") or record.get("text") or ""
+            if line:
+                texts.append(line)
+            if len(texts) >= limit:
+                break
+    return texts
+
+
+def _embed_texts(texts: List[str]) -> np.ndarray:
+    """Azure 임베딩으로 텍스트 임베딩 (임베딩 캐시 사용)"""
+    from utils.config import get_embeddings
+    embeddings = get_embeddings()
+    vectors = []
+    for i in range(0, len(texts), 256):
+        vectors.extend(embeddings.embed_documents(texts[i:i + 256]))
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def _directory_bytes(directory: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(directory, name))
+        for name in os.listdir(directory)
+    )
+
+
+def _quantization_report(args):
+    """차원 / 저장 형식 / 재채점 조합별 recall-지연 시간-디스크 리포트"""
+    from retrieval.numpy_store import NumpyVectorStore
+    from retrieval.quantization import VECTOR_DTYPES, TruncatedEmbeddings, normalize
+
+    rng = np.random.default_rng(42)
+    if args.texts:
+        texts = _load_texts(args.texts, args.docs + args.queries)
+        vectors = _embed_texts(texts)
+        corpus, queries = vectors[:-args.queries], vectors[-args.queries:]
+    else:
+        corpus = _synthetic_matryoshka(args.docs, args.dim, rng)
+        queries = _synthetic_matryoshka(args.queries, args.dim, rng)
+
+    # 정답: 원본 차원 float32 전수 검색 결과
+    exact_scores = normalize(queries) @ normalize(corpus).T
+    truth = [set(np.argsort(-row)[:args.k].tolist()) for row in exact_scores]
+
+    ids = [f"doc-{i}" for i in range(len(corpus))]
+    base = StaticEmbeddings(dict(zip(ids, corpus.tolist())))
+    full_dim = corpus.shape[1]
+
+    print(f"docs={len(corpus)} queries={len(queries)} dim={full_dim} k={args.k}")
+    print(f"{'dim':>5} {'dtype':<8} {'rescore':<7} {'disk(MB)':>9} {'recall@k':>9} {'p50(ms)':>8} {'p95(ms)':>8}")
+
+    for dim in args.dims:
+        dim = dim or full_dim
+        embeddings = TruncatedEmbeddings(base, dim) if dim < full_dim else base
+        for dtype in VECTOR_DTYPES:
+            for rescore in ([False] if dtype == "float32" else [False, True]):
+                directory = tempfile.mkdtemp(prefix="bench_quant_")
+                try:
+                    store = NumpyVectorStore(
+                        COLLECTION_NAME, embeddings, directory,
+                        dtype=dtype, rescore=rescore, rescore_candidates=args.rescore_candidates
+                    )
+                    for i in range(0, len(ids), BATCH_SIZE):
+                        store.add_texts(ids[i:i + BATCH_SIZE], ids=ids[i:i + BATCH_SIZE])
+
+                    latencies, recalls = [], []
+                    for query, expected in zip(queries, truth):
+                        vector = normalize(query[:dim]).tolist()
+                        start = time.perf_counter()
+                        results = store.similarity_search_by_vector(vector, k=args.k)
+                        latencies.append((time.perf_counter() - start) * 1000)
+                        found = {int(doc.page_content.split("-")[1]) for doc in results}
+                        recalls.append(len(found & expected) / args.k)
+
+                    print(
+                        f"{dim:>5} {dtype:<8} {'on' if rescore else 'off':<7} "
+                        f"{_directory_bytes(directory) / 1e6:>9.1f} {np.mean(recalls):>9.3f} "
+                        f"{_percentile(latencies, 50):>8.2f} {_percentile(latencies, 95):>8.2f}"
+                    )
+                finally:
+                    shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chroma vs NumPy 벡터 스토어 벤치마크")
+    parser.add_argument("--docs", type=int, default=5000, help="문서 수")
+    parser.add_argument("--dim", type=int, default=3072, help="임베딩 차원")
+    parser.add_argument("--queries", type=int, default=200, help="쿼리 수")
+    parser.add_argument("--k", type=int, default=4, help="top-k")
+    parser.add_argument("--backends", nargs="+", default=BACKENDS, choices=BACKENDS)
+    parser.add_argument("--quantization-report", action="store_true", help="차원 축소/양자화 recall-지연 시간 리포트")
+    parser.add_argument("--dims", nargs="+", type=int, default=[0, 1024, 512, 256], help="비교할 차원 (0: 원본)")
+    parser.add_argument("--rescore-candidates", type=int, default=32, help="재채점 후보 수")
+    parser.add_argument("--texts", help="실제 문서 파일 (줄 단위 텍스트 또는 JSONL)")
+    parser.add_argument("--cold-start", choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--directory", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_start:
+        _run_cold_start_child(args)
+        return
+
+    if args.quantization_report:
+        _quantization_report(args)
+        return
+
+    rng = np.random.default_rng(42)
+    vectors = rng.standard_normal((args.docs, args.dim)).astype(np.float32)
+    queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+
+    print(f"docs={args.docs} dim={args.dim} queries={args.queries} k={args.k}")
+    print(f"{'backend':<8} {'build(s)':>9} {'cold(ms)':>9} {'p50(ms)':>8} {'p95(ms)':>8} {'filtered p50(ms)':>17}")
+
+    for backend in args.backends:
+        directory = tempfile.mkdtemp(prefix=f"bench_{backend}_")
+        try:
+            build_seconds = _build(backend, directory, vectors)
+            cold_ms = _cold_start(backend, directory, args.dim, args.k)
+            latencies = _query_latencies(backend, directory, queries, args.k, channel_filter=False)
+            filtered = _query_latencies(backend, directory, queries, args.k, channel_filter=True)
+
+            print(
+                f"{backend:<8} {build_seconds:>9.2f} {cold_ms:>9.1f} "
+                f"{_percentile(latencies, 50):>8.2f} {_percentile(latencies, 95):>8.2f} "
+                f"{_percentile(filtered, 50):>17.2f}"
+            )
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
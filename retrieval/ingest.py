@@ -0,0 +1,245 @@
+"""
+대량 코퍼스 적재 CLI
+
+디렉토리의 Markdown / JSONL / CSV 파일을 스트리밍으로 읽어 청크로 나누고,
+배치 단위로 임베딩하여 벡터 스토어에 upsert 합니다.
+
+- 문서 ID는 콘텐츠 해시이므로 이미 저장된 청크는 건너뜁니다.
+  중단된 적재를 같은 명령으로 다시 실행하면 이어서 진행됩니다.
+- 파일 → 레코드 → 청크 → 배치가 모두 제너레이터로 연결되고, 동시에 처리 중인
+  배치 수도 제한되므로 코퍼스 크기와 관계없이 메모리 사용량이 일정합니다.
+
+JSONL/CSV 레코드는 content(또는 text) 필드를 본문으로, 나머지 필드
+(예: channel, type, source)를 메타데이터로 사용합니다.
+
+사용법:
+    python -m retrieval.ingest ./corpus --collection practices --batch-size 64 --concurrency 4
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+from retrieval.vector_store import COLLECTIONS, document_id, mark_collection_changed, open_store
+from utils.config import get_embeddings
+from utils.rate_limiter import BACKGROUND, priority_scope
+
+
+# 적재 문서의 출처 표시 (메타데이터 "origin")
+INGEST_ORIGIN = "ingest"
+
+SUPPORTED_EXTENSIONS = (".md", ".markdown", ".jsonl", ".csv")
+
+
+def iter_files(directory: str) -> Iterator[str]:
+    """지원 형식 파일 경로를 정렬된 순서로 반환 (재실행 시 같은 순서 보장)"""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                yield os.path.join(root, name)
+
+
+def _split_record(record: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """레코드를 본문과 메타데이터로 분리 (메타데이터는 스칼라 값만 유지)"""
+    text = record.get("content") or record.get("text") or ""
+    metadata = {
+        key: value
+        for key, value in record.items()
+        if key not in ("content", "text") and isinstance(value, (str, int, float, bool)) and value != ""
+    }
+    return text, metadata
+
+
+def iter_records(path: str, directory: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """파일에서 (본문, 메타데이터) 레코드를 하나씩 읽기"""
+    source = os.path.relpath(path, directory)
+    lower = path.lower()
+
+    if lower.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f):
+                if not line.strip():
+                    continue
+                text, metadata = _split_record(json.loads(line))
+                yield text, {"source": source, "record": line_no, **metadata}
+
+    elif lower.endswith(".csv"):
+        with open(path, encoding="utf-8", newline="") as f:
+            for row_no, row in enumerate(csv.DictReader(f)):
+                text, metadata = _split_record(row)
+                yield text, {"source": source, "record": row_no, **metadata}
+
+    else:
+        with open(path, encoding="utf-8") as f:
+            yield f.read(), {"source": source}
+
+
+def chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> Iterator[str]:
+    """
+    단락 경계를 우선으로 텍스트를 청크로 분할
+
+    단락이 chunk_size보다 길면 문자 단위로 자르며, 이전 청크의 끝부분
+    chunk_overlap 글자를 다음 청크 앞에 붙입니다.
+    """
+    buffer = ""
+    for paragraph in text.split("\n\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+
+        while len(paragraph) > chunk_size:
+            if buffer:
+                yield buffer
+                buffer = ""
+            yield paragraph[:chunk_size]
+            paragraph = paragraph[chunk_size - chunk_overlap:]
+
+        if buffer and len(buffer) + len(paragraph) + 2 > chunk_size:
+            yield buffer
+            buffer = buffer[-chunk_overlap:] if chunk_overlap else ""
+            if len(buffer) + len(paragraph) + 2 > chunk_size:
+                buffer = ""
+        buffer = f"{buffer}\n\n{paragraph}" if buffer else paragraph
+
+    if buffer:
+        yield buffer
+
+
+def iter_documents(directory: str, chunk_size: int, chunk_overlap: int) -> Iterator[Document]:
+    """디렉토리의 모든 파일을 청크 문서로 스트리밍"""
+    for path in iter_files(directory):
+        for text, metadata in iter_records(path, directory):
+            for chunk_no, chunk in enumerate(chunk_text(text, chunk_size, chunk_overlap)):
+                yield Document(page_content=chunk, metadata={**metadata, "chunk": chunk_no})
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    """고정 크기 배치로 묶기"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _upsert_batch(store: VectorStore, documents: List[Document]) -> Tuple[int, int]:
+    """
+    배치에서 아직 저장되지 않은 문서만 임베딩하여 upsert
+
+    Returns:
+        (저장한 문서 수, 건너뛴 문서 수)
+    """
+    unique = {document_id(doc): doc for doc in documents}
+    existing = set(store.get(ids=list(unique), include=[])["ids"])
+    new_ids = [doc_id for doc_id in unique if doc_id not in existing]
+
+    if new_ids:
+        # 적재는 대화형 / 배치 생성보다 낮은 우선순위로 임베딩
+        with priority_scope(BACKGROUND):
+            store.add_texts(
+                [unique[doc_id].page_content for doc_id in new_ids],
+                metadatas=[{**unique[doc_id].metadata, "origin": INGEST_ORIGIN} for doc_id in new_ids],
+                ids=new_ids
+            )
+        mark_collection_changed(store)
+    return len(new_ids), len(documents) - len(new_ids)
+
+
+def ingest(
+    directory: str,
+    collection: str = "practices",
+    batch_size: int = 64,
+    concurrency: int = 4,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 100
+) -> Dict[str, float]:
+    """
+    디렉토리 적재 실행
+
+    Args:
+        directory: 코퍼스 디렉토리
+        collection: 대상 컬렉션 (trends, practices)
+        batch_size: 임베딩 배치 크기
+        concurrency: 동시에 처리할 배치 수
+        chunk_size: 청크 최대 글자 수
+        chunk_overlap: 청크 간 겹침 글자 수
+
+    Returns:
+        적재 통계
+    """
+    if not 0 <= chunk_overlap < chunk_size:
+        raise ValueError("chunk_overlap must be between 0 and chunk_size")
+
+    store = open_store(COLLECTIONS[collection], collection, get_embeddings())
+    stats = {"batches": 0, "added": 0, "skipped": 0}
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = set()
+        for batch in batched(iter_documents(directory, chunk_size, chunk_overlap), batch_size):
+            # 처리 중인 배치 수를 제한하여 메모리 사용량을 일정하게 유지
+            if len(pending) >= concurrency:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                _collect(done, stats, start)
+            pending.add(executor.submit(_upsert_batch, store, batch))
+
+        done, _ = wait(pending)
+        _collect(done, stats, start)
+
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def _collect(futures, stats: Dict[str, float], start: float):
+    """완료된 배치 결과 집계 및 진행 상황 출력"""
+    for future in futures:
+        added, skipped = future.result()
+        stats["batches"] += 1
+        stats["added"] += added
+        stats["skipped"] += skipped
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"batches={stats['batches']} added={stats['added']} "
+        f"skipped={stats['skipped']} elapsed={elapsed:.1f}s",
+        file=sys.stderr
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="코퍼스 디렉토리를 벡터 스토어에 적재")
+    parser.add_argument("directory", help="Markdown / JSONL / CSV 파일 디렉토리")
+    parser.add_argument("--collection", choices=list(COLLECTIONS), default="practices", help="대상 컬렉션")
+    parser.add_argument("--batch-size", type=int, default=64, help="임베딩 배치 크기")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 처리할 배치 수")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="청크 최대 글자 수")
+    parser.add_argument("--chunk-overlap", type=int, default=100, help="청크 간 겹침 글자 수")
+    args = parser.parse_args()
+
+    stats = ingest(
+        args.directory,
+        collection=args.collection,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap
+    )
+    print(
+        f"완료: {stats['added']}개 추가, {stats['skipped']}개 건너뜀 "
+        f"({stats['batches']}개 배치, {stats['seconds']:.1f}초)"
+    )
+
+
+if __name__ == "__main__":
+    main()
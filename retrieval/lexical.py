@@ -0,0 +1,113 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from retrieval.filters import matches_where
+
+
+# 한글 음절 묶음 또는 영문/숫자 단어
+_TOKEN_PATTERN = re.compile(r"[가-힣]+|[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    한국어 문자 n-gram 토크나이저
+
+    형태소 분석기 없이도 조사/어미 변화에 강하도록 한글은 음절 2-gram으로,
+    영문/숫자는 단어 단위로 분리합니다.
+    """
+    tokens = []
+    for word in _TOKEN_PATTERN.findall(text.lower()):
+        if "가" <= word[0] <= "힣" and len(word) > 1:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+class BM25Index:
+    """메모리 내 BM25 역색인"""
+
+    def __init__(
+        self,
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        k1: float = 1.5,
+        b: float = 0.75
+    ):
+        """
+        Args:
+            documents: 문서 본문 목록
+            metadatas: 문서 메타데이터 목록
+            k1: 단어 빈도 포화 계수
+            b: 문서 길이 정규화 계수
+        """
+        self.documents = documents
+        self.metadatas = metadatas
+        self.k1 = k1
+        self.b = b
+
+        # 토큰 → [(문서 번호, 빈도)]
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.doc_lengths: List[int] = []
+        for i, text in enumerate(documents):
+            counts = Counter(tokenize(text))
+            self.doc_lengths.append(sum(counts.values()))
+            for token, freq in counts.items():
+                self.postings[token].append((i, freq))
+
+        total = len(documents)
+        self.avg_length = sum(self.doc_lengths) / total if total else 0.0
+        self.idf = {
+            token: math.log(1 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+            for token, posting in self.postings.items()
+        }
+
+    def search(
+        self,
+        query: str,
+        k: int = 4,
+        where: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[Document, float]]:
+        """BM25 점수 기준 top-k 검색"""
+        scores: Dict[int, float] = defaultdict(float)
+        for token in set(tokenize(query)):
+            idf = self.idf.get(token)
+            if idf is None:
+                continue
+            for i, freq in self.postings[token]:
+                norm = 1 - self.b + self.b * self.doc_lengths[i] / (self.avg_length or 1.0)
+                scores[i] += idf * freq * (self.k1 + 1) / (freq + self.k1 * norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        results = []
+        for i, score in ranked:
+            if where and not matches_where(self.metadatas[i], where):
+                continue
+            results.append((Document(page_content=self.documents[i], metadata=self.metadatas[i]), score))
+            if len(results) >= k:
+                break
+        return results
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Document]], k: int, rrf_k: int = 60) -> List[Document]:
+    """
+    여러 검색 결과를 Reciprocal Rank Fusion으로 결합
+
+    Args:
+        result_lists: 순위순으로 정렬된 검색 결과 목록들
+        k: 반환할 문서 수
+        rrf_k: 순위 평활 상수
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    documents: Dict[str, Document] = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results):
+            scores[doc.page_content] += 1.0 / (rrf_k + rank + 1)
+            documents.setdefault(doc.page_content, doc)
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return [documents[content] for content, _ in ranked[:k]]
@@ -0,0 +1,544 @@
+import json
+import os
+import re
+import threading
+import uuid
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from retrieval.filters import matches_where
+from retrieval.quantization import VECTOR_DTYPES, dequantize_int8, normalize, quantize_int8
+
+
+# 점수 계산 시 한 번에 float32로 변환하는 행 수 (임시 메모리 상한)
+_SCORE_BLOCK_ROWS = 16384
+
+# 삭제된 행 비율이 이 값을 넘으면 삭제 기록 대신 인덱스를 다시 저장 (압축)
+COMPACT_DELETED_RATIO = 0.25
+
+
+class _IndexData(NamedTuple):
+    """디스크에서 로드한 인덱스 스냅샷"""
+    vectors: Optional[np.ndarray]  # 저장 형식(float32/float16/int8) 벡터
+    scales: Optional[np.ndarray]  # int8 행별 스케일
+    full: Optional[np.ndarray]  # 재채점용 float32 벡터 (선택)
+    ids: List[str]
+    documents: List[str]
+    metadatas: List[Dict]
+    alive: np.ndarray  # 행별 유효 여부 (삭제 시 새 배열을 만들어 이전 스냅샷은 변하지 않음)
+    positions: Dict[str, int]  # 문서 ID → 유효한 행 번호 (쓰기 중에 바뀌므로 잠금 안에서만 사용)
+    dtype: str
+    rescore: bool
+    dim: Optional[int]
+    generation: int  # 벡터 파일 세트 번호 (압축할 때마다 증가)
+    log_bytes: int  # 로그에서 읽은 (완전한 줄까지의) 바이트 수
+    deleted: int  # 삭제되거나 같은 ID의 새 행으로 교체된 행 수
+    filter_rows: Dict[str, np.ndarray]  # 필터별 후보 행 캐시 (스냅샷별)
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    NumPy 브루트포스 벡터 인덱스
+
+    정규화된 임베딩은 행 단위로 이어 붙이는 바이너리 파일(.bin)에, 문서와 메타데이터는
+    같은 이름의 .jsonl 로그에 저장하고 검색 시 메모리 매핑으로 읽습니다.
+    벡터 파일 이름에는 세트 번호(generation)가 붙고, 로그 헤더가 사용할 세트를 가리킵니다.
+    upsert는 새 행과 로그 줄만 추가하므로(같은 ID의 이전 행은 교체된 행으로 표시) 배치 적재
+    비용이 전체 인덱스 크기와 관계없습니다. 삭제도 로그에 기록만 하고, 삭제 / 교체된 행이
+    COMPACT_DELETED_RATIO를 넘을 때만 남은 행으로 다시 저장합니다.
+    검색은 행렬 곱 + argpartition으로 top-k를 구하며, 검색 점수는 코사인 유사도입니다 (높을수록 유사).
+
+    다른 프로세스가 로그를 변경하면(python -m retrieval.ingest) 다음 조회 시 다시 로드합니다.
+
+    벡터는 float32, float16, int8(행별 스케일) 중 하나로 저장할 수 있으며,
+    rescore를 켜면 float32 사본을 함께 저장해 상위 후보만 정밀 재채점합니다.
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        embedding_function: Embeddings,
+        persist_directory: str,
+        dtype: str = "float32",
+        rescore: bool = False,
+        rescore_candidates: int = 32
+    ):
+        """
+        Args:
+            collection_name: 컬렉션 이름 (파일 이름으로 사용)
+            embedding_function: 임베딩 모델
+            persist_directory: 저장 디렉토리
+            dtype: 벡터 저장 형식 (float32, float16, int8)
+            rescore: float32 사본으로 상위 후보 재채점 여부
+            rescore_candidates: 재채점할 후보 수
+        """
+        if dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unknown vector dtype: {dtype} ({', '.join(VECTOR_DTYPES)})")
+
+        self.collection_name = collection_name
+        self._embedding = embedding_function
+        self.persist_directory = persist_directory
+        self.dtype = dtype
+        self.rescore = rescore and dtype != "float32"
+        self.rescore_candidates = rescore_candidates
+
+        self._base = os.path.join(persist_directory, collection_name)
+        self._log_path = f"{self._base}.jsonl"
+        self._file_pattern = re.compile(rf"^{re.escape(collection_name)}\.(\d+)\.(?:vectors|scales|full)\.bin$")
+        self._lock = threading.Lock()
+
+        os.makedirs(persist_directory, exist_ok=True)
+        self._signature = self._log_signature()
+        self._data = self._load()
+
+        # 저장 형식 설정이 바뀌었으면 현재 설정으로 한 번 다시 저장
+        if self._data.ids and (self._data.dtype, self._data.rescore) != (self.dtype, self.rescore):
+            self._compact(self._data)
+
+    def _path(self, generation: int, kind: str) -> str:
+        """벡터 파일 경로 (kind: vectors, scales, full)"""
+        return f"{self._base}.{generation}.{kind}.bin"
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def _log_signature(self) -> Optional[Tuple[int, int]]:
+        """로그 파일 변경 감지용 (수정 시각, 크기)"""
+        try:
+            stat = os.stat(self._log_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def signature(self) -> Optional[Tuple[int, int]]:
+        """저장된 내용 변경 감지용 지문 (문서를 추가/교체/삭제할 때마다 바뀜)"""
+        return self._log_signature()
+
+    def _current(self) -> _IndexData:
+        """현재 스냅샷 (다른 프로세스가 로그를 변경했으면 다시 로드)"""
+        if self._log_signature() != self._signature:
+            with self._lock:
+                self._reload_if_changed()
+        return self._data
+
+    def _reload_if_changed(self):
+        """로그가 바뀌었으면 다시 로드 (잠금 안에서 호출)"""
+        signature = self._log_signature()
+        if signature != self._signature:
+            self._signature = signature
+            self._data = self._load()
+
+    def _empty(self) -> _IndexData:
+        return _IndexData(
+            None, None, None, [], [], [], np.zeros(0, dtype=bool), {}, self.dtype, self.rescore, None, 0, 0, 0, {}
+        )
+
+    @staticmethod
+    def _open(path: str, dtype: str, shape: Tuple[int, ...]) -> Optional[np.ndarray]:
+        """바이너리 파일을 읽기 전용 메모리 매핑으로 열기 (행이 없으면 None)"""
+        if shape[0] == 0 or not os.path.exists(path):
+            return None
+        return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+    def _load(self) -> _IndexData:
+        """
+        로그를 재생하여 인덱스 로드 (벡터는 메모리 매핑)
+
+        첫 줄은 저장 형식 헤더이고, 이후 줄은 추가된 행(같은 ID의 이전 행은 교체됨) 또는 삭제("delete")입니다.
+        중단된 쓰기로 남은 마지막 불완전한 줄은 무시합니다 (다음 쓰기에서 덮어씀).
+        """
+        if not os.path.exists(self._log_path):
+            return self._empty()
+
+        ids, documents, metadatas, alive, positions = [], [], [], [], {}
+        deleted = 0
+        with open(self._log_path, "rb") as f:
+            header = json.loads(f.readline())
+            log_bytes = f.tell()
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                record = json.loads(line)
+                log_bytes += len(line)
+                if "delete" in record:
+                    for doc_id in record["delete"]:
+                        if doc_id in positions:
+                            alive[positions.pop(doc_id)] = False
+                            deleted += 1
+                else:
+                    previous = positions.get(record["id"])
+                    if previous is not None:
+                        alive[previous] = False
+                        deleted += 1
+                    positions[record["id"]] = len(ids)
+                    documents.append(record["document"])
+                    metadatas.append(record["metadata"])
+                    ids.append(record["id"])
+                    alive.append(True)
+
+        rows, dim, generation = len(ids), header["dim"], header["generation"]
+        return _IndexData(
+            vectors=self._open(self._path(generation, "vectors"), header["dtype"], (rows, dim)),
+            scales=self._open(self._path(generation, "scales"), "float32", (rows,)) if header["dtype"] == "int8" else None,
+            full=self._open(self._path(generation, "full"), "float32", (rows, dim)) if header["rescore"] else None,
+            ids=ids,
+            documents=documents,
+            metadatas=metadatas,
+            alive=np.array(alive, dtype=bool),
+            positions=positions,
+            dtype=header["dtype"],
+            rescore=header["rescore"],
+            dim=dim,
+            generation=generation,
+            log_bytes=log_bytes,
+            deleted=deleted,
+            filter_rows={}
+        )
+
+    def _dense(self, data: _IndexData, rows: List[int]) -> np.ndarray:
+        """저장된 벡터 중 rows 행을 float32 행렬로 복원 (형식 변환 / 다시 저장 시 사용)"""
+        if data.vectors is None or not rows:
+            return np.empty((0, data.dim or 0), dtype=np.float32)
+        if data.full is not None:
+            return np.array(data.full[rows], dtype=np.float32)
+        if data.scales is not None:
+            return dequantize_int8(np.asarray(data.vectors[rows]), np.asarray(data.scales[rows]))
+        return np.array(data.vectors[rows], dtype=np.float32)
+
+    def _encode(self, matrix: np.ndarray, generation: int) -> Dict[str, np.ndarray]:
+        """float32 행렬을 설정된 저장 형식의 파일별 배열로 변환 (경로 → 배열)"""
+        arrays = {}
+        if self.dtype == "int8":
+            arrays[self._path(generation, "vectors")], arrays[self._path(generation, "scales")] = quantize_int8(matrix)
+        else:
+            arrays[self._path(generation, "vectors")] = matrix.astype(self.dtype)
+        if self.rescore:
+            arrays[self._path(generation, "full")] = matrix.astype(np.float32)
+        return arrays
+
+    @staticmethod
+    def _record(doc_id: str, document: str, metadata: Dict) -> bytes:
+        record = {"id": doc_id, "document": document, "metadata": metadata}
+        return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+    def _header(self, dim: int, generation: int) -> bytes:
+        header = {"dtype": self.dtype, "rescore": self.rescore, "dim": dim, "generation": generation}
+        return (json.dumps(header) + "\n").encode("utf-8")
+
+    def _compact(self, data: _IndexData):
+        """
+        유효한 행만 설정된 형식으로 새 파일 세트에 다시 저장한 뒤 로그를 교체하고 다시 로드
+
+        새 세트의 벡터 파일을 모두 쓴 다음 새 세트를 가리키는 로그로 교체하므로,
+        중간에 중단되어도 이전 로그와 이전 세트가 그대로 남습니다.
+        저장 형식 변경, 삭제 / 교체된 행이 많이 쌓였을 때만 사용합니다.
+        """
+        rows = np.flatnonzero(data.alive).tolist()
+        matrix = self._dense(data, rows)
+        generation = data.generation + 1
+
+        for path, array in self._encode(matrix, generation).items():
+            with open(path, "wb") as f:
+                f.write(np.ascontiguousarray(array).tobytes())
+        with open(f"{self._log_path}.tmp", "wb") as f:
+            f.write(self._header(data.dim or matrix.shape[1], generation))
+            for i in rows:
+                f.write(self._record(data.ids[i], data.documents[i], data.metadatas[i]))
+
+        # 새 세트로 전환 (마지막 단계)
+        os.replace(f"{self._log_path}.tmp", self._log_path)
+
+        # 이전 세트 파일 정리 (다른 프로세스가 열어 둔 메모리 매핑은 계속 유효)
+        for name in os.listdir(self.persist_directory):
+            match = self._file_pattern.match(name)
+            if match and int(match.group(1)) != generation:
+                os.remove(os.path.join(self.persist_directory, name))
+
+        self._signature = self._log_signature()
+        self._data = self._load()
+
+    @staticmethod
+    def _write_rows(path: str, array: np.ndarray, row: int):
+        """행 번호 위치부터 배열을 파일에 기록 (유효한 행 뒤, 중단된 쓰기로 남은 바이트는 덮어씀)"""
+        row_bytes = array[0].nbytes
+        with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+            f.seek(row * row_bytes)
+            f.write(np.ascontiguousarray(array).tobytes())
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> List[str]:
+        """
+        텍스트 임베딩 후 upsert
+
+        새 행은 항상 파일 끝에 추가하고, 같은 ID의 이전 행은 교체된 행으로 표시합니다
+        (기존 행은 덮어쓰지 않으므로 쓰기가 중단되거나 조회 중이어도 벡터와 문서가 어긋나지 않음).
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [uuid.uuid4().hex for _ in texts]
+
+        new_vectors = normalize(self._embedding.embed_documents(texts))
+
+        with self._lock:
+            self._reload_if_changed()
+            data = self._data
+            dim = data.dim or new_vectors.shape[1]
+            if new_vectors.shape[1] != dim:
+                raise ValueError(f"Embedding dimension mismatch: {new_vectors.shape[1]} != {dim}")
+
+            # 배치 안에서 같은 ID가 반복되면 마지막 값만 추가
+            batch = {}
+            for doc_id, text, metadata, vector in zip(ids, texts, metadatas, new_vectors):
+                batch.pop(doc_id, None)
+                batch[doc_id] = (text, metadata, vector)
+
+            # 벡터를 먼저 쓰고 로그를 기록 (로그에 기록된 행만 유효)
+            start = len(data.alive)
+            matrix = np.stack([vector for _, _, vector in batch.values()])
+            for path, array in self._encode(matrix, data.generation).items():
+                self._write_rows(path, array, start)
+
+            log = [] if os.path.exists(self._log_path) else [self._header(dim, data.generation)]
+            log.extend(self._record(doc_id, text, metadata) for doc_id, (text, metadata, _) in batch.items())
+            payload = b"".join(log)
+            self._append_log(data, payload)
+
+            # 목록은 끝에 추가만 하므로 이전 스냅샷이 보는 행(자신의 행 수까지)은 변하지 않고,
+            # 유효 여부는 새 배열로 기록
+            alive = np.concatenate([data.alive, np.ones(len(batch), dtype=bool)])
+            replaced = 0
+            for doc_id, (text, metadata, _) in batch.items():
+                previous = data.positions.get(doc_id)
+                if previous is not None:
+                    alive[previous] = False
+                    replaced += 1
+                data.positions[doc_id] = len(data.ids)
+                data.documents.append(text)
+                data.metadatas.append(metadata)
+                data.ids.append(doc_id)
+
+            rows = len(alive)
+            self._data = data._replace(
+                alive=alive,
+                vectors=self._open(self._path(data.generation, "vectors"), self.dtype, (rows, dim)),
+                scales=(
+                    self._open(self._path(data.generation, "scales"), "float32", (rows,))
+                    if self.dtype == "int8" else None
+                ),
+                full=self._open(self._path(data.generation, "full"), "float32", (rows, dim)) if self.rescore else None,
+                dim=dim,
+                log_bytes=data.log_bytes + len(payload),
+                deleted=data.deleted + replaced,
+                filter_rows={}
+            )
+            self._signature = self._log_signature()
+            self._compact_if_needed()
+
+        return ids
+
+    def _compact_if_needed(self):
+        """삭제 / 교체된 행 비율이 COMPACT_DELETED_RATIO를 넘으면 압축 (잠금 안에서 호출)"""
+        if self._data.deleted > COMPACT_DELETED_RATIO * len(self._data.alive):
+            self._compact(self._data)
+
+    def _append_log(self, data: _IndexData, payload: bytes):
+        """마지막으로 읽은 완전한 줄 뒤에 로그 기록 (중단된 쓰기로 남은 줄은 덮어씀)"""
+        with open(self._log_path, "r+b" if os.path.exists(self._log_path) else "wb") as f:
+            f.seek(data.log_bytes)
+            f.write(payload)
+            f.truncate()
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """
+        ID로 문서 삭제
+
+        삭제는 로그에 기록만 하고(행은 검색에서 제외), 삭제된 행 비율이
+        COMPACT_DELETED_RATIO를 넘으면 남은 행으로 인덱스를 다시 저장합니다.
+        """
+        if not ids:
+            return False
+
+        with self._lock:
+            self._reload_if_changed()
+            data = self._data
+            removed = [doc_id for doc_id in dict.fromkeys(ids) if doc_id in data.positions]
+            if not removed:
+                return False
+
+            payload = (json.dumps({"delete": removed}, ensure_ascii=False) + "\n").encode("utf-8")
+            self._append_log(data, payload)
+            # 조회 중인 이전 스냅샷이 바뀌지 않도록 유효 여부는 새 배열로 기록
+            alive = data.alive.copy()
+            for doc_id in removed:
+                alive[data.positions.pop(doc_id)] = False
+
+            self._data = data._replace(
+                alive=alive,
+                log_bytes=data.log_bytes + len(payload),
+                deleted=data.deleted + len(removed),
+                filter_rows={}
+            )
+            self._signature = self._log_signature()
+            self._compact_if_needed()
+        return True
+
+    def count(self) -> int:
+        """저장된 문서 수 (삭제된 행 제외)"""
+        data = self._current()
+        return len(data.alive) - data.deleted
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Chroma.get 과 같은 형식으로 저장된 문서 조회 (임베딩 호출 없음)"""
+        include = ["metadatas", "documents"] if include is None else include
+        data = self._current()
+        all_ids, documents, metadatas = data.ids, data.documents, data.metadatas
+
+        wanted = set(ids) if ids is not None else None
+        if wanted is not None and where is None:
+            # ID 조회는 전체 행을 순회하지 않음 (positions는 최신 스냅샷 기준이므로 잠금 안에서 조회)
+            with self._lock:
+                data = self._data
+                all_ids, documents, metadatas = data.ids, data.documents, data.metadatas
+                rows = sorted(data.positions[doc_id] for doc_id in wanted if doc_id in data.positions)
+        else:
+            rows = [
+                i for i in np.flatnonzero(data.alive).tolist()
+                if (wanted is None or all_ids[i] in wanted)
+                and (where is None or matches_where(metadatas[i], where))
+            ]
+
+        result = {"ids": [all_ids[i] for i in rows]}
+        if "documents" in include:
+            result["documents"] = [documents[i] for i in rows]
+        if "metadatas" in include:
+            result["metadatas"] = [metadatas[i] for i in rows]
+        return result
+
+    def _rows_matching(self, where: Optional[Dict[str, Any]], data: _IndexData) -> np.ndarray:
+        """where 조건에 맞고 삭제되지 않은 행 번호 (where가 None이면 삭제되지 않은 전체 행, 스냅샷의 조건별로 캐시)"""
+        key = json.dumps(where, ensure_ascii=False, sort_keys=True)
+        rows = data.filter_rows.get(key)
+        if rows is None:
+            # 메타데이터 목록은 이후 추가된 행까지 포함할 수 있으므로 스냅샷의 유효한 행만 확인
+            rows = np.flatnonzero(data.alive)
+            if where is not None:
+                rows = np.fromiter(
+                    (i for i in rows.tolist() if matches_where(data.metadatas[i], where)),
+                    dtype=np.int64
+                )
+            data.filter_rows[key] = rows
+        return rows
+
+    def _approximate_scores(self, data: _IndexData, rows: Optional[np.ndarray], query: np.ndarray) -> np.ndarray:
+        """저장 형식 벡터로 점수 계산 (블록 단위로 float32 변환)"""
+        matrix = data.vectors if rows is None else data.vectors[rows]
+        scores = np.empty(len(matrix), dtype=np.float32)
+        for start in range(0, len(matrix), _SCORE_BLOCK_ROWS):
+            block = np.asarray(matrix[start:start + _SCORE_BLOCK_ROWS], dtype=np.float32)
+            scores[start:start + len(block)] = block @ query
+
+        if data.scales is not None:
+            scores *= data.scales if rows is None else data.scales[rows]
+        return scores
+
+    def similarity_search_by_vector_with_score(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[Document, float]]:
+        """벡터로 top-k 검색 (점수: 코사인 유사도)"""
+        data = self._current()
+        if data.vectors is None or len(data.vectors) == 0 or k <= 0:
+            return []
+
+        query = normalize(embedding)
+
+        # 메타데이터 필터는 행렬 곱 전에 후보 행을 줄이는 방식으로 적용
+        rows = None
+        if filter or data.deleted:
+            rows = self._rows_matching(filter or None, data)
+            if len(rows) == 0:
+                return []
+
+        scores = self._approximate_scores(data, rows, query)
+        rows = rows if rows is not None else np.arange(len(scores))
+
+        # 재채점: 근사 점수 상위 후보만 float32 사본으로 다시 계산
+        if data.full is not None:
+            n_candidates = min(max(k, self.rescore_candidates), len(scores))
+            candidates = np.argpartition(-scores, n_candidates - 1)[:n_candidates]
+            rows = rows[candidates]
+            scores = np.asarray(data.full[rows], dtype=np.float32) @ query
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            (Document(page_content=data.documents[rows[i]], metadata=data.metadatas[rows[i]]), float(scores[i]))
+            for i in top
+        ]
+
+    def similarity_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> List[Document]:
+        """벡터로 top-k 문서 검색"""
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k, filter)]
+
+    def similarity_search_with_score(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        """쿼리로 top-k 검색 (점수 포함)"""
+        return self.similarity_search_by_vector_with_score(self._embedding.embed_query(query), k, filter)
+
+    def similarity_search(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> List[Document]:
+        """쿼리로 top-k 문서 검색"""
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filter)]
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        collection_name: str = "default",
+        persist_directory: str = "./data/numpy_index",
+        **kwargs: Any
+    ) -> "NumpyVectorStore":
+        """텍스트로부터 인덱스 생성 (dtype, rescore 등은 kwargs로 전달)"""
+        store = cls(collection_name, embedding, persist_directory, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
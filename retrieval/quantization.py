@@ -0,0 +1,57 @@
+from typing import List, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+# 지원하는 벡터 저장 형식
+VECTOR_DTYPES = ["float32", "float16", "int8"]
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2 정규화 (내적 = 코사인 유사도)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """행 단위 대칭 int8 양자화 (값 = int8 * scale)"""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+def dequantize_int8(quantized: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """int8 양자화 복원"""
+    return quantized.astype(np.float32) * scales[:, None]
+
+
+class TruncatedEmbeddings(Embeddings):
+    """
+    임베딩 차원 축소 래퍼
+
+    text-embedding-3 계열은 앞쪽 차원에 정보가 집중되어 있어(Matryoshka 학습),
+    앞 N개 차원만 잘라 다시 정규화해도 검색 품질이 크게 떨어지지 않습니다.
+    원본 임베딩(및 캐시)은 그대로 두고 저장/검색 차원만 줄입니다.
+    """
+
+    def __init__(self, embeddings: Embeddings, dimensions: int):
+        """
+        Args:
+            embeddings: 원본 임베딩 모델
+            dimensions: 유지할 차원 수
+        """
+        self.embeddings = embeddings
+        self.dimensions = dimensions
+
+    def _truncate(self, vectors: List[List[float]]) -> List[List[float]]:
+        return normalize(np.asarray(vectors, dtype=np.float32)[:, :self.dimensions]).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._truncate(self.embeddings.embed_documents(texts))
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._truncate([self.embeddings.embed_query(text)])[0]
@@ -1,45 +1,198 @@
 import streamlit as st
 from langchain_community.vectorstores import Chroma
 from langchain_core.documents import Document
-from typing import List, Optional
-from utils.config import get_embeddings
+from langchain_core.vectorstores import VectorStore
+from typing import Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+from retrieval.lexical import BM25Index, reciprocal_rank_fusion
+from utils.config import env_bool, env_int, get_embeddings
+import hashlib
+import json
 import os
+import threading
 
 
 # 벡터 스토어 저장 경로
 CHROMA_PERSIST_DIR = "./data/chroma_db"
+NUMPY_PERSIST_DIR = "./data/numpy_index"
+
+# Chroma 저장 파일 (문서 추가/수정/삭제가 커밋될 때마다 변경됨)
+CHROMA_DB_FILES = ["chroma.sqlite3", "chroma.sqlite3-wal"]
+
+# 벡터 스토어 백엔드 (chroma, numpy)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
+
+# 저장/검색 임베딩 차원 (0이면 모델 원본 차원 사용, 예: 256, 512, 1024)
+EMBEDDING_DIMENSIONS = env_int("EMBEDDING_DIMENSIONS", 0)
+
+# NumPy 백엔드 벡터 저장 형식과 정밀 재채점 설정
+VECTOR_DTYPE = os.getenv("VECTOR_DTYPE", "float32").lower()
+VECTOR_RESCORE = env_bool("VECTOR_RESCORE", False)
+VECTOR_RESCORE_CANDIDATES = env_int("VECTOR_RESCORE_CANDIDATES", 32)
+
+# 컬렉션 (저장 디렉토리 이름 → 컬렉션 이름)
+COLLECTIONS = {
+    "trends": "marketing_trends",
+    "practices": "best_practices",
+}
+
+# 내장 코퍼스 문서의 출처 표시 (메타데이터 "origin")
+SEED_ORIGIN = "seed"
+
+# 모범 사례 검색 결과를 미리 계산해 두는 채널과 개수
+SUPPORTED_CHANNELS = ["instagram", "blog", "email"]
+PRECOMPUTED_K = 4
+
+# 메타데이터 필터 검색 시 k 대비 후보 배수
+# (HNSW 필터 검색은 필터가 좁을수록 k개보다 적게 반환할 수 있어 여유 있게 조회)
+RETRIEVAL_OVERFETCH = env_int("RETRIEVAL_OVERFETCH", 2)
+
+# 검색 모드
+# - vector: 임베딩 유사도 검색
+# - hybrid: 벡터 검색 + BM25 결과를 RRF로 결합
+# - lexical: BM25만 사용 (쿼리 임베딩 호출 없음)
+RETRIEVAL_MODES = ["vector", "hybrid", "lexical"]
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "vector").lower()
+
+# 스토어별 변경 버전 (이 프로세스에서 문서를 추가/삭제할 때마다 증가)
+# (스토어 객체를 약한 참조 키로 사용하여 해제된 스토어의 항목은 함께 제거됨)
+_collection_versions: "WeakKeyDictionary[VectorStore, int]" = WeakKeyDictionary()
+_collection_versions_lock = threading.Lock()
+
+# 스토어별 BM25 색인 (컬렉션이 바뀔 때만 다시 생성)
+_lexical_indexes: "WeakKeyDictionary[VectorStore, Tuple[Tuple, BM25Index]]" = WeakKeyDictionary()
+_lexical_lock = threading.Lock()
+
+# 스토어별 채널별 모범 사례 검색 결과 테이블 (컬렉션이 바뀔 때만 다시 계산)
+_best_practice_tables: "WeakKeyDictionary[VectorStore, Tuple[Tuple, Dict[str, List[Document]]]]" = WeakKeyDictionary()
+_best_practice_lock = threading.Lock()
 
 
 @st.cache_resource
 def initialize_vector_stores():
-    """마케팅 트렌드와 모범 사례 벡터 스토어 초기화"""
-    
-    # 디렉토리 생성
-    os.makedirs(CHROMA_PERSIST_DIR, exist_ok=True)
+    """
+    마케팅 트렌드와 모범 사례 벡터 스토어 초기화
+
+    저장된 컬렉션은 임베딩 호출 없이 열고,
+    새로 추가되거나 내용이 바뀐 문서만 임베딩하여 upsert 합니다.
+    """
     
     embeddings = get_embeddings()
     
     # 1. 마케팅 트렌드 데이터
-    trend_documents = _create_trend_documents()
-    trend_store = Chroma.from_documents(
-        documents=trend_documents,
-        embedding=embeddings,
-        collection_name="marketing_trends",
-        persist_directory=f"{CHROMA_PERSIST_DIR}/trends"
-    )
+    trend_store = open_store(COLLECTIONS["trends"], "trends", embeddings)
+    sync_documents(trend_store, _create_trend_documents(), origin=SEED_ORIGIN)
     
     # 2. 채널별 모범 사례 데이터
-    best_practice_documents = _create_best_practice_documents()
-    practice_store = Chroma.from_documents(
-        documents=best_practice_documents,
-        embedding=embeddings,
-        collection_name="best_practices",
-        persist_directory=f"{CHROMA_PERSIST_DIR}/practices"
-    )
+    practice_store = open_store(COLLECTIONS["practices"], "practices", embeddings)
+    sync_documents(practice_store, _create_best_practice_documents(), origin=SEED_ORIGIN)
+    
+    # 3. 채널별 모범 사례 검색 결과 사전 계산
+    get_best_practice_table(practice_store)
     
     return trend_store, practice_store
 
 
+def open_store(collection_name: str, name: str, embeddings, backend: Optional[str] = None) -> VectorStore:
+    """
+    저장된 컬렉션 열기 (임베딩 호출 없음)
+    
+    Args:
+        collection_name: 컬렉션 이름
+        name: 저장 디렉토리 이름 (trends, practices)
+        embeddings: 임베딩 모델
+        backend: 벡터 스토어 백엔드 (기본값: VECTOR_BACKEND)
+    """
+    backend = backend or VECTOR_BACKEND
+    
+    # 차원 축소 시 원본 차원 컬렉션과 섞이지 않도록 컬렉션 이름을 분리
+    if EMBEDDING_DIMENSIONS:
+        from retrieval.quantization import TruncatedEmbeddings
+        embeddings = TruncatedEmbeddings(embeddings, EMBEDDING_DIMENSIONS)
+        collection_name = f"{collection_name}_d{EMBEDDING_DIMENSIONS}"
+    
+    if backend == "numpy":
+        # 선택 백엔드이므로 사용할 때만 import
+        from retrieval.numpy_store import NumpyVectorStore
+        return NumpyVectorStore(
+            collection_name=collection_name,
+            embedding_function=embeddings,
+            persist_directory=f"{NUMPY_PERSIST_DIR}/{name}",
+            dtype=VECTOR_DTYPE,
+            rescore=VECTOR_RESCORE,
+            rescore_candidates=VECTOR_RESCORE_CANDIDATES
+        )
+    
+    if backend != "chroma":
+        raise ValueError(f"Unknown VECTOR_BACKEND: {backend} (chroma, numpy)")
+    
+    os.makedirs(CHROMA_PERSIST_DIR, exist_ok=True)
+    return Chroma(
+        collection_name=collection_name,
+        embedding_function=embeddings,
+        persist_directory=f"{CHROMA_PERSIST_DIR}/{name}"
+    )
+
+
+def document_id(document: Document) -> str:
+    """문서 내용과 메타데이터로부터 안정적인 콘텐츠 해시 ID 생성"""
+    payload = json.dumps(
+        {"content": document.page_content, "metadata": document.metadata},
+        ensure_ascii=False,
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _is_content_id(doc_id: str) -> bool:
+    """콘텐츠 해시 ID 여부 (이전 버전은 uuid4 ID로 중복 저장됨)"""
+    return len(doc_id) == 64 and all(c in "0123456789abcdef" for c in doc_id)
+
+
+def sync_documents(store: VectorStore, documents: List[Document], origin: str) -> bool:
+    """
+    문서 목록을 컬렉션과 동기화 (멱등)
+    
+    - 새 문서 / 내용이 바뀐 문서만 임베딩하여 upsert
+    - 같은 origin에서 더 이상 존재하지 않는 문서와 이전 버전의 중복(uuid ID) 문서는 삭제
+    
+    Args:
+        store: 대상 벡터 스토어
+        documents: 동기화할 문서 목록
+        origin: 문서 출처 (같은 origin의 문서끼리만 정리 대상)
+        
+    Returns:
+        컬렉션 변경 여부
+    """
+    # ID는 원본 내용 기준으로 계산하고, 출처는 메타데이터에만 기록
+    desired = {}
+    for doc in documents:
+        desired[document_id(doc)] = Document(
+            page_content=doc.page_content,
+            metadata={**doc.metadata, "origin": origin}
+        )
+    
+    existing = store.get(include=["metadatas"])
+    existing_ids = set(existing["ids"])
+    stale_ids = [
+        doc_id
+        for doc_id, metadata in zip(existing["ids"], existing["metadatas"])
+        if not _is_content_id(doc_id)
+        or ((metadata or {}).get("origin") == origin and doc_id not in desired)
+    ]
+    new_ids = [doc_id for doc_id in desired if doc_id not in existing_ids]
+    
+    if stale_ids:
+        store.delete(ids=stale_ids)
+    if new_ids:
+        store.add_documents([desired[doc_id] for doc_id in new_ids], ids=new_ids)
+    
+    changed = bool(stale_ids or new_ids)
+    if changed:
+        mark_collection_changed(store)
+    return changed
+
+
 def _create_trend_documents() -> List[Document]:
     """마케팅 트렌드 문서 생성"""
     trends = [
@@ -208,29 +361,185 @@ def _create_best_practice_documents() -> List[Document]:
     ]
 
 
-def search_marketing_trends(query: str, k: int = 2) -> List[Document]:
-    """마케팅 트렌드 검색"""
+def search_marketing_trends(query: str, k: int = 2, mode: Optional[str] = None) -> List[Document]:
+    """
+    마케팅 트렌드 검색
+    
+    Args:
+        query: 검색 쿼리
+        k: 반환할 문서 수
+        mode: 검색 모드 (기본값: RETRIEVAL_MODE)
+    """
     trend_store, _ = initialize_vector_stores()
     try:
-        return trend_store.similarity_search(query, k=k)
+        return _search(trend_store, query, k, mode=mode)
     except Exception as e:
         st.error(f"트렌드 검색 중 오류: {str(e)}")
         return []
 
 
-def search_best_practices(channel: str, k: int = 2) -> List[Document]:
-    """채널별 모범 사례 검색"""
-    _, practice_store = initialize_vector_stores()
+def mark_collection_changed(store: VectorStore):
+    """
+    스토어 변경 기록 (BM25 색인 / 모범 사례 테이블 캐시 무효화)
+    
+    sync_documents와 적재 경로에서 문서를 추가/삭제한 뒤 호출합니다.
+    """
+    with _collection_versions_lock:
+        _collection_versions[store] = _collection_versions.get(store, 0) + 1
+
+
+def _collection_count(store: VectorStore) -> int:
+    """저장된 문서 수 (전체 ID 목록을 읽지 않음)"""
+    if hasattr(store, "count"):
+        return store.count()
+    collection = getattr(store, "_collection", None)
+    if collection is not None:
+        return collection.count()
+    return len(store.get(include=[])["ids"])
+
+
+def _storage_signature(store: VectorStore) -> Tuple:
+    """저장 파일의 (수정 시각, 크기) 목록 (문서 수가 같은 내용 변경 감지용)"""
+    if hasattr(store, "signature"):
+        return (store.signature(),)
+    directory = getattr(store, "_persist_directory", None)
+    if not directory:
+        return ()
+    signature = []
+    for name in CHROMA_DB_FILES:
+        try:
+            stat = os.stat(os.path.join(directory, name))
+        except FileNotFoundError:
+            continue
+        signature.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def _collection_fingerprint(store: VectorStore) -> Tuple:
+    """
+    컬렉션 변경 감지용 지문 (임베딩 호출 없음, 검색마다 호출되므로 O(1))
+    
+    이 프로세스의 변경은 버전으로, 다른 프로세스의 적재(python -m retrieval.ingest)는
+    문서 수와 저장 파일의 수정 시각 / 크기로 감지합니다 (같은 수의 문서 교체 포함).
+    """
+    with _collection_versions_lock:
+        version = _collection_versions.get(store, 0)
+    return version, _collection_count(store), _storage_signature(store)
+
+
+def get_lexical_index(store: VectorStore) -> BM25Index:
+    """스토어에 저장된 문서로 BM25 색인 생성 (컬렉션이 바뀐 경우에만 재생성)"""
+    fingerprint = _collection_fingerprint(store)
+    
+    with _lexical_lock:
+        cached = _lexical_indexes.get(store)
+        if cached is None or cached[0] != fingerprint:
+            stored = store.get(include=["documents", "metadatas"])
+            index = BM25Index(stored["documents"], [metadata or {} for metadata in stored["metadatas"]])
+            cached = (fingerprint, index)
+            _lexical_indexes[store] = cached
+        return cached[1]
+
+
+def _search(
+    store: VectorStore,
+    query: str,
+    k: int,
+    filter: Optional[Dict] = None,
+    mode: Optional[str] = None
+) -> List[Document]:
+    """검색 모드에 따라 벡터 / BM25 / 하이브리드 검색"""
+    mode = mode or RETRIEVAL_MODE
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(f"Unknown RETRIEVAL_MODE: {mode} ({', '.join(RETRIEVAL_MODES)})")
+    
+    if mode == "vector":
+        return store.similarity_search(query, k=k, filter=filter)
+    
+    fetch_k = k * RETRIEVAL_OVERFETCH
+    lexical = [doc for doc, _ in get_lexical_index(store).search(query, k=fetch_k, where=filter)]
+    if mode == "lexical":
+        return lexical[:k]
+    
+    vector = store.similarity_search(query, k=fetch_k, filter=filter)
+    return reciprocal_rank_fusion([vector, lexical], k)
+
+
+def _channel_filter(channel: str) -> Dict:
+    """해당 채널 또는 일반(general) 문서만 조회하는 메타데이터 필터"""
+    return {"channel": {"$in": [channel, "general"]}}
+
+
+def _query_best_practices(
+    practice_store: VectorStore,
+    channel: str,
+    k: int,
+    fetch_k: Optional[int] = None,
+    mode: Optional[str] = None
+) -> List[Document]:
+    """
+    모범 사례 검색 (vector/hybrid 모드는 쿼리 임베딩 호출 포함)
+    
+    채널 필터는 벡터 스토어 쿼리에서 적용하고, 일치하는 문서가 없을 때만
+    필터 없는 결과로 대체합니다.
+    
+    Args:
+        practice_store: 모범 사례 벡터 스토어
+        channel: 마케팅 채널
+        k: 반환할 문서 수
+        fetch_k: 필터 검색 시 조회할 후보 수 (기본값: k * RETRIEVAL_OVERFETCH)
+        mode: 검색 모드 (기본값: RETRIEVAL_MODE)
+    """
     query = f"{channel} 마케팅 모범 사례 콘텐츠 구조"
+    fetch_k = max(fetch_k or k * RETRIEVAL_OVERFETCH, k)
+    
+    results = _search(practice_store, query, fetch_k, filter=_channel_filter(channel), mode=mode)
+    if results:
+        return results[:k]
+    return _search(practice_store, query, k, mode=mode)
+
+
+def get_best_practice_table(practice_store: VectorStore) -> Dict[str, List[Document]]:
+    """
+    채널별 모범 사례 검색 결과 테이블 반환
+    
+    스토어별로 캐시하며, 컬렉션 지문이 바뀐 경우에만 지원 채널 전체를 다시 검색합니다.
+    """
+    fingerprint = _collection_fingerprint(practice_store)
+    
+    with _best_practice_lock:
+        cached = _best_practice_tables.get(practice_store)
+        if cached is None or cached[0] != fingerprint:
+            results = {
+                channel: _query_best_practices(practice_store, channel, PRECOMPUTED_K)
+                for channel in SUPPORTED_CHANNELS
+            }
+            cached = (fingerprint, results)
+            _best_practice_tables[practice_store] = cached
+        return cached[1]
+
+
+def search_best_practices(
+    channel: str,
+    k: int = 2,
+    fetch_k: Optional[int] = None,
+    mode: Optional[str] = None
+) -> List[Document]:
+    """
+    채널별 모범 사례 검색
+    
+    Args:
+        channel: 마케팅 채널
+        k: 반환할 문서 수
+        fetch_k: 필터 검색 시 조회할 후보 수 (지정 시 사전 계산 테이블을 사용하지 않음)
+        mode: 검색 모드 (지정 시 사전 계산 테이블을 사용하지 않음)
+    """
+    _, practice_store = initialize_vector_stores()
     try:
-        # 채널별 필터링
-        results = practice_store.similarity_search(query, k=k)
-        # 해당 채널 또는 일반(general) 문서만 필터링
-        filtered = [
-            doc for doc in results 
-            if doc.metadata.get("channel") == channel or doc.metadata.get("channel") == "general"
-        ]
-        return filtered if filtered else results
+        # 지원 채널은 사전 계산된 테이블에서 조회 (임베딩/검색 호출 없음)
+        if channel in SUPPORTED_CHANNELS and k <= PRECOMPUTED_K and fetch_k is None and mode is None:
+            return get_best_practice_table(practice_store)[channel][:k]
+        return _query_best_practices(practice_store, channel, k, fetch_k, mode)
     except Exception as e:
         st.error(f"모범 사례 검색 중 오류: {str(e)}")
         return []
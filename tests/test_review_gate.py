@@ -0,0 +1,44 @@
+import pytest
+
+from workflow.review_gate import CTA_PATTERN, check_draft
+
+
+# CTA로 보면 안 되는 문장 (CTA 동사/단어만 등장)
+CTA_FAIL_FIXTURES = [
+    "지금 이 순간에도 원두 향이 가득한 작은 카페입니다.",
+    "오픈 후 방문객이 두 배로 늘었습니다. 감사한 마음뿐이에요.",
+    "올해부터 예약 시스템을 도입해 대기 시간이 줄었습니다.",
+    "가장 문의가 많았던 메뉴는 바로 시그니처 라떼입니다.",
+    "링크드인에서 소개된 우리 가게 이야기, 구독자 여러분 덕분입니다.",
+]
+
+# CTA로 봐야 하는 문장 (행동 권유/요청, 링크/DM 안내)
+CTA_PASS_FIXTURES = [
+    "이번 주말, 창가 자리를 미리 예약하세요!",
+    "궁금한 점은 언제든 문의 주세요.",
+    "자세한 메뉴는 프로필 링크에서 확인할 수 있어요.",
+    "DM으로 예약 가능합니다.",
+    "신메뉴가 궁금하다면 지금 바로 방문해 주세요.",
+    "👉 https://example.com/event",
+]
+
+
+@pytest.mark.parametrize("text", CTA_FAIL_FIXTURES)
+def test_cta_pattern_rejects_incidental_words(text):
+    assert not CTA_PATTERN.search(text)
+
+
+@pytest.mark.parametrize("text", CTA_PASS_FIXTURES)
+def test_cta_pattern_accepts_calls_to_action(text):
+    assert CTA_PATTERN.search(text)
+
+
+def test_check_draft_reports_missing_cta():
+    assert check_draft("email", CTA_FAIL_FIXTURES[0]) == [
+        "행동 유도(CTA) 문구가 없습니다",
+        "이메일 제목이 없습니다",
+    ]
+
+
+def test_check_draft_passes_email_with_subject_and_cta():
+    assert check_draft("email", f"제목: 주말 특가 안내\n\n{CTA_PASS_FIXTURES[0]}") == []
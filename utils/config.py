@@ -1,33 +1,270 @@
 import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
 from dotenv import load_dotenv
 from langchain_openai import AzureChatOpenAI, AzureOpenAIEmbeddings
 from langfuse import Langfuse
+from utils.embedding_cache import CachedEmbeddings, EmbeddingCacheStore
+from utils.model_tiers import FAST, MODEL_TIERS, STANDARD
+from utils.rate_limiter import RateLimitedTransport, RateLimiter
 
 # .env 파일에서 환경 변수 로드
 load_dotenv()
 
 
-def get_llm(temperature: float = 0.7):
-    """LLM 인스턴스 반환 - Azure OpenAI 사용"""
-    return AzureChatOpenAI(
-        openai_api_key=os.getenv("AOAI_API_KEY"),
-        azure_endpoint=os.getenv("AOAI_ENDPOINT"),
-        azure_deployment=os.getenv("AOAI_DEPLOY_GPT4O"),
-        api_version=os.getenv("AOAI_API_VERSION"),
-        temperature=temperature,
+def env_bool(name: str, default: bool = False) -> bool:
+    """불리언 환경변수 읽기"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_int(name: str, default: int) -> int:
+    """정수 환경변수 읽기"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return int(value)
+
+
+def env_float(name: str, default: float) -> float:
+    """실수 환경변수 읽기"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return float(value)
+
+
+_http_client = None
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+_llm_pool: Dict[Tuple, AzureChatOpenAI] = {}
+_llm_pool_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """
+    프로세스 전역 HTTP 클라이언트 반환
+    
+    모든 LLM / Embeddings 클라이언트가 하나의 커넥션 풀을 공유하여
+    keep-alive 연결을 재사용합니다 (매 호출 TLS 핸드셰이크 방지).
+    """
+    global _http_client
+    with _llm_pool_lock:
+        if _http_client is None:
+            transport = httpx.HTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=env_int("LLM_MAX_CONNECTIONS", 20),
+                    max_keepalive_connections=env_int("LLM_MAX_KEEPALIVE_CONNECTIONS", 10),
+                ),
+            )
+            if env_bool("RATE_LIMIT", True):
+                transport = RateLimitedTransport(transport, get_rate_limiter())
+            _http_client = httpx.Client(
+                transport=transport,
+                timeout=httpx.Timeout(
+                    env_float("LLM_TIMEOUT", 120.0),
+                    connect=env_float("LLM_CONNECT_TIMEOUT", 10.0),
+                ),
+            )
+        return _http_client
+
+
+def _env_suffix(name: str) -> str:
+    """환경변수 이름 접미사 (대문자로, 영문/숫자 외 문자는 _로 변환)"""
+    return re.sub(r"[^A-Z0-9]", "_", name.upper())
+
+
+def _deployment_limits(deployment: str) -> Tuple[float, float]:
+    """
+    배포별 (RPM, TPM) 한도
+    
+    RATE_LIMIT_RPM_<배포 이름> / RATE_LIMIT_TPM_<배포 이름> 이 있으면 우선 사용합니다.
+    """
+    suffix = _env_suffix(deployment)
+    return (
+        env_float(f"RATE_LIMIT_RPM_{suffix}", env_float("RATE_LIMIT_RPM", 0.0)),
+        env_float(f"RATE_LIMIT_TPM_{suffix}", env_float("RATE_LIMIT_TPM", 0.0)),
+    )
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    프로세스 전역 Azure 호출 제한기 반환
+    
+    공유 HTTP 클라이언트의 전송 계층에 연결되어, 모든 Streamlit 세션과
+    배치 작업의 LLM / Embeddings 호출이 배포별 RPM / TPM 한도를 함께 나눠 씁니다.
+    호출 우선순위는 utils.rate_limiter.priority_scope 로 지정합니다.
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(
+                limits=_deployment_limits,
+                completion_tokens=env_int("RATE_LIMIT_COMPLETION_TOKENS", 1000),
+                interactive_reserve=env_float("RATE_LIMIT_INTERACTIVE_RESERVE", 0.2)
+            )
+        return _rate_limiter
+
+
+def get_llm(
+    temperature: float = 0.7,
+    deployment: Optional[str] = None,
+    max_tokens: Optional[int] = None
+):
+    """
+    LLM 인스턴스 반환 - Azure OpenAI 사용
+    
+    배포 이름과 파라미터별로 프로세스 전역 인스턴스를 재사용합니다.
+    인스턴스는 상태가 없으므로 스레드 / Streamlit 세션 간에 공유해도 안전합니다.
+    
+    Args:
+        temperature: 샘플링 온도
+        deployment: 배포 이름 (기본값: AOAI_DEPLOY_GPT4O)
+        max_tokens: 최대 출력 토큰 수
+    """
+    deployment = deployment or os.getenv("AOAI_DEPLOY_GPT4O")
+    key = (deployment, temperature, max_tokens)
+    
+    llm = _llm_pool.get(key)
+    if llm is not None:
+        return llm
+    
+    http_client = get_http_client()
+    with _llm_pool_lock:
+        if key not in _llm_pool:
+            _llm_pool[key] = AzureChatOpenAI(
+                openai_api_key=os.getenv("AOAI_API_KEY"),
+                azure_endpoint=os.getenv("AOAI_ENDPOINT"),
+                azure_deployment=deployment,
+                api_version=os.getenv("AOAI_API_VERSION"),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                max_retries=env_int("LLM_MAX_RETRIES", 2),
+                http_client=http_client,
+            )
+        return _llm_pool[key]
+
+
+def tier_deployment(tier: str) -> Optional[str]:
+    """모델 등급의 배포 이름 (fast 배포가 없으면 standard 배포 사용)"""
+    if tier == FAST:
+        return os.getenv("AOAI_DEPLOY_FAST") or os.getenv("AOAI_DEPLOY_GPT4O")
+    return os.getenv("AOAI_DEPLOY_GPT4O")
+
+
+def _env_list(name: str, default: str) -> List[str]:
+    """쉼표로 구분한 목록 환경변수 읽기"""
+    return [item.strip() for item in os.getenv(name, default).split(",") if item.strip()]
+
+
+def route_tier(role: str, brief: Dict[str, Any]) -> Optional[str]:
+    """
+    브리프 크기 / 채널로 모델 등급 선택 (LLM_ROUTING=true일 때)
+    
+    LLM_ROUTING_ROLES 에 있는 에이전트는 브리프가 짧고
+    (비즈니스명 + 특징 + 타겟 고객이 LLM_ROUTING_MAX_BRIEF_CHARS 이하)
+    모든 채널이 LLM_ROUTING_FAST_CHANNELS 에 있으면 fast, 아니면 standard 등급을 사용합니다.
+    
+    Returns:
+        모델 등급 또는 None (라우팅하지 않으면 에이전트 설정 사용)
+    """
+    if not env_bool("LLM_ROUTING", False):
+        return None
+    if role not in _env_list("LLM_ROUTING_ROLES", "STRATEGY_AGENT,REVIEW_AGENT"):
+        return None
+    
+    size = sum(
+        len(str(brief.get(field) or ""))
+        for field in ("business_name", "business_features", "target_customer")
     )
+    channels = brief.get("channels") or [brief.get("channel")]
+    fast_channels = _env_list("LLM_ROUTING_FAST_CHANNELS", "instagram,email")
+    
+    if size <= env_int("LLM_ROUTING_MAX_BRIEF_CHARS", 300) and all(c in fast_channels for c in channels):
+        return FAST
+    return STANDARD
+
+
+def llm_settings(role: str, brief: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    에이전트별 LLM 설정
+    
+    - LLM_TIER_<역할>: 모델 등급 (기본값: standard)
+    - LLM_DEPLOYMENT_<역할>: 배포 이름 (기본값: 등급의 배포)
+    - LLM_TEMPERATURE_<역할>: 샘플링 온도 (기본값: 0.7)
+    - LLM_MAX_TOKENS_<역할>: 최대 출력 토큰 수 (기본값: 0, 제한 없음)
+    
+    라우팅이 등급을 선택하면 그 등급의 배포를 사용합니다.
+    
+    Args:
+        role: 에이전트 역할 (예: REVIEW_AGENT)
+        brief: 라우팅에 사용할 브리프 (ContentState)
+        
+    Returns:
+        {"tier", "deployment", "temperature", "max_tokens"}
+    """
+    suffix = _env_suffix(role)
+    routed = route_tier(role, brief) if brief is not None else None
+    tier = routed or os.getenv(f"LLM_TIER_{suffix}", STANDARD).lower()
+    if tier not in MODEL_TIERS:
+        raise ValueError(f"Unknown LLM_TIER_{suffix}: {tier} ({', '.join(MODEL_TIERS)})")
+    
+    deployment = tier_deployment(tier) if routed else (
+        os.getenv(f"LLM_DEPLOYMENT_{suffix}") or tier_deployment(tier)
+    )
+    return {
+        "tier": tier,
+        "deployment": deployment,
+        "temperature": env_float(f"LLM_TEMPERATURE_{suffix}", 0.7),
+        "max_tokens": env_int(f"LLM_MAX_TOKENS_{suffix}", 0) or None,
+    }
 
 
 def get_embeddings():
-    """Embeddings 인스턴스 반환 - Azure OpenAI 사용"""
-    return AzureOpenAIEmbeddings(
-        model=os.getenv("AOAI_DEPLOY_EMBED_3_LARGE"),
+    """
+    Embeddings 인스턴스 반환 - Azure OpenAI 사용
+    
+    EMBEDDING_CACHE가 꺼져 있지 않으면 디스크 캐시 래퍼를 씌워 반환합니다.
+    """
+    deployment = os.getenv("AOAI_DEPLOY_EMBED_3_LARGE")
+    embeddings = AzureOpenAIEmbeddings(
+        model=deployment,
         openai_api_version=os.getenv("AOAI_API_VERSION"),
         api_key=os.getenv("AOAI_API_KEY"),
         azure_endpoint=os.getenv("AOAI_ENDPOINT"),
+        http_client=get_http_client(),
+    )
+    
+    if not env_bool("EMBEDDING_CACHE", True):
+        return embeddings
+    
+    return CachedEmbeddings(
+        embeddings,
+        store=get_embedding_cache(),
+        namespace=deployment or "default"
     )
 
 
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCacheStore:
+    """프로세스 전역 임베딩 캐시 저장소 반환"""
+    global _embedding_cache
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            _embedding_cache = EmbeddingCacheStore(
+                path=os.getenv("EMBEDDING_CACHE_PATH", "./data/embedding_cache.db"),
+                max_entries=env_int("EMBEDDING_CACHE_MAX_ENTRIES", 100_000)
+            )
+        return _embedding_cache
+
+
 def get_langfuse():
     """Langfuse 인스턴스 반환 (선택사항)"""
     secret_key = os.getenv("LANGFUSE_SECRET_KEY")
@@ -0,0 +1,164 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List
+
+from langchain_core.embeddings import Embeddings
+
+
+# SQLite 변수 개수 제한(999)을 넘지 않도록 나누어 조회
+_QUERY_CHUNK_SIZE = 500
+
+
+class EmbeddingCacheStore:
+    """SQLite 기반 임베딩 저장소 (크기 제한 LRU)"""
+
+    def __init__(self, path: str, max_entries: int = 100_000):
+        """
+        Args:
+            path: SQLite 파일 경로
+            max_entries: 최대 저장 개수 (초과 시 가장 오래 사용되지 않은 항목부터 삭제)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """저장된 벡터 조회 (조회된 항목은 최근 사용 시각 갱신)"""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+
+        with self._lock:
+            for start in range(0, len(keys), _QUERY_CHUNK_SIZE):
+                chunk = keys[start:start + _QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+
+        return found
+
+    def put_many(self, vectors: Dict[str, List[float]]):
+        """벡터 저장 후 최대 개수를 넘으면 LRU 삭제"""
+        if not vectors:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                [(key, array("f", vector).tobytes(), now) for key, vector in vectors.items()]
+            )
+
+            count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN ("
+                    "SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self.evictions += overflow
+
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        """캐시 적중/미스 통계"""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "size": size,
+                "max_entries": self.max_entries,
+            }
+
+
+class CachedEmbeddings(Embeddings):
+    """임베딩 캐시 래퍼 - 배포 이름 + 텍스트 해시를 키로 사용"""
+
+    def __init__(self, embeddings: Embeddings, store: EmbeddingCacheStore, namespace: str):
+        """
+        Args:
+            embeddings: 실제 임베딩 모델
+            store: 임베딩 저장소
+            namespace: 캐시 키 접두어 (임베딩 배포 이름)
+        """
+        self.embeddings = embeddings
+        self.store = store
+        self.namespace = namespace
+
+    def _key(self, text: str) -> str:
+        """캐시 키 생성"""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{digest}"
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """문서 임베딩 (캐시에 없는 텍스트만 API 호출)"""
+        keys = [self._key(text) for text in texts]
+        vectors = self.store.get_many(keys)
+
+        # 캐시 미스 텍스트만 중복 없이 임베딩
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+
+        if missing:
+            embedded = self.embeddings.embed_documents(list(missing.values()))
+            new_vectors = dict(zip(missing.keys(), embedded))
+            self.store.put_many(new_vectors)
+            vectors.update(new_vectors)
+
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """검색 쿼리 임베딩"""
+        key = self._key(text)
+        vectors = self.store.get_many([key])
+        if key in vectors:
+            return vectors[key]
+
+        vector = self.embeddings.embed_query(text)
+        self.store.put_many({key: vector})
+        return vector
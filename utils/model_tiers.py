@@ -0,0 +1,64 @@
+import threading
+from collections import deque
+from typing import Any, Deque, Dict
+
+
+# 모델 등급 (standard: AOAI_DEPLOY_GPT4O, fast: AOAI_DEPLOY_FAST)
+STANDARD = "standard"
+FAST = "fast"
+MODEL_TIERS = [STANDARD, FAST]
+
+# 등급별 지연 시간 표본 수 (p95 계산용)
+_LATENCY_SAMPLES = 1000
+
+
+class TierStats:
+    """모델 등급별 LLM 호출 통계 (프로세스 전체, 캐시 적중 제외)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tiers: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, tier: str, latency_ms: float, input_tokens: int, output_tokens: int):
+        """
+        LLM 호출 결과 기록
+
+        Args:
+            tier: 모델 등급
+            latency_ms: 응답 완료까지 걸린 시간 (ms)
+            input_tokens: 입력 토큰 수
+            output_tokens: 출력 토큰 수
+        """
+        with self._lock:
+            stats = self._tiers.setdefault(tier, {
+                "calls": 0,
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "latencies": deque(maxlen=_LATENCY_SAMPLES),
+            })
+            stats["calls"] += 1
+            stats["input_tokens"] += input_tokens
+            stats["output_tokens"] += output_tokens
+            stats["latencies"].append(latency_ms)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """등급별 {"calls", "avg_latency_ms", "p95_latency_ms", "input_tokens", "output_tokens", "ms_per_output_token"}"""
+        with self._lock:
+            result = {}
+            for tier, stats in self._tiers.items():
+                latencies: Deque[float] = stats["latencies"]
+                ordered = sorted(latencies)
+                result[tier] = {
+                    "calls": stats["calls"],
+                    "avg_latency_ms": sum(ordered) / len(ordered),
+                    "p95_latency_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                    "input_tokens": stats["input_tokens"],
+                    "output_tokens": stats["output_tokens"],
+                    "ms_per_output_token": (
+                        sum(ordered) / stats["output_tokens"] if stats["output_tokens"] else 0.0
+                    ),
+                }
+            return result
+
+
+tier_stats = TierStats()
@@ -0,0 +1,369 @@
+import json
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import httpx
+
+
+# Azure OpenAI 요청 경로에서 배포 이름 추출 (/openai/deployments/{name}/...)
+_DEPLOYMENT_PATTERN = re.compile(r"/deployments/([^/]+)/")
+
+# 429 응답 시 처리율 감소 비율 / 정상 응답마다 회복량 / 최소 처리율
+_BACKOFF_FACTOR = 0.5
+_RECOVERY_STEP = 0.05
+_MIN_SCALE = 0.1
+
+
+# 우선순위 클래스 (앞에 있을수록 먼저 처리)
+INTERACTIVE = "interactive"
+BATCH = "batch"
+BACKGROUND = "background"
+PRIORITIES = [INTERACTIVE, BATCH, BACKGROUND]
+
+# 클래스별 대기 시간 표본 수 (p95 계산용)
+_WAIT_SAMPLES = 1000
+
+_scope = threading.local()
+
+
+@contextmanager
+def priority_scope(priority: Optional[str] = None, owner: Optional[str] = None):
+    """
+    현재 스레드의 Azure 호출 우선순위 지정
+
+    Args:
+        priority: 우선순위 클래스 (기본값: interactive)
+        owner: 같은 클래스 안에서 공정하게 나눌 단위 (예: 실행 ID)
+    """
+    previous = getattr(_scope, "value", None)
+    priority = priority or INTERACTIVE
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority: {priority} ({', '.join(PRIORITIES)})")
+    _scope.value = (priority, owner or priority)
+    try:
+        yield
+    finally:
+        _scope.value = previous
+
+
+def current_priority() -> Tuple[str, str]:
+    """현재 스레드의 (우선순위, owner) 반환 (지정되지 않았으면 interactive)"""
+    return getattr(_scope, "value", None) or (INTERACTIVE, INTERACTIVE)
+
+
+class TokenBucket:
+    """분당 한도 토큰 버킷"""
+
+    def __init__(self, per_minute: float):
+        """
+        Args:
+            per_minute: 분당 허용량 (0 이하면 무제한)
+        """
+        self.per_minute = per_minute
+        self.available = per_minute
+        self.updated = time.monotonic()
+
+    def refill(self, now: float, scale: float):
+        if self.per_minute > 0:
+            rate = self.per_minute * scale / 60.0
+            self.available = min(self.per_minute, self.available + (now - self.updated) * rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, reserve: float, scale: float) -> float:
+        """
+        amount 를 쓰고도 reserve 비율만큼 남을 때까지의 대기 시간(초)
+
+        한도보다 큰 요청은 한도만큼 채워지면 허용합니다.
+        """
+        if self.per_minute <= 0:
+            return 0.0
+        needed = min(amount, self.per_minute * (1 - reserve)) + self.per_minute * reserve
+        deficit = needed - self.available
+        return max(0.0, deficit / (self.per_minute * scale / 60.0))
+
+    def take(self, amount: float):
+        if self.per_minute > 0:
+            self.available -= min(amount, self.available)
+
+
+class _Waiter:
+    __slots__ = ("tokens", "priority", "owner")
+
+    def __init__(self, tokens: int, priority: str, owner: str):
+        self.tokens = tokens
+        self.priority = priority
+        self.owner = owner
+
+
+class DeploymentLimiter:
+    """
+    배포 하나의 RPM / TPM 제한, 우선순위 스케줄링과 적응형 백오프
+
+    - 높은 우선순위 클래스의 대기 호출이 항상 먼저 처리됩니다.
+    - 같은 클래스 안에서는 owner(실행) 단위로 돌아가며 처리하여,
+      호출이 많은 실행 하나가 다른 실행을 밀어내지 않도록 합니다.
+    - interactive 외 클래스는 버킷의 reserve 비율을 남겨 두어야 하므로,
+      대량 배치 중에도 interactive 호출이 바로 쓸 수 있는 한도가 유지됩니다.
+    """
+
+    def __init__(self, rpm: float, tpm: float, reserve: float = 0.0):
+        """
+        Args:
+            rpm: 분당 요청 수 한도 (0 이하면 무제한)
+            tpm: 분당 토큰 수 한도 (0 이하면 무제한)
+            reserve: interactive 전용으로 남겨 둘 한도 비율 (0~1)
+        """
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.reserve = reserve
+        self.scale = 1.0  # 429 이후 낮아졌다가 정상 응답마다 회복되는 처리율 비율
+        self.blocked_until = 0.0
+
+        # 우선순위 → owner → 대기 호출 (owner 순서가 돌아가며 처리되는 순서)
+        self._queues: Dict[str, "OrderedDict[str, Deque[_Waiter]]"] = {
+            priority: OrderedDict() for priority in PRIORITIES
+        }
+        self.waiting = 0
+        self.max_waiting = 0
+        self.calls = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._waits: Dict[str, Deque[float]] = {
+            priority: deque(maxlen=_WAIT_SAMPLES) for priority in PRIORITIES
+        }
+
+        self._condition = threading.Condition()
+
+    def _head(self) -> Optional[_Waiter]:
+        """다음에 처리할 대기 호출"""
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            if queue:
+                return next(iter(queue.values()))[0]
+        return None
+
+    def _dequeue(self, waiter: _Waiter):
+        """처리된 호출 제거 후 해당 owner를 같은 클래스의 맨 뒤로 이동"""
+        queue = self._queues[waiter.priority]
+        waiters = queue.pop(waiter.owner)
+        waiters.popleft()
+        if waiters:
+            queue[waiter.owner] = waiters
+
+    def _remove(self, waiter: _Waiter):
+        """대기 중 예외로 빠져나간 호출 제거 (owner의 순서는 유지)"""
+        queue = self._queues[waiter.priority]
+        waiters = queue.get(waiter.owner)
+        if waiters is None or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        if not waiters:
+            del queue[waiter.owner]
+
+    def acquire(self, tokens: int, priority: str = INTERACTIVE, owner: Optional[str] = None):
+        """요청 전 호출: 차례가 오고 한도 안에 들어올 때까지 대기"""
+        waiter = _Waiter(tokens, priority, owner or priority)
+        start = time.monotonic()
+
+        with self._condition:
+            self._queues[priority].setdefault(waiter.owner, deque()).append(waiter)
+            self.calls += 1
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+            self._condition.notify_all()
+
+            acquired = False
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self.blocked_until > now:
+                        self._condition.wait(self.blocked_until - now)
+                        continue
+
+                    if self._head() is not waiter:
+                        self._condition.wait()
+                        continue
+
+                    self.requests.refill(now, self.scale)
+                    self.tokens.refill(now, self.scale)
+                    reserve = 0.0 if priority == INTERACTIVE else self.reserve
+                    wait = max(
+                        self.requests.wait_time(1, reserve, self.scale),
+                        self.tokens.wait_time(tokens, reserve, self.scale),
+                    )
+                    if wait > 0:
+                        # 더 높은 우선순위 호출이 들어오면 깨어나 다시 판단
+                        self._condition.wait(wait)
+                        continue
+
+                    self.requests.take(1)
+                    self.tokens.take(tokens)
+                    self._dequeue(waiter)
+                    acquired = True
+                    self._condition.notify_all()
+                    break
+            finally:
+                # 대기 중 예외(중단 등)가 나도 대기열에 남아 같은 클래스를 막지 않도록 제거
+                if not acquired:
+                    self._remove(waiter)
+                    self._condition.notify_all()
+                self.waiting -= 1
+
+            waited = time.monotonic() - start
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            self._waits[priority].append(waited)
+
+    def on_response(self, status_code: int, headers: httpx.Headers):
+        """응답 후 호출: 429면 Retry-After 동안 모든 호출을 멈추고 처리율을 낮춤"""
+        with self._condition:
+            if status_code == 429:
+                self.throttled += 1
+                self.scale = max(_MIN_SCALE, self.scale * _BACKOFF_FACTOR)
+                retry_after = _retry_after_seconds(headers)
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            elif status_code < 400:
+                self.scale = min(1.0, self.scale + _RECOVERY_STEP)
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """대기열 길이 / 대기 시간 / 429 횟수 통계 (우선순위 클래스별 대기 시간 포함)"""
+        with self._condition:
+            by_priority = {}
+            for priority, waits in self._waits.items():
+                if waits:
+                    ordered = sorted(waits)
+                    by_priority[priority] = {
+                        "queue_depth": sum(len(w) for w in self._queues[priority].values()),
+                        "avg_wait_ms": sum(ordered) / len(ordered) * 1000,
+                        "p95_wait_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+                    }
+            return {
+                "queue_depth": self.waiting,
+                "max_queue_depth": self.max_waiting,
+                "calls": self.calls,
+                "throttled": self.throttled,
+                "avg_wait_ms": self.total_wait / self.calls * 1000 if self.calls else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+                "scale": self.scale,
+                "by_priority": by_priority,
+            }
+
+
+def _retry_after_seconds(headers: httpx.Headers, default: float = 1.0) -> float:
+    """retry-after-ms / retry-after(초 또는 HTTP 날짜) 헤더 해석"""
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return default
+
+
+def estimate_tokens(body: Dict[str, Any], completion_tokens: int) -> int:
+    """
+    요청 비용(토큰) 추정
+
+    Azure OpenAI와 같이 프롬프트 글자 수와 max_tokens로 추정합니다.
+    한국어가 섞인 프롬프트 기준으로 3글자당 1토큰으로 계산합니다.
+
+    Args:
+        body: 요청 JSON
+        completion_tokens: max_tokens가 없을 때 가정할 출력 토큰 수
+    """
+    if "messages" in body:
+        chars = sum(len(str(message.get("content") or "")) for message in body["messages"])
+        return chars // 3 + (body.get("max_tokens") or completion_tokens)
+
+    # 임베딩: 문자열 또는 토큰 ID 목록
+    inputs = body.get("input") or []
+    if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+        inputs = [inputs]
+    return sum(len(item) // 3 if isinstance(item, str) else len(item) for item in inputs) + 1
+
+
+class RateLimiter:
+    """프로세스 전역 배포별 RPM / TPM 제한기"""
+
+    def __init__(
+        self,
+        limits: Callable[[str], Tuple[float, float]],
+        completion_tokens: int = 1000,
+        interactive_reserve: float = 0.0
+    ):
+        """
+        Args:
+            limits: 배포 이름 → (분당 요청 수, 분당 토큰 수) 한도 (0이면 무제한)
+            completion_tokens: max_tokens가 없는 요청의 출력 토큰 추정치
+            interactive_reserve: interactive 호출 전용으로 남겨 둘 한도 비율
+        """
+        self.limits = limits
+        self.completion_tokens = completion_tokens
+        self.interactive_reserve = interactive_reserve
+        self._limiters: Dict[str, DeploymentLimiter] = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, deployment: str) -> DeploymentLimiter:
+        with self._lock:
+            if deployment not in self._limiters:
+                rpm, tpm = self.limits(deployment)
+                self._limiters[deployment] = DeploymentLimiter(
+                    rpm=rpm, tpm=tpm, reserve=self.interactive_reserve
+                )
+            return self._limiters[deployment]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """배포별 통계"""
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {deployment: limiter.stats() for deployment, limiter in limiters.items()}
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """
+    Azure OpenAI 요청에 배포별 제한을 적용하는 httpx 전송 계층
+
+    공유 HTTP 클라이언트에 연결하면 LLM / Embeddings 호출(스트리밍 포함)이
+    모두 같은 제한기를 거칩니다.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, rate_limiter: RateLimiter):
+        self.transport = transport
+        self.rate_limiter = rate_limiter
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        match = _DEPLOYMENT_PATTERN.search(request.url.path)
+        if not match:
+            return self.transport.handle_request(request)
+
+        try:
+            body = json.loads(request.content or b"{}")
+        except (ValueError, httpx.RequestNotRead):
+            body = {}
+
+        priority, owner = current_priority()
+        limiter = self.rate_limiter.limiter(match.group(1))
+        limiter.acquire(estimate_tokens(body, self.rate_limiter.completion_tokens), priority, owner)
+        response = self.transport.handle_request(request)
+        limiter.on_response(response.status_code, response.headers)
+        return response
+
+    def close(self):
+        self.transport.close()
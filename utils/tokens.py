@@ -0,0 +1,78 @@
+import logging
+from functools import lru_cache
+from typing import Optional
+
+try:
+    # langchain-openai 의존성으로 함께 설치됨
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+# gpt-4o 토크나이저 (이전 tiktoken 버전은 cl100k_base 사용)
+ENCODINGS = ["o200k_base", "cl100k_base"]
+
+# tiktoken이 없을 때의 근사치 (한국어 기준 약 3자당 1토큰, rate_limiter 추정치와 동일)
+CHARS_PER_TOKEN = 3
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """
+    사용할 tiktoken 인코딩 (없으면 None)
+
+    tiktoken은 처음 사용할 때 BPE 파일을 내려받으므로, 오프라인 등으로 로드에 실패하면
+    글자 수 근사치를 사용하고 한 번만 알립니다 (결과는 캐시되어 다시 시도하지 않음).
+    """
+    if tiktoken is None:
+        return None
+    errors = []
+    for name in ENCODINGS:
+        try:
+            return tiktoken.get_encoding(name)
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+    logger.warning("tiktoken 인코딩을 불러오지 못해 글자 수 근사치로 토큰을 계산합니다 (%s)", "; ".join(errors))
+    return None
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """
+    텍스트 토큰 수 (로컬 토크나이저, 네트워크 호출 없음)
+
+    Args:
+        text: 텍스트
+
+    Returns:
+        토큰 수
+    """
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    텍스트를 앞에서부터 최대 토큰 수만큼 자르기
+
+    Args:
+        text: 텍스트
+        max_tokens: 최대 토큰 수
+
+    Returns:
+        잘린 텍스트 (이미 짧으면 그대로)
+    """
+    if max_tokens <= 0:
+        return ""
+    encoding = _encoding()
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
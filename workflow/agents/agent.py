@@ -1,9 +1,23 @@
+import hashlib
+import json
+import os
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, TypedDict
-from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, AIMessage
+from typing import Callable, Dict, Any, List, Optional, TypedDict
+from langchain_core.messages import BaseMessage
 from langgraph.graph import StateGraph, END
-from utils.config import get_llm
+from database.repository import response_cache_repository
+from utils.config import env_bool, env_float, env_int, get_llm, llm_settings
+from utils.model_tiers import tier_stats
+from utils.tokens import count_tokens
+from utils.rate_limiter import priority_scope
+from workflow.prompt import build_messages, context_token_budget, pack_context, prompt_token_budget
 from workflow.state import ContentState
+from workflow.streaming import get_token_callback
+
+
+# 실행 config의 configurable 에 True로 넣으면 응답 캐시를 읽지 않음 (초안 재생성 등)
+CACHE_BYPASS_KEY = "bypass_response_cache"
 
 
 class AgentState(TypedDict):
@@ -12,21 +26,33 @@ class AgentState(TypedDict):
     context: str  # 검색된 컨텍스트
     messages: List[BaseMessage]  # LLM에 전달할 메시지
     response: str  # LLM 응답
+    metadata: Dict[str, Any]  # 실행 정보 (지연 시간, 캐시 적중 등)
 
 
 class Agent(ABC):
     """마케팅 콘텐츠 생성 에이전트 추상 클래스"""
     
-    def __init__(self, system_prompt: str, role: str, use_rag: bool = True):
+    def __init__(
+        self,
+        system_prompt: str,
+        role: str,
+        use_rag: bool = True,
+        use_cache: Optional[bool] = None
+    ):
         """
         Args:
             system_prompt: 시스템 프롬프트
             role: 에이전트 역할 (STRATEGY_AGENT, CONTENT_AGENT, REVIEW_AGENT)
             use_rag: RAG 사용 여부
+            use_cache: 응답 캐시 사용 여부 (기본값: LLM_RESPONSE_CACHE_BYPASS에 없으면 사용)
         """
         self.system_prompt = system_prompt
         self.role = role
         self.use_rag = use_rag
+        if use_cache is None:
+            bypass = os.getenv("LLM_RESPONSE_CACHE_BYPASS", "")
+            use_cache = role not in [item.strip() for item in bypass.split(",")]
+        self.use_cache = use_cache
         self._setup_graph()
     
     def _setup_graph(self):
@@ -34,7 +60,7 @@ class Agent(ABC):
         workflow = StateGraph(AgentState)
         
         # 노드 추가
-        workflow.add_node("retrieve_context", self._retrieve_context)
+        workflow.add_node("retrieve_context", self._retrieve_with_priority)
         workflow.add_node("prepare_messages", self._prepare_messages)
         workflow.add_node("generate_response", self._generate_response)
         workflow.add_node("update_state", self._update_state)
@@ -50,6 +76,12 @@ class Agent(ABC):
         # 그래프 컴파일
         self.graph = workflow.compile()
     
+    def _retrieve_with_priority(self, state: AgentState) -> AgentState:
+        """실행 우선순위를 적용하여 컨텍스트 검색"""
+        content_state = state["content_state"]
+        with priority_scope(content_state.get("priority"), content_state.get("run_id")):
+            return self._retrieve_context(state)
+    
     @abstractmethod
     def _retrieve_context(self, state: AgentState) -> AgentState:
         """
@@ -58,28 +90,32 @@ class Agent(ABC):
         """
         pass
     
-    def _prepare_messages(self, state: AgentState) -> AgentState:
-        """LLM에 전달할 메시지 준비"""
-        content_state = state["content_state"]
-        context = state["context"]
+    def _prepare_messages(
+        self,
+        state: AgentState,
+        create_prompt: Optional[Callable[[Dict[str, Any]], str]] = None
+    ) -> AgentState:
+        """
+        LLM에 전달할 메시지 준비
         
-        # 시스템 프롬프트
-        messages = [SystemMessage(content=self.system_prompt)]
+        대화 기록과 검색 컨텍스트는 에이전트별 입력 토큰 예산(PROMPT_TOKEN_BUDGET) 안에서
+        구성하며, 프롬프트에 이미 포함된 전략 / 초안은 대화 기록에서 다시 보내지 않습니다.
         
-        # 기존 대화 기록 추가
-        for message in content_state["messages"]:
-            if message["role"] == "assistant":
-                messages.append(AIMessage(content=message["content"]))
-            else:
-                messages.append(
-                    HumanMessage(content=f"{message['role']}: {message['content']}")
-                )
+        Args:
+            create_prompt: 프롬프트 생성 함수 (기본값: _create_prompt)
+        """
+        content_state = state["content_state"]
+        create_prompt = create_prompt or self._create_prompt
         
-        # 프롬프트 생성
-        prompt = self._create_prompt({**content_state, "context": context})
-        messages.append(HumanMessage(content=prompt))
+        messages, stats = build_messages(
+            system_prompt=self.system_prompt,
+            history=content_state["messages"],
+            render_prompt=lambda context: create_prompt({**content_state, "context": context}),
+            context=state["context"],
+            budget=prompt_token_budget(self.role)
+        )
         
-        return {**state, "messages": messages}
+        return {**state, "messages": messages, "metadata": {**state.get("metadata", {}), **stats}}
     
     @abstractmethod
     def _create_prompt(self, state: Dict[str, Any]) -> str:
@@ -89,13 +125,98 @@ class Agent(ABC):
         """
         pass
     
-    def _generate_response(self, state: AgentState) -> AgentState:
-        """LLM 호출하여 응답 생성"""
+    def _generate_response(self, state: AgentState, config: Optional[Dict[str, Any]] = None) -> AgentState:
+        """
+        LLM 호출하여 응답 생성
+        
+        LLM_RESPONSE_CACHE가 켜져 있고 이 에이전트가 캐시를 사용하면,
+        같은 배포/온도/메시지의 응답을 SQLite 캐시에서 재사용합니다.
+        실행 config에 토큰 콜백이 있으면 응답을 스트리밍하며 토큰을 전달합니다.
+        Azure 호출은 실행의 우선순위 클래스(priority)로 스케줄링됩니다.
+        """
+        content_state = state["content_state"]
+        with priority_scope(content_state.get("priority"), content_state.get("run_id")):
+            return self._call_llm(state, config)
+    
+    def _call_llm(self, state: AgentState, config: Optional[Dict[str, Any]]) -> AgentState:
+        """캐시 조회 / 스트리밍을 포함한 LLM 호출 (에이전트별 배포 / 온도 / 최대 토큰 설정 사용)"""
         messages = state["messages"]
-        llm = get_llm(temperature=0.7)
-        response = llm.invoke(messages)
+        on_token = get_token_callback(config)
+        settings = llm_settings(self.role, state["content_state"])
+        temperature = settings["temperature"]
+        llm = get_llm(
+            temperature=temperature,
+            deployment=settings["deployment"],
+            max_tokens=settings["max_tokens"]
+        )
+        start = time.perf_counter()
+        
+        bypass = ((config or {}).get("configurable") or {}).get(CACHE_BYPASS_KEY, False)
+        
+        cache_key = None
+        if self.use_cache and env_bool("LLM_RESPONSE_CACHE", False):
+            cache_key = response_cache_key(llm.deployment_name, temperature, messages, settings["max_tokens"])
+            cached = None if bypass else response_cache_repository.get(
+                cache_key,
+                ttl_seconds=env_float("LLM_RESPONSE_CACHE_TTL", 86400.0)
+            )
+            if cached:
+                if on_token:
+                    on_token(self.role, cached["response"])
+                metadata = {
+                    **state.get("metadata", {}),
+                    "tier": settings["tier"],
+                    "deployment": llm.deployment_name,
+                    "cache_hit": True,
+                    "latency_ms": (time.perf_counter() - start) * 1000,
+                    "saved_ms": cached["latency_ms"],
+                }
+                return {**state, "response": cached["response"], "metadata": metadata}
+        
+        first_token_ms = None
+        if on_token:
+            # 토큰 스트리밍 (첫 토큰까지의 시간도 기록)
+            content = ""
+            for chunk in llm.stream(messages):
+                if not chunk.content:
+                    continue
+                if first_token_ms is None:
+                    first_token_ms = (time.perf_counter() - start) * 1000
+                content += chunk.content
+                on_token(self.role, chunk.content)
+        else:
+            content = llm.invoke(messages).content
+        latency_ms = (time.perf_counter() - start) * 1000
+        
+        if cache_key:
+            response_cache_repository.put(
+                cache_key,
+                deployment=llm.deployment_name or "",
+                response=content,
+                latency_ms=latency_ms,
+                max_entries=env_int("LLM_RESPONSE_CACHE_MAX_ENTRIES", 1000)
+            )
         
-        return {**state, "response": response.content}
+        # 모델 등급별 지연 시간 / 토큰 통계
+        output_tokens = count_tokens(content)
+        tier_stats.record(
+            settings["tier"],
+            latency_ms,
+            input_tokens=sum(count_tokens(message.content) for message in messages),
+            output_tokens=output_tokens
+        )
+        
+        metadata = {
+            **state.get("metadata", {}),
+            "tier": settings["tier"],
+            "deployment": llm.deployment_name,
+            "cache_hit": False,
+            "latency_ms": latency_ms,
+            "output_tokens": output_tokens,
+        }
+        if first_token_ms is not None:
+            metadata["first_token_ms"] = first_token_ms
+        return {**state, "response": content, "metadata": metadata}
     
     @abstractmethod
     def _update_state(self, state: AgentState) -> AgentState:
@@ -105,41 +226,71 @@ class Agent(ABC):
         """
         pass
     
-    def run(self, state: ContentState) -> ContentState:
-        """에이전트 실행"""
-        # 초기 에이전트 상태 구성
-        agent_state = AgentState(
+    def run(self, state: ContentState, config: Optional[Dict[str, Any]] = None) -> ContentState:
+        """
+        에이전트 실행 (내부 LangGraph 사용)
+        
+        Args:
+            state: 콘텐츠 생성 상태
+            config: 그래프 실행 config (토큰 콜백 등을 내부 그래프로 전달)
+        """
+        result = self.graph.invoke(self._initial_agent_state(state), config)
+        return self._final_content_state(result)
+    
+    def run_direct(self, state: ContentState, config: Optional[Dict[str, Any]] = None) -> ContentState:
+        """
+        에이전트 실행 (direct 엔진: 내부 그래프 없이 같은 단계를 순서대로 호출)
+        
+        Args:
+            state: 콘텐츠 생성 상태
+            config: 실행 config (토큰 콜백 등)
+        """
+        agent_state = self._initial_agent_state(state)
+        agent_state = self._retrieve_with_priority(agent_state)
+        agent_state = self._prepare_messages(agent_state)
+        agent_state = self._generate_response(agent_state, config)
+        agent_state = self._update_state(agent_state)
+        return self._final_content_state(agent_state)
+    
+    def _initial_agent_state(self, state: ContentState) -> AgentState:
+        """초기 에이전트 상태 구성"""
+        return AgentState(
             content_state=state,
             context="",
             messages=[],
-            response=""
+            response="",
+            metadata={}
         )
-        
-        # 내부 그래프 실행
-        result = self.graph.invoke(agent_state)
-        
-        # 최종 콘텐츠 상태 반환
-        return result["content_state"]
+    
+    def _final_content_state(self, result: AgentState) -> ContentState:
+        """최종 콘텐츠 상태 반환 (실행 정보는 역할별로 기록)"""
+        content_state = result["content_state"]
+        run_metadata = {
+            **(content_state.get("run_metadata") or {}),
+            self.role: result.get("metadata", {})
+        }
+        return {**content_state, "run_metadata": run_metadata}
+
+
+def response_cache_key(
+    deployment: str,
+    temperature: float,
+    messages: List[BaseMessage],
+    max_tokens: Optional[int] = None
+) -> str:
+    """응답 캐시 키 생성 (배포 + 온도 + 직렬화된 메시지 목록의 해시, 최대 토큰 수는 지정된 경우만)"""
+    key = {
+        "deployment": deployment,
+        "temperature": temperature,
+        "messages": [[message.type, message.content] for message in messages],
+    }
+    if max_tokens:
+        key["max_tokens"] = max_tokens
+    payload = json.dumps(key, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 
 def format_context_from_docs(docs: List) -> str:
-    """검색된 문서들을 컨텍스트 문자열로 포맷팅"""
-    if not docs:
-        return ""
-    
-    context = ""
-    for i, doc in enumerate(docs):
-        source = doc.metadata.get("source", "Unknown")
-        category = doc.metadata.get("category", "")
-        channel = doc.metadata.get("channel", "")
-        
-        context += f"[참고자료 {i + 1}]"
-        if source != "Unknown":
-            context += f" 출처: {source}"
-        if category:
-            context += f", 카테고리: {category}"
-        if channel:
-            context += f", 채널: {channel}"
-        context += f"\n{doc.page_content}\n\n"
-    
+    """검색된 문서들을 컨텍스트 문자열로 포맷팅 (공백 정리 / 중복 제거 후 CONTEXT_TOKEN_BUDGET 안에서)"""
+    context, _ = pack_context(docs, budget=context_token_budget())
     return context
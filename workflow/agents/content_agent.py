@@ -1,13 +1,13 @@
 from workflow.agents.agent import Agent, AgentState, format_context_from_docs
 from workflow.state import AgentType
-from retrieval.vector_store import search_best_practices
-from typing import Dict, Any
+from workflow.retrieval import retrieve_best_practices
+from typing import Dict, Any, Optional
 
 
 class ContentAgent(Agent):
     """콘텐츠 생성 에이전트"""
     
-    def __init__(self, use_rag: bool = True):
+    def __init__(self, use_rag: bool = True, use_cache: Optional[bool] = None):
         system_prompt = """당신은 세계적인 전문 카피라이터입니다.
 당신의 역할은 수립된 마케팅 전략을 바탕으로 즉시 사용 가능한 고품질 마케팅 콘텐츠를 작성하는 것입니다.
 
@@ -23,19 +23,21 @@ class ContentAgent(Agent):
         super().__init__(
             system_prompt=system_prompt,
             role=AgentType.CONTENT,
-            use_rag=use_rag
+            use_rag=use_rag,
+            use_cache=use_cache
         )
     
     def _retrieve_context(self, state: AgentState) -> AgentState:
-        """채널별 모범 사례 검색"""
+        """채널별 모범 사례 검색 (검색 단계에서 미리 검색했으면 그 결과 사용)"""
         if not self.use_rag:
             return {**state, "context": ""}
         
         content_state = state["content_state"]
-        channel = content_state['channel']
+        if content_state.get("best_practice_context") is not None:
+            return {**state, "context": content_state["best_practice_context"]}
         
         # RAG 검색
-        docs = search_best_practices(channel, k=2)
+        docs = retrieve_best_practices(content_state)
         
         # 검색된 문서 저장
         content_state["best_practice_docs"] = [doc.page_content for doc in docs] if docs else []
@@ -1,12 +1,32 @@
+import json
+import os
+import re
 from workflow.agents.agent import Agent, AgentState
 from workflow.state import AgentType
-from typing import Dict, Any
+from workflow.streaming import without_token_callback
+from utils.tokens import count_tokens
+from typing import Dict, Any, List, Optional
+
+
+# 검토 결과 형식
+# - rewrite: 최종 콘텐츠 전체를 다시 작성
+# - edits: 수정할 부분만 편집 목록(JSON)으로 받아 초안에 적용 (적용 실패 시 rewrite)
+REVIEW_MODES = ["rewrite", "edits"]
 
 
 class ReviewAgent(Agent):
     """검토 및 최적화 에이전트"""
     
-    def __init__(self):
+    def __init__(self, use_cache: Optional[bool] = None, mode: Optional[str] = None):
+        """
+        Args:
+            use_cache: 응답 캐시 사용 여부
+            mode: 검토 결과 형식 (기본값: REVIEW_MODE 환경변수, rewrite)
+        """
+        self.mode = (mode or os.getenv("REVIEW_MODE", "rewrite")).lower()
+        if self.mode not in REVIEW_MODES:
+            raise ValueError(f"Unknown REVIEW_MODE: {self.mode} ({', '.join(REVIEW_MODES)})")
+        
         system_prompt = """당신은 마케팅 콘텐츠 품질 관리 전문가입니다.
 당신의 역할은 작성된 콘텐츠를 다음 관점에서 검토하고 최적화하는 것입니다:
 
@@ -24,15 +44,99 @@ class ReviewAgent(Agent):
         super().__init__(
             system_prompt=system_prompt,
             role=AgentType.REVIEW,
-            use_rag=False  # Review Agent는 RAG 사용 안 함
+            use_rag=False,  # Review Agent는 RAG 사용 안 함
+            use_cache=use_cache
         )
     
     def _retrieve_context(self, state: AgentState) -> AgentState:
         """Review Agent는 RAG를 사용하지 않음"""
         return {**state, "context": ""}
     
+    def _generate_response(self, state: AgentState, config: Optional[Dict[str, Any]] = None) -> AgentState:
+        """
+        검토 결과 생성
+        
+        edits 모드에서는 편집 목록을 초안에 적용하여 최종 콘텐츠를 만들고,
+        전체 재작성 대비 줄어든 출력 토큰 수를 기록합니다.
+        편집 목록을 해석하거나 적용할 수 없으면 전체 재작성으로 다시 요청합니다.
+        """
+        if self._mode(state["content_state"]) != "edits":
+            return super()._generate_response(state, config)
+        
+        # 편집 목록(JSON)은 화면에 스트리밍하지 않음
+        result = super()._generate_response(state, without_token_callback(config))
+        draft_content = state["content_state"].get("draft_content") or ""
+        output_tokens = count_tokens(result["response"])
+        
+        try:
+            edits = parse_edits(result["response"])
+            final_content = apply_edits(draft_content, edits)
+        except ValueError as e:
+            # 전체 재작성으로 대체 (편집 목록 응답은 낭비된 출력 토큰)
+            rewrite_state = self._prepare_messages(
+                {**state, "metadata": {}},
+                create_prompt=self._create_rewrite_prompt
+            )
+            fallback = super()._generate_response(rewrite_state, config)
+            metadata = {
+                **fallback["metadata"],
+                "review_mode": "edits",
+                "edit_fallback": True,
+                "edit_error": str(e),
+                "latency_ms": result["metadata"]["latency_ms"] + fallback["metadata"]["latency_ms"],
+                "output_tokens": output_tokens + count_tokens(fallback["response"]),
+                "output_tokens_saved": -output_tokens,
+            }
+            return {**fallback, "metadata": metadata}
+        
+        metadata = {
+            **result["metadata"],
+            "review_mode": "edits",
+            "edit_fallback": False,
+            "edits_applied": len(edits),
+            "output_tokens": output_tokens,
+            # 전체 재작성이었다면 최종 콘텐츠 전체가 출력 토큰
+            "output_tokens_saved": count_tokens(final_content) - output_tokens,
+        }
+        return {**result, "response": final_content, "metadata": metadata}
+    
+    def _mode(self, state: Dict[str, Any]) -> str:
+        """이번 실행의 검토 모드 (사전 확인을 통과하여 짧은 검토로 지정되면 edits)"""
+        return (state.get("review_gate") or {}).get("review_mode") or self.mode
+    
     def _create_prompt(self, state: Dict[str, Any]) -> str:
-        """검토 및 최적화 프롬프트 생성"""
+        """검토 모드에 맞는 프롬프트 생성"""
+        if self._mode(state) == "edits":
+            return self._create_edit_prompt(state)
+        return self._create_rewrite_prompt(state)
+    
+    def _create_rewrite_prompt(self, state: Dict[str, Any]) -> str:
+        """검토 및 최적화 프롬프트 생성 (최종 콘텐츠 전체 작성)"""
+        return self._create_review_prompt(state) + """
+**최종 콘텐츠를 작성하세요:**
+- 개선이 필요한 부분을 모두 수정
+- 더 강렬하고 설득력 있는 표현으로 다듬기
+- 즉시 게시 가능한 완성도
+
+개선 과정이나 설명 없이, 최종 완성된 콘텐츠만 출력하세요.
+"""
+    
+    def _create_edit_prompt(self, state: Dict[str, Any]) -> str:
+        """검토 및 최적화 프롬프트 생성 (수정할 부분만 편집 목록으로 작성)"""
+        return self._create_review_prompt(state) + """
+**수정할 부분만 편집 목록으로 작성하세요:**
+- 개선이 필요한 부분을 모두 찾아 더 강렬하고 설득력 있는 표현으로 다듬기
+- 수정이 끝난 콘텐츠는 즉시 게시 가능한 완성도여야 함
+- "find"는 초안에 있는 문구를 글자 그대로 복사 (초안 안에서 유일하도록 필요한 만큼만 포함)
+- "replace"는 그 문구를 대체할 새 문구 (삭제는 빈 문자열)
+- 초안에 나오는 순서대로 나열하고, 수정할 부분이 없으면 빈 목록
+
+설명 없이 다음 JSON 형식으로만 출력하세요:
+{"edits": [{"find": "초안의 원래 문구", "replace": "수정된 문구"}]}
+"""
+    
+    def _create_review_prompt(self, state: Dict[str, Any]) -> str:
+        """검토 대상과 체크리스트 (두 모드 공통)"""
         
         strategy = state.get('strategy', '')
         draft_content = state.get('draft_content', '')
@@ -80,14 +184,14 @@ class ReviewAgent(Agent):
 6. **SEO (블로그인 경우)**
    - 주요 키워드가 자연스럽게 포함되었는가?
    - 제목과 소제목이 검색 친화적인가?
-
-**최종 콘텐츠를 작성하세요:**
-- 개선이 필요한 부분을 모두 수정
-- 더 강렬하고 설득력 있는 표현으로 다듬기
-- 즉시 게시 가능한 완성도
-
-개선 과정이나 설명 없이, 최종 완성된 콘텐츠만 출력하세요.
 """
+        
+        # 사전 확인에서 통과하지 못한 채널 규칙
+        failures = (state.get("review_gate") or {}).get("failures")
+        if failures:
+            prompt += "\n**사전 확인에서 발견된 문제 (반드시 수정):**\n"
+            prompt += "".join(f"- {failure}\n" for failure in failures)
+        
         return prompt
     
     def _update_state(self, state: AgentState) -> AgentState:
@@ -105,3 +209,54 @@ class ReviewAgent(Agent):
         new_content_state["prev_node"] = self.role
         
         return {**state, "content_state": new_content_state}
+
+
+def parse_edits(response: str) -> List[Dict[str, str]]:
+    """
+    편집 목록 응답 해석
+
+    Args:
+        response: LLM 응답 (JSON, 코드 블록으로 감싸져 있어도 됨)
+
+    Returns:
+        [{"find", "replace"}] 목록
+
+    Raises:
+        ValueError: JSON 형식이 아니거나 편집 항목이 올바르지 않은 경우
+    """
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", response.strip())
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"편집 목록이 JSON 형식이 아닙니다: {e}")
+
+    edits = data.get("edits") if isinstance(data, dict) else data
+    if not isinstance(edits, list):
+        raise ValueError("edits 목록이 없습니다")
+    for edit in edits:
+        if not isinstance(edit, dict) or not isinstance(edit.get("find"), str) \
+                or not isinstance(edit.get("replace"), str) or not edit["find"]:
+            raise ValueError(f"올바르지 않은 편집 항목: {edit}")
+    return edits
+
+
+def apply_edits(text: str, edits: List[Dict[str, str]]) -> str:
+    """
+    편집 목록을 순서대로 초안에 적용
+
+    각 문구는 직전 편집 위치 이후에서 먼저 찾고, 없으면 처음부터 찾습니다.
+
+    Raises:
+        ValueError: 초안에서 찾을 수 없는 문구가 있는 경우
+    """
+    cursor = 0
+    for edit in edits:
+        find, replace = edit["find"], edit["replace"]
+        position = text.find(find, cursor)
+        if position == -1:
+            position = text.find(find)
+        if position == -1:
+            raise ValueError(f"초안에서 찾을 수 없는 문구: {find[:50]}")
+        text = text[:position] + replace + text[position + len(find):]
+        cursor = position + len(replace)
+    return text
@@ -1,13 +1,15 @@
+import time
 from workflow.agents.agent import Agent, AgentState, format_context_from_docs
-from workflow.state import AgentType
-from retrieval.vector_store import search_marketing_trends
-from typing import Dict, Any
+from workflow.state import AgentType, ContentState
+from workflow.retrieval import retrieve_trends
+from workflow.strategy_cache import lookup_strategy, store_strategy
+from typing import Dict, Any, Optional
 
 
 class StrategyAgent(Agent):
     """마케팅 전략 수립 에이전트"""
     
-    def __init__(self, use_rag: bool = True):
+    def __init__(self, use_rag: bool = True, use_cache: Optional[bool] = None):
         system_prompt = """당신은 세계적인 마케팅 전략 컨설턴트입니다. 
 당신의 역할은 소규모 비즈니스를 위한 효과적인 마케팅 전략을 수립하는 것입니다.
 
@@ -21,21 +23,58 @@ class StrategyAgent(Agent):
         super().__init__(
             system_prompt=system_prompt,
             role=AgentType.STRATEGY,
-            use_rag=use_rag
+            use_rag=use_rag,
+            use_cache=use_cache
         )
     
+    def run(self, state: ContentState, config: Optional[Dict[str, Any]] = None) -> ContentState:
+        """전략 수립 (reuse_strategy면 같은 브리프의 캐시된 전략 재사용)"""
+        return self._reuse_strategy(state) or self._store_strategy(super().run(state, config))
+    
+    def run_direct(self, state: ContentState, config: Optional[Dict[str, Any]] = None) -> ContentState:
+        """전략 수립 (direct 엔진)"""
+        return self._reuse_strategy(state) or self._store_strategy(super().run_direct(state, config))
+    
+    def _reuse_strategy(self, state: ContentState) -> Optional[ContentState]:
+        """캐시된 전략으로 LLM 호출 없이 상태 갱신 (캐시에 없으면 None)"""
+        if not state.get("reuse_strategy"):
+            return None
+        
+        start = time.perf_counter()
+        cached = lookup_strategy(state)
+        if not cached:
+            return None
+        
+        agent_state = {
+            **self._initial_agent_state(state),
+            "response": cached["strategy"],
+            "metadata": {
+                "cache_hit": True,
+                "strategy_reused": True,
+                "latency_ms": (time.perf_counter() - start) * 1000,
+                "saved_ms": cached["latency_ms"] or 0,
+            }
+        }
+        return self._final_content_state(self._update_state(agent_state))
+    
+    def _store_strategy(self, state: ContentState) -> ContentState:
+        """새로 수립된 전략을 캐시에 저장"""
+        metadata = state["run_metadata"].get(self.role, {})
+        # 응답 캐시 적중이면 원래 생성 시간 기록
+        store_strategy(state, state.get("strategy"), metadata.get("saved_ms", metadata.get("latency_ms")))
+        return state
+    
     def _retrieve_context(self, state: AgentState) -> AgentState:
-        """마케팅 트렌드 검색"""
+        """마케팅 트렌드 검색 (검색 단계에서 미리 검색했으면 그 결과 사용)"""
         if not self.use_rag:
             return {**state, "context": ""}
         
         content_state = state["content_state"]
-        
-        # 검색 쿼리 생성
-        query = f"{content_state['business_name']} {content_state['target_customer']} {content_state['channel']} 마케팅 트렌드"
+        if content_state.get("trend_context") is not None:
+            return {**state, "context": content_state["trend_context"]}
         
         # RAG 검색
-        docs = search_marketing_trends(query, k=2)
+        docs = retrieve_trends(content_state)
         
         # 검색된 문서 저장
         content_state["trend_docs"] = [doc.page_content for doc in docs] if docs else []
@@ -0,0 +1,322 @@
+"""
+헤드리스 배치 콘텐츠 생성 CLI
+
+JSONL / CSV 파일의 브리프를 스트리밍으로 읽어 동시 실행 수를 제한하며
+create_content_graph 를 실행하고, 결과를 ContentRepository 로 묶어서 저장합니다.
+
+- 브리프 필드: business_name, business_features, target_customer, channel, tone
+  (선택: id, channels - 쉼표로 구분한 여러 채널, enable_rag, reuse_strategy)
+- 저장이 끝난 브리프 키는 완료 파일(기본값: 입력 파일명 + ".done")에 기록됩니다.
+  중단된 배치를 같은 명령으로 다시 실행하면 완료된 브리프는 건너뜁니다.
+- 실패한 브리프는 완료 파일에 기록되지 않으므로 다시 실행하면 재시도됩니다.
+  브리프마다 노드 완료 상태가 체크포인트로 저장되므로 재시도는 마지막으로 완료된
+  노드 다음부터 실행합니다 (체크포인트는 결과 저장 후 삭제).
+
+사용법:
+    python -m workflow.batch briefs.jsonl --concurrency 4 --write-batch 20
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from database.repository import checkpoint_repository, content_repository
+from database.session import db_session
+from utils.config import get_rate_limiter
+from utils.model_tiers import tier_stats
+from workflow.graph import content_graph_nodes, get_content_graph
+from utils.rate_limiter import BATCH
+from workflow.state import ContentState, create_initial_state
+
+
+BRIEF_FIELDS = ["business_name", "business_features", "target_customer", "channel", "tone"]
+
+
+def iter_briefs(path: str) -> Iterator[Dict[str, Any]]:
+    """JSONL / CSV 파일에서 브리프를 하나씩 읽기"""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def brief_key(brief: Dict[str, Any]) -> str:
+    """브리프 식별 키 (id 필드가 없으면 입력 필드의 해시)"""
+    if brief.get("id"):
+        return str(brief["id"])
+    payload = json.dumps(
+        {field: brief.get(field) for field in BRIEF_FIELDS + ["channels"]},
+        ensure_ascii=False,
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _brief_channels(brief: Dict[str, Any]) -> List[str]:
+    """channels 필드 (목록 또는 쉼표 구분 문자열)를 채널 목록으로 변환"""
+    channels = brief.get("channels") or []
+    if isinstance(channels, str):
+        channels = [channel.strip() for channel in channels.split(",") if channel.strip()]
+    return channels
+
+
+def _parse_bool(value: Any, default: bool) -> bool:
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+def load_done(path: str) -> Set[str]:
+    """완료 파일에서 처리된 브리프 키 읽기"""
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def batch_run_id(key: str) -> str:
+    """브리프 키로 만든 실행 ID (재시도해도 같은 체크포인트 사용)"""
+    return f"batch-{key}"
+
+
+class BatchRunner:
+    """브리프 배치 실행기"""
+
+    def __init__(self, enable_rag: bool = True, reuse_strategy: bool = False):
+        """
+        Args:
+            enable_rag: 브리프에 enable_rag 필드가 없을 때의 RAG 사용 여부
+            reuse_strategy: 브리프에 reuse_strategy 필드가 없을 때의 전략 재사용 여부
+        """
+        self.enable_rag = enable_rag
+        self.reuse_strategy = reuse_strategy
+
+    def run_brief(self, brief: Dict[str, Any], key: Optional[str] = None) -> Tuple[List[Dict[str, Any]], float]:
+        """
+        브리프 하나를 실행하여 저장할 레코드 생성
+
+        Args:
+            brief: 브리프
+            key: 브리프 키 (있으면 이전 실행의 체크포인트부터 이어서 실행)
+
+        Returns:
+            (ContentRepository.save_many 레코드 목록, 소요 시간(초))
+        """
+        start = time.perf_counter()
+        channels = _brief_channels(brief)
+        enable_rag = _parse_bool(brief.get("enable_rag"), self.enable_rag)
+
+        initial_state = create_initial_state(
+            business_name=brief["business_name"],
+            business_features=brief["business_features"],
+            target_customer=brief["target_customer"],
+            channel=brief.get("channel") or (channels[0] if channels else "instagram"),
+            tone=brief.get("tone") or "친근한",
+            channels=channels,
+            priority=BATCH,
+            run_id=batch_run_id(key) if key else None,
+            reuse_strategy=_parse_bool(brief.get("reuse_strategy"), self.reuse_strategy)
+        )
+
+        # 마지막으로 완료된 노드 다음부터 실행
+        start_after = None
+        latest = checkpoint_repository.latest(initial_state["run_id"])
+        if latest:
+            node, state = latest
+            if node in content_graph_nodes(enable_rag, initial_state["channels"]):
+                start_after, initial_state = node, state
+            else:
+                # 그래프 구성이 바뀌어 이어서 실행할 수 없는 체크포인트는 삭제하고 처음부터 실행
+                checkpoint_repository.delete([initial_state["run_id"]])
+
+        graph = get_content_graph(enable_rag, initial_state["channels"], start_after=start_after)
+        result: ContentState = graph.invoke(initial_state)
+
+        return _records(result), time.perf_counter() - start
+
+
+def _records(result: ContentState) -> List[Dict[str, Any]]:
+    """그래프 결과를 저장 레코드로 변환 (멀티 채널은 같은 group_id로 채널별 레코드)"""
+    base = {
+        "business_name": result["business_name"],
+        "business_features": result["business_features"],
+        "target_customer": result["target_customer"],
+        "tone": result["tone"],
+        "strategy": result.get("strategy") or "",
+        "trend_docs": result.get("trend_docs", []),
+    }
+
+    if result.get("channel_results"):
+        group_id = uuid.uuid4().hex
+        return [
+            {
+                **base,
+                "channel": channel,
+                "final_content": channel_result.get("final_content") or "",
+                "best_practice_docs": channel_result.get("best_practice_docs", []),
+                "group_id": group_id,
+            }
+            for channel, channel_result in result["channel_results"].items()
+        ]
+
+    if not result.get("final_content"):
+        raise RuntimeError("최종 콘텐츠가 생성되지 않았습니다")
+    return [{
+        **base,
+        "channel": result["channel"],
+        "final_content": result["final_content"],
+        "best_practice_docs": result.get("best_practice_docs", []),
+    }]
+
+
+def run_batch(
+    path: str,
+    concurrency: int = 4,
+    write_batch: int = 20,
+    done_path: Optional[str] = None,
+    enable_rag: bool = True,
+    reuse_strategy: bool = False
+) -> Dict[str, Any]:
+    """
+    배치 실행
+
+    Args:
+        path: 브리프 파일 (JSONL / CSV)
+        concurrency: 동시에 실행할 브리프 수
+        write_batch: 한 번에 저장할 브리프 수
+        done_path: 완료 파일 경로 (기본값: path + ".done")
+        enable_rag: 기본 RAG 사용 여부
+        reuse_strategy: 기본 전략 재사용 여부
+
+    Returns:
+        실행 통계
+    """
+    done_path = done_path or f"{path}.done"
+    done = load_done(done_path)
+    runner = BatchRunner(enable_rag=enable_rag, reuse_strategy=reuse_strategy)
+
+    stats = {"completed": 0, "failed": 0, "skipped": 0, "latencies": []}
+    pending: Dict[Any, str] = {}  # 실행 중인 future → 브리프 키
+    buffer: List[Tuple[str, List[Dict[str, Any]]]] = []  # 저장 대기 중인 (브리프 키, 레코드)
+    start = time.perf_counter()
+
+    def flush():
+        # DB에 저장한 뒤 완료 파일에 기록 (중단 시 최대 한 배치만 다시 생성)
+        if not buffer:
+            return
+        content_repository.save_many([record for _, records in buffer for record in records])
+        with open(done_path, "a", encoding="utf-8") as f:
+            f.writelines(f"{key}\n" for key, _ in buffer)
+        checkpoint_repository.delete([batch_run_id(key) for key, _ in buffer])
+        buffer.clear()
+
+    def collect(futures):
+        for future in futures:
+            key = pending.pop(future)
+            try:
+                records, seconds = future.result()
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"failed {key}: {e}", file=sys.stderr)
+                continue
+            stats["completed"] += 1
+            stats["latencies"].append(seconds)
+            buffer.append((key, records))
+        if len(buffer) >= write_batch:
+            flush()
+        _report(stats, start)
+
+    # 워커들이 동시에 테이블 생성/마이그레이션을 실행하지 않도록 먼저 초기화
+    db_session.initialize()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for brief in iter_briefs(path):
+            key = brief_key(brief)
+            if key in done:
+                stats["skipped"] += 1
+                continue
+            # 실행 중인 브리프 수를 제한하여 입력 크기와 관계없이 메모리 사용량 유지
+            if len(pending) >= concurrency:
+                finished, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                collect(finished)
+            pending[executor.submit(runner.run_brief, brief, key)] = key
+            done.add(key)
+
+        finished, _ = wait(list(pending))
+        collect(finished)
+
+    flush()
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def _report(stats: Dict[str, Any], start: float):
+    """진행 상황 출력"""
+    elapsed = time.perf_counter() - start
+    print(
+        f"completed={stats['completed']} failed={stats['failed']} "
+        f"skipped={stats['skipped']} elapsed={elapsed:.1f}s",
+        file=sys.stderr
+    )
+
+
+def summarize(stats: Dict[str, Any]) -> str:
+    """처리량 요약 (분당 브리프 수, p50/p95 지연 시간, 실패 수)"""
+    latencies = stats["latencies"]
+    per_minute = stats["completed"] / stats["seconds"] * 60 if stats["seconds"] else 0.0
+    p50 = float(np.percentile(latencies, 50)) if latencies else 0.0
+    p95 = float(np.percentile(latencies, 95)) if latencies else 0.0
+    return (
+        f"완료 {stats['completed']}개, 실패 {stats['failed']}개, 건너뜀 {stats['skipped']}개 "
+        f"({stats['seconds']:.1f}초)\n"
+        f"처리량 {per_minute:.1f} briefs/min, 지연 시간 p50 {p50:.1f}초 / p95 {p95:.1f}초"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="브리프 파일로 마케팅 콘텐츠 배치 생성")
+    parser.add_argument("path", help="브리프 파일 (JSONL / CSV)")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 실행할 브리프 수")
+    parser.add_argument("--write-batch", type=int, default=20, help="한 번에 저장할 브리프 수")
+    parser.add_argument("--done-file", help="완료 파일 경로 (기본값: 입력 파일 + .done)")
+    parser.add_argument("--no-rag", action="store_true", help="RAG 비활성화")
+    parser.add_argument("--reuse-strategy", action="store_true", help="같은 브리프의 캐시된 전략 재사용")
+    args = parser.parse_args()
+
+    stats = run_batch(
+        args.path,
+        concurrency=args.concurrency,
+        write_batch=args.write_batch,
+        done_path=args.done_file,
+        enable_rag=not args.no_rag,
+        reuse_strategy=args.reuse_strategy
+    )
+    print(summarize(stats))
+    for deployment, limiter_stats in get_rate_limiter().stats().items():
+        print(
+            f"{deployment}: 호출 {limiter_stats['calls']}회, 평균 대기 {limiter_stats['avg_wait_ms']:.0f}ms, "
+            f"최대 대기열 {limiter_stats['max_queue_depth']}, 429 응답 {limiter_stats['throttled']}회"
+        )
+    for tier, stats in tier_stats.stats().items():
+        print(
+            f"{tier}: 호출 {stats['calls']}회, 평균 {stats['avg_latency_ms'] / 1000:.1f}초 "
+            f"(p95 {stats['p95_latency_ms'] / 1000:.1f}초), 입력 {stats['input_tokens']:,} / "
+            f"출력 {stats['output_tokens']:,} 토큰"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+그래프 준비 / 실행 엔진 오버헤드 마이크로벤치마크
+
+기본: 생성 요청마다 그래프를 새로 만드는 경우(create_content_graph)와
+컴파일된 그래프를 재사용하는 경우(get_content_graph)의 준비 시간을 비교합니다.
+
+--engines: 즉시 응답하는 가짜 LLM으로 전체 실행을 반복하여 langgraph / direct
+엔진의 실행당 오버헤드를 비교하고, 두 엔진의 결과가 같은지 확인합니다.
+
+LLM / 검색은 호출하지 않으며, 체크포인트 / 전략 캐시를 끄고 임시 DB를 사용하므로
+실제 DB에 쓰지 않고 SQLite 커밋 시간도 측정에 포함되지 않습니다.
+
+사용법:
+    python -m workflow.benchmark --iterations 50
+    python -m workflow.benchmark --engines --iterations 200
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+from unittest import mock
+
+import numpy as np
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from workflow.engine import GRAPH_ENGINES
+from workflow.graph import create_content_graph, get_content_graph
+from workflow.state import ContentState, create_initial_state
+
+
+# 실행 비교에서 DB 쓰기를 끄는 설정
+BENCHMARK_ENV = {
+    "CHECKPOINTS": "false",
+    "STRATEGY_CACHE": "false",
+}
+
+
+def _timings(build: Callable, iterations: int) -> List[float]:
+    """반복별 소요 시간(ms)"""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        build()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+class EchoLLM:
+    """마지막 프롬프트 길이를 응답하는 가짜 LLM (네트워크 호출 없음)"""
+
+    deployment_name = "benchmark"
+
+    def invoke(self, messages) -> AIMessage:
+        return AIMessage(content=f"response to {len(messages[-1].content)} chars")
+
+    def stream(self, messages):
+        yield AIMessageChunk(content=self.invoke(messages).content)
+
+
+def _comparable(state: ContentState) -> Dict[str, Any]:
+    """엔진 간 비교용 상태 (실행마다 달라지는 실행 ID / 지연 시간 제외)"""
+    return {
+        key: value for key, value in state.items()
+        if key not in ("run_id", "run_metadata")
+    }
+
+
+def _engine_report(args):
+    """langgraph / direct 엔진 실행당 오버헤드 비교"""
+    channels = args.channels or []
+    brief = dict(
+        business_name="벤치마크 카페",
+        business_features="직접 로스팅한 원두",
+        target_customer="20-30대 직장인",
+        channel=channels[0] if channels else "instagram",
+        tone="친근한",
+        channels=channels
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            mock.patch.dict(os.environ, {**BENCHMARK_ENV, "DB_PATH": os.path.join(tmp_dir, "benchmark.db")}), \
+            mock.patch("workflow.agents.agent.get_llm", lambda **kwargs: EchoLLM()), \
+            mock.patch("workflow.agents.agent.env_bool", lambda name, default=False: False):
+        results = {}
+        print(f"iterations={args.iterations} channels={channels or '-'} (RAG 비활성화, 가짜 LLM, DB 쓰기 없음)")
+        print(f"{'engine':<10} {'mean(ms)':>9} {'p50(ms)':>8} {'p95(ms)':>8}")
+        for engine in GRAPH_ENGINES:
+            # 캐시된 그래프는 체크포인트 설정이 다를 수 있으므로 새로 생성
+            graph = create_content_graph(False, channels, engine)
+            results[engine] = _comparable(graph.invoke(create_initial_state(**brief)))
+            timings = _timings(lambda: graph.invoke(create_initial_state(**brief)), args.iterations)
+            print(
+                f"{engine:<10} {np.mean(timings):>9.3f} "
+                f"{np.percentile(timings, 50):>8.3f} {np.percentile(timings, 95):>8.3f}"
+            )
+
+    identical = all(result == results[GRAPH_ENGINES[0]] for result in results.values())
+    print(f"결과 일치: {'예' if identical else '아니오'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="그래프 생성 vs 캐시 재사용 준비 시간 비교")
+    parser.add_argument("--iterations", type=int, default=50, help="반복 횟수")
+    parser.add_argument("--no-rag", action="store_true", help="RAG 비활성화 설정으로 측정")
+    parser.add_argument("--channels", nargs="+", help="멀티 채널 그래프로 측정 (예: instagram blog email)")
+    parser.add_argument("--engines", action="store_true", help="langgraph / direct 엔진 실행 오버헤드 비교")
+    args = parser.parse_args()
+
+    if args.engines:
+        _engine_report(args)
+        return
+
+    enable_rag = not args.no_rag
+    cases = [
+        ("rebuild", lambda: create_content_graph(enable_rag, args.channels)),
+        ("cached", lambda: get_content_graph(enable_rag, args.channels)),
+    ]
+
+    print(f"iterations={args.iterations} enable_rag={enable_rag} channels={args.channels or '-'}")
+    print(f"{'case':<8} {'mean(ms)':>9} {'p50(ms)':>8} {'p95(ms)':>8}")
+    for name, build in cases:
+        timings = _timings(build, args.iterations)
+        print(
+            f"{name:<8} {np.mean(timings):>9.3f} "
+            f"{np.percentile(timings, 50):>8.3f} {np.percentile(timings, 95):>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
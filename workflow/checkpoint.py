@@ -0,0 +1,95 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from database.repository import checkpoint_repository
+from utils.config import env_float
+from workflow.engine import GraphSpec
+from workflow.state import ContentState
+
+
+# 오래된 체크포인트 정리 간격 (초) - 저장할 때마다 확인하되 최대 이 간격에 한 번만 삭제
+PRUNE_INTERVAL_SECONDS = 3600
+
+_last_prune = 0.0
+_prune_lock = threading.Lock()
+
+
+class CheckpointNode:
+    """
+    노드 완료 상태를 SQLite 체크포인트로 저장하는 노드 래퍼
+
+    실행이 실패하거나 중단되면 마지막으로 완료된 노드의 상태부터 이어서 실행할 수 있고,
+    전략 수립 이후 상태에서 초안만 다시 생성할 수도 있습니다.
+    """
+
+    def __init__(self, name: str, node: Any):
+        """
+        Args:
+            name: 노드 이름
+            node: 감쌀 노드 (run / run_direct 메서드)
+        """
+        self.name = name
+        self.node = node
+
+    def run(self, state: ContentState, config: Optional[Dict[str, Any]] = None) -> ContentState:
+        return self._save(self.node.run(state, config))
+
+    def run_direct(self, state: ContentState, config: Optional[Dict[str, Any]] = None) -> ContentState:
+        run = getattr(self.node, "run_direct", self.node.run)
+        return self._save(run(state, config))
+
+    def __getattr__(self, name: str):
+        # 조건부 노드의 should_run 등은 감싼 노드의 것을 사용
+        if name == "node":
+            raise AttributeError(name)
+        return getattr(self.node, name)
+
+    def _save(self, state: ContentState) -> ContentState:
+        checkpoint_repository.save(state["run_id"], self.name, state)
+        prune_checkpoints()
+        return state
+
+
+def prune_checkpoints(force: bool = False) -> int:
+    """
+    CHECKPOINT_TTL_DAYS가 지난 체크포인트 삭제
+
+    그래프는 프로세스 전역으로 캐시되므로 컴파일 시점이 아니라 저장 시점에 확인합니다.
+
+    Args:
+        force: 정리 간격과 관계없이 삭제
+
+    Returns:
+        삭제된 개수
+    """
+    global _last_prune
+    now = time.time()
+    if not force and now - _last_prune < PRUNE_INTERVAL_SECONDS:
+        return 0
+
+    with _prune_lock:
+        if not force and now - _last_prune < PRUNE_INTERVAL_SECONDS:
+            return 0
+        _last_prune = now
+    return checkpoint_repository.prune(ttl_seconds=env_float("CHECKPOINT_TTL_DAYS", 7.0) * 86400)
+
+
+def with_checkpoints(spec: GraphSpec) -> GraphSpec:
+    """그래프 명세의 모든 노드에 체크포인트 저장 추가 (오래된 체크포인트는 저장 시 정리)"""
+    return [(name, CheckpointNode(name, node)) for name, node in spec]
+
+
+def remaining_spec(spec: GraphSpec, start_after: Optional[str]) -> GraphSpec:
+    """
+    start_after 노드 이후의 명세 (이어서 실행할 부분)
+
+    Args:
+        start_after: 마지막으로 완료된 노드 (None이면 전체)
+    """
+    if not start_after:
+        return spec
+    names = [name for name, _ in spec]
+    if start_after not in names:
+        raise ValueError(f"Unknown node: {start_after} ({', '.join(names)})")
+    return spec[names.index(start_after) + 1:]
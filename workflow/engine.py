@@ -0,0 +1,112 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from langgraph.graph import StateGraph, END
+from workflow.state import ContentState
+
+
+# 실행 엔진
+# - langgraph: 노드마다 LangGraph 노드 / Agent마다 내부 LangGraph 사용
+# - direct: 같은 노드와 Agent 단계를 일반 함수 호출로 순서대로 실행
+GRAPH_ENGINES = ["langgraph", "direct"]
+
+# 그래프 명세: (노드 이름, run(state, config) 메서드를 가진 노드 객체) 실행 순서 목록
+# 노드에 should_run(state) 메서드가 있으면 조건부 노드 (거짓이면 다음 노드로 건너뜀)
+GraphSpec = List[Tuple[str, Any]]
+
+
+def should_run(node: Any, state: ContentState) -> bool:
+    """조건부 노드의 실행 여부 (조건이 없으면 항상 실행)"""
+    condition = getattr(node, "should_run", None)
+    return condition(state) if condition else True
+
+
+class DirectPipeline:
+    """
+    direct 엔진 실행기
+
+    컴파일된 LangGraph와 같은 invoke / stream(stream_mode="updates") 인터페이스를
+    제공하므로 호출하는 쪽은 엔진을 구분하지 않아도 됩니다.
+    """
+
+    def __init__(self, spec: GraphSpec):
+        # Agent는 내부 그래프 대신 run_direct 로 실행
+        self.nodes = [
+            (name, node, getattr(node, "run_direct", node.run))
+            for name, node in spec
+        ]
+
+    def stream(
+        self,
+        input: ContentState,
+        config: Optional[Dict[str, Any]] = None,
+        stream_mode: str = "updates"
+    ) -> Iterator[Dict[str, ContentState]]:
+        """노드가 끝날 때마다 {노드 이름: 상태} 반환"""
+        if stream_mode != "updates":
+            raise ValueError(f"direct engine supports stream_mode='updates' only: {stream_mode}")
+
+        state = input
+        for name, node, run in self.nodes:
+            if not should_run(node, state):
+                continue
+            state = run(state, config)
+            yield {name: state}
+
+    def invoke(self, input: ContentState, config: Optional[Dict[str, Any]] = None) -> ContentState:
+        """전체 실행 후 최종 상태 반환"""
+        state = input
+        for chunk in self.stream(input, config):
+            state = next(iter(chunk.values()))
+        return state
+
+
+def compile_spec(spec: GraphSpec, engine: str):
+    """
+    그래프 명세를 선택한 엔진으로 컴파일 (노드를 명세 순서대로 연결)
+
+    Args:
+        spec: 그래프 명세
+        engine: 실행 엔진 (langgraph, direct)
+    """
+    if engine not in GRAPH_ENGINES:
+        raise ValueError(f"Unknown GRAPH_ENGINE: {engine} ({', '.join(GRAPH_ENGINES)})")
+
+    # 남은 노드가 없으면 (이미 완료된 실행 재개) 입력 상태를 그대로 반환
+    if engine == "direct" or not spec:
+        return DirectPipeline(spec)
+
+    workflow = StateGraph(ContentState)
+    for name, node in spec:
+        workflow.add_node(name, node.run)
+
+    names = [name for name, _ in spec]
+    conditional = [hasattr(node, "should_run") for _, node in spec]
+
+    # 다음 노드가 조건부면 조건부 엣지 (실행할 첫 노드 또는 END로 이동)
+    for index in range(-1, len(spec) - 1):
+        following = index + 1
+        if conditional[following]:
+            route = _router(spec, following)
+            mapping = {name: name for name in names[following:]}
+            mapping[END] = END
+            if index < 0:
+                workflow.set_conditional_entry_point(route, mapping)
+            else:
+                workflow.add_conditional_edges(names[index], route, mapping)
+        elif index < 0:
+            workflow.set_entry_point(names[following])
+        else:
+            workflow.add_edge(names[index], names[following])
+    workflow.add_edge(names[-1], END)
+
+    return workflow.compile()
+
+
+def _router(spec: GraphSpec, start: int) -> Callable[[ContentState], str]:
+    """start 노드부터 실행할 첫 노드 이름을 반환하는 조건 함수 (모두 건너뛰면 END)"""
+    def route(state: ContentState) -> str:
+        for name, node in spec[start:]:
+            if should_run(node, state):
+                return name
+        return END
+    return route
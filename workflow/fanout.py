@@ -0,0 +1,90 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from workflow.agents.content_agent import ContentAgent
+from workflow.engine import compile_spec
+from workflow.review_gate import review_spec
+from workflow.state import AgentType, ContentState
+from workflow.streaming import with_token_scope
+
+
+def create_channel_graph(enable_rag: bool = True, engine: str = "langgraph"):
+    """
+    채널 하나의 CONTENT → (REVIEW_GATE →) REVIEW 분기 그래프 생성
+
+    Args:
+        enable_rag: RAG 활성화 여부
+        engine: 실행 엔진 (langgraph, direct)
+
+    Returns:
+        컴파일된 분기 그래프
+    """
+    spec = [(AgentType.CONTENT, ContentAgent(use_rag=enable_rag)), *review_spec()]
+    return compile_spec(spec, engine)
+
+
+class ChannelFanOut:
+    """
+    멀티 채널 분기 노드
+
+    한 번 수립된 전략을 공유하여 선택된 채널마다 CONTENT → REVIEW 분기를
+    병렬로 실행하고, 결과를 channel_results에 채널별로 모읍니다.
+    """
+
+    def __init__(self, use_rag: bool = True, engine: str = "langgraph"):
+        """
+        Args:
+            use_rag: RAG 활성화 여부
+            engine: 분기 실행 엔진 (langgraph, direct)
+        """
+        self.role = AgentType.CHANNELS
+        self.branch = create_channel_graph(use_rag, engine)
+
+    def _run_branch(self, state: ContentState, channel: str, config: Optional[Dict[str, Any]]) -> ContentState:
+        """채널 하나의 분기 실행 (대화 기록은 분기마다 복사)"""
+        branch_state = {
+            **state,
+            "channel": channel,
+            "channels": [],
+            "messages": list(state["messages"]),
+            "draft_content": None,
+            "final_content": None,
+            "review_gate": None,
+            "best_practice_docs": [],
+            "best_practice_context": None,
+            "run_metadata": {}
+        }
+        return self.branch.invoke(branch_state, with_token_scope(config, channel))
+
+    def run(self, state: ContentState, config: Optional[Dict[str, Any]] = None) -> ContentState:
+        """선택된 채널들의 분기를 병렬 실행"""
+        channels = state["channels"]
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=len(channels)) as executor:
+            futures = {
+                channel: executor.submit(self._run_branch, state, channel, config)
+                for channel in channels
+            }
+            results = {channel: future.result() for channel, future in futures.items()}
+
+        # 분기별 실행 정보는 "역할:채널" 키로 합침
+        run_metadata = dict(state.get("run_metadata") or {})
+        channel_results = {}
+        for channel, result in results.items():
+            channel_results[channel] = {
+                "draft_content": result.get("draft_content"),
+                "final_content": result.get("final_content"),
+                "best_practice_docs": result.get("best_practice_docs", []),
+            }
+            for role, metadata in (result.get("run_metadata") or {}).items():
+                run_metadata[AgentType.scoped(role, channel)] = metadata
+        run_metadata[self.role] = {"latency_ms": (time.perf_counter() - start) * 1000}
+
+        return {
+            **state,
+            "channel_results": channel_results,
+            "prev_node": self.role,
+            "run_metadata": run_metadata
+        }
@@ -1,51 +1,148 @@
-from langgraph.graph import StateGraph, END
-from workflow.state import ContentState, AgentType
+import os
+import threading
+from workflow.state import AgentType
 from workflow.agents.strategy_agent import StrategyAgent
 from workflow.agents.content_agent import ContentAgent
-from workflow.agents.review_agent import ReviewAgent
+from workflow.review_gate import review_nodes, review_spec
+from workflow.retrieval import RetrievalStage
+from workflow.fanout import ChannelFanOut
+from workflow.engine import GRAPH_ENGINES, GraphSpec, compile_spec
+from workflow.checkpoint import remaining_spec, with_checkpoints
+from utils.config import env_bool
+from typing import Any, Dict, List, Optional, Tuple
 
 
-def create_content_graph(enable_rag: bool = True):
+# 실행 엔진 (langgraph, direct)
+GRAPH_ENGINE = os.getenv("GRAPH_ENGINE", "langgraph").lower()
+
+_graph_cache: Dict[Tuple[bool, bool, str, Optional[str]], Any] = {}
+_graph_cache_lock = threading.Lock()
+
+
+def content_graph_spec(
+    enable_rag: bool = True,
+    channels: Optional[List[str]] = None,
+    engine: str = "langgraph"
+) -> GraphSpec:
+    """
+    콘텐츠 생성 그래프 명세 (노드 실행 순서, 두 엔진이 공유)
+    
+    Args:
+        enable_rag: RAG 활성화 여부
+        channels: 멀티 채널 모드에서 생성할 채널 목록
+        engine: 채널 분기 실행 엔진
+    """
+    spec = [
+        (AgentType.RETRIEVAL, RetrievalStage(use_rag=enable_rag)),
+        (AgentType.STRATEGY, StrategyAgent(use_rag=enable_rag)),
+    ]
+    
+    if channels and len(channels) > 1:
+        # 멀티 채널: 전략을 공유하여 채널별 분기 병렬 실행
+        spec.append((AgentType.CHANNELS, ChannelFanOut(use_rag=enable_rag, engine=engine)))
+    else:
+        spec.append((AgentType.CONTENT, ContentAgent(use_rag=enable_rag)))
+        # Review는 항상 RAG 미사용 (REVIEW_GATE가 켜져 있으면 사전 확인 후 조건부 검토)
+        spec.extend(review_spec())
+    
+    return spec
+
+
+def create_content_graph(
+    enable_rag: bool = True,
+    channels: Optional[List[str]] = None,
+    engine: Optional[str] = None,
+    start_after: Optional[str] = None
+):
     """
     마케팅 콘텐츠 생성 그래프 생성
     
-    Flow: STRATEGY → CONTENT → REVIEW → END
+    Flow: RETRIEVAL → STRATEGY → CONTENT → (REVIEW_GATE →) REVIEW → END
+    멀티 채널: RETRIEVAL → STRATEGY → CHANNELS(채널별 CONTENT → REVIEW 병렬) → END
+    
+    RETRIEVAL 단계에서 트렌드/모범 사례 검색을 동시에 수행하므로
+    Agent 실행 중에는 검색 왕복이 발생하지 않습니다.
     
     Args:
         enable_rag: RAG 활성화 여부
+        channels: 멀티 채널 모드에서 생성할 채널 목록 (2개 이상이면 전략을 공유하여 병렬 생성)
+        engine: 실행 엔진 (기본값: GRAPH_ENGINE). direct는 같은 Agent 단계를
+            LangGraph 없이 순서대로 호출하며 결과는 같습니다.
+        start_after: 이 노드 다음부터 실행 (체크포인트 상태로 이어서 실행할 때)
     
     Returns:
-        컴파일된 LangGraph
+        컴파일된 그래프 (invoke / stream 지원)
     """
+    engine = engine or GRAPH_ENGINE
+    if engine not in GRAPH_ENGINES:
+        raise ValueError(f"Unknown GRAPH_ENGINE: {engine} ({', '.join(GRAPH_ENGINES)})")
     
-    # 그래프 생성
-    workflow = StateGraph(ContentState)
+    spec = remaining_spec(content_graph_spec(enable_rag, channels, engine), start_after)
     
-    # 에이전트 인스턴스 생성
-    strategy_agent = StrategyAgent(use_rag=enable_rag)
-    content_agent = ContentAgent(use_rag=enable_rag)
-    review_agent = ReviewAgent()  # Review는 항상 RAG 미사용
+    # 노드 완료마다 상태를 체크포인트로 저장 (CHECKPOINTS=false면 생략)
+    if env_bool("CHECKPOINTS", True):
+        spec = with_checkpoints(spec)
     
-    # 노드 추가
-    workflow.add_node(AgentType.STRATEGY, strategy_agent.run)
-    workflow.add_node(AgentType.CONTENT, content_agent.run)
-    workflow.add_node(AgentType.REVIEW, review_agent.run)
+    return compile_spec(spec, engine)
+
+
+def get_content_graph(
+    enable_rag: bool = True,
+    channels: Optional[List[str]] = None,
+    engine: Optional[str] = None,
+    start_after: Optional[str] = None
+):
+    """
+    설정별로 컴파일된 그래프 반환 (프로세스 전역 캐시)
     
-    # 엣지 추가 (순차 실행)
-    workflow.add_edge(AgentType.STRATEGY, AgentType.CONTENT)
-    workflow.add_edge(AgentType.CONTENT, AgentType.REVIEW)
-    workflow.add_edge(AgentType.REVIEW, END)
+    그래프와 Agent는 실행별 상태를 갖지 않으므로 세션 / 스레드 간에 공유해도 안전합니다.
+    멀티 채널 그래프는 채널 목록을 실행 상태(channels)에서 읽으므로
+    채널 조합과 관계없이 하나를 재사용합니다.
     
-    # 시작점 설정
-    workflow.set_entry_point(AgentType.STRATEGY)
+    Args:
+        enable_rag: RAG 활성화 여부
+        channels: 멀티 채널 모드에서 생성할 채널 목록
+        engine: 실행 엔진 (기본값: GRAPH_ENGINE)
+        start_after: 이 노드 다음부터 실행
+    """
+    engine = engine or GRAPH_ENGINE
+    key = (enable_rag, bool(channels and len(channels) > 1), engine, start_after)
+    
+    graph = _graph_cache.get(key)
+    if graph is not None:
+        return graph
     
-    # 그래프 컴파일
-    return workflow.compile()
+    with _graph_cache_lock:
+        if key not in _graph_cache:
+            _graph_cache[key] = create_content_graph(enable_rag, channels, engine, start_after)
+        return _graph_cache[key]
+
+
+def content_graph_nodes(
+    enable_rag: bool = True,
+    channels: Optional[List[str]] = None
+) -> List[str]:
+    """
+    그래프의 노드 이름 목록 (content_graph_spec과 같은 실행 순서, 체크포인트 확인/재생용)
+    
+    Agent를 생성하거나 그래프를 컴파일하지 않습니다.
+    
+    Args:
+        enable_rag: RAG 활성화 여부 (노드 구성에는 영향 없음)
+        channels: 멀티 채널 모드에서 생성할 채널 목록
+    """
+    nodes = [AgentType.RETRIEVAL, AgentType.STRATEGY]
+    if channels and len(channels) > 1:
+        nodes.append(AgentType.CHANNELS)
+    else:
+        nodes.append(AgentType.CONTENT)
+        nodes.extend(review_nodes())
+    return nodes
 
 
 if __name__ == "__main__":
     """그래프 시각화 (개발/디버깅용)"""
-    graph = create_content_graph(True)
+    graph = create_content_graph(True, engine="langgraph")
     
     try:
         graph_image = graph.get_graph().draw_mermaid_png()
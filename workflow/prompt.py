@@ -0,0 +1,267 @@
+import re
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from utils.config import env_int
+from utils.tokens import count_tokens, truncate_tokens
+
+
+# 메시지마다 붙는 채팅 형식 토큰 (역할 / 구분자)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# 잘린 컨텍스트 / 대화 기록 끝에 붙이는 표시
+TRUNCATED_MARKER = "\n...(생략)"
+
+
+def prompt_token_budget(role: str) -> int:
+    """
+    에이전트별 입력 토큰 예산
+
+    PROMPT_TOKEN_BUDGET_<역할> (예: PROMPT_TOKEN_BUDGET_REVIEW_AGENT) 이 있으면 우선 사용합니다.
+    """
+    suffix = re.sub(r"[^A-Z0-9]", "_", role.upper())
+    return env_int(f"PROMPT_TOKEN_BUDGET_{suffix}", env_int("PROMPT_TOKEN_BUDGET", 8000))
+
+
+def context_token_budget() -> int:
+    """검색 컨텍스트 하나(트렌드 / 모범 사례)의 토큰 예산 (0이면 제한 없음)"""
+    return env_int("CONTEXT_TOKEN_BUDGET", 1500)
+
+
+def _message_tokens(message: BaseMessage) -> int:
+    return count_tokens(message.content) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _history_message(entry: Dict[str, str]) -> BaseMessage:
+    """대화 기록 항목을 메시지로 변환"""
+    if entry["role"] == "assistant":
+        return AIMessage(content=entry["content"])
+    return HumanMessage(content=f"{entry['role']}: {entry['content']}")
+
+
+def build_messages(
+    system_prompt: str,
+    history: List[Dict[str, str]],
+    render_prompt: Callable[[str], str],
+    context: str,
+    budget: int
+) -> Tuple[List[BaseMessage], Dict[str, Any]]:
+    """
+    토큰 예산 안에서 LLM 메시지 구성
+
+    1. 시스템 프롬프트와 현재 프롬프트는 항상 포함합니다.
+    2. 예산을 넘으면 검색 컨텍스트를 앞쪽(관련도 높은 문서)부터 남기고 자릅니다.
+    3. 대화 기록은 이미 프롬프트에 포함된 내용(전략, 초안 등)과 중복 항목을 제외하고,
+       남은 예산 안에서 최근 항목부터 채웁니다.
+
+    Args:
+        system_prompt: 시스템 프롬프트
+        history: ContentState의 대화 기록 ({"role", "content"} 목록)
+        render_prompt: 컨텍스트를 받아 현재 프롬프트를 만드는 함수
+        context: 검색 컨텍스트
+        budget: 입력 토큰 예산
+
+    Returns:
+        (메시지 목록, 통계 {"prompt_tokens", "prompt_tokens_saved", "history_dropped", "context_truncated"})
+    """
+    system_message = SystemMessage(content=system_prompt)
+    prompt = render_prompt(context)
+    full_prompt_tokens = count_tokens(prompt)
+
+    # 컨텍스트 자르기 (컨텍스트 없는 프롬프트는 예산과 관계없이 포함)
+    used = _message_tokens(system_message) + full_prompt_tokens + MESSAGE_OVERHEAD_TOKENS
+    context_truncated = False
+    if context and used > budget:
+        base_tokens = used - count_tokens(context)
+        context = truncate_tokens(context, budget - base_tokens - count_tokens(TRUNCATED_MARKER))
+        context = context + TRUNCATED_MARKER if context else ""
+        context_truncated = True
+        prompt = render_prompt(context)
+        used = _message_tokens(system_message) + count_tokens(prompt) + MESSAGE_OVERHEAD_TOKENS
+
+    # 대화 기록: 프롬프트에 이미 있는 내용 / 중복 제외 후 최근 항목부터 예산만큼
+    seen = set()
+    kept: List[BaseMessage] = []
+    naive_history_tokens = 0
+    for entry in reversed(history):
+        message = _history_message(entry)
+        tokens = _message_tokens(message)
+        naive_history_tokens += tokens
+
+        content = entry["content"].strip()
+        if not content or content in seen or content in prompt:
+            continue
+        seen.add(content)
+
+        if used + tokens > budget:
+            continue
+        kept.append(message)
+        used += tokens
+
+    naive_tokens = (
+        _message_tokens(system_message) + full_prompt_tokens + MESSAGE_OVERHEAD_TOKENS
+        + naive_history_tokens
+    )
+    messages = [system_message, *reversed(kept), HumanMessage(content=prompt)]
+    return messages, {
+        "prompt_tokens": used,
+        "prompt_tokens_saved": naive_tokens - used,
+        "history_dropped": len(history) - len(kept),
+        "context_truncated": context_truncated,
+    }
+
+
+# 겹친 청크로 판단할 최소 겹침 길이 (ingest 청크 겹침은 기본 100자)
+MIN_OVERLAP_CHARS = 30
+
+# 남은 예산이 이보다 작으면 다음 문서를 잘라 넣지 않음
+MIN_DOC_TOKENS = 50
+
+
+class ContextPackingStats:
+    """컨텍스트 패킹 누적 통계 (프로세스 전체)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.raw_tokens = 0
+        self.packed_tokens = 0
+        self.duplicates = 0
+
+    def record(self, stats: Dict[str, Any]):
+        with self._lock:
+            self.calls += 1
+            self.raw_tokens += stats["raw_tokens"]
+            self.packed_tokens += stats["packed_tokens"]
+            self.duplicates += stats["duplicates"]
+
+    def stats(self) -> Dict[str, Any]:
+        """{"calls", "raw_tokens", "packed_tokens", "saved_tokens", "duplicates"}"""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "raw_tokens": self.raw_tokens,
+                "packed_tokens": self.packed_tokens,
+                "saved_tokens": self.raw_tokens - self.packed_tokens,
+                "duplicates": self.duplicates,
+            }
+
+
+context_packing_stats = ContextPackingStats()
+
+
+def normalize_whitespace(text: str) -> str:
+    """줄마다 들여쓰기 / 연속 공백을 정리하고 빈 줄 제거"""
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _strip_overlap(text: str, kept: str) -> str:
+    """
+    앞서 포함된 문서와 겹치는 부분 제거
+
+    인접 청크는 한쪽의 끝부분이 다른 쪽의 앞부분과 같으므로 (청크 겹침),
+    kept의 끝과 겹치는 text의 앞부분 / kept의 앞과 겹치는 text의 끝부분을 잘라냅니다.
+    """
+    head = text[:MIN_OVERLAP_CHARS]
+    start = kept.find(head)
+    while len(head) == MIN_OVERLAP_CHARS and start != -1:
+        if text.startswith(kept[start:]):
+            text = text[len(kept) - start:]
+            break
+        start = kept.find(head, start + 1)
+
+    tail = text[-MIN_OVERLAP_CHARS:]
+    end = kept.rfind(tail)
+    while len(tail) == MIN_OVERLAP_CHARS and end != -1:
+        if text.endswith(kept[:end + MIN_OVERLAP_CHARS]):
+            text = text[:len(text) - end - MIN_OVERLAP_CHARS]
+            break
+        end = kept.rfind(tail, 0, end + MIN_OVERLAP_CHARS - 1)
+
+    return text.strip()
+
+
+def _doc_header(index: int, metadata: Dict[str, Any]) -> str:
+    """참고자료 머리글 (출처 / 카테고리 / 채널)"""
+    source = metadata.get("source", "Unknown")
+    category = metadata.get("category", "")
+    channel = metadata.get("channel", "")
+
+    header = f"[참고자료 {index}]"
+    if source != "Unknown":
+        header += f" 출처: {source}"
+    if category:
+        header += f", 카테고리: {category}"
+    if channel:
+        header += f", 채널: {channel}"
+    return header
+
+
+def pack_context(docs: List, budget: int) -> Tuple[str, Dict[str, Any]]:
+    """
+    검색 문서를 토큰 예산 안의 컨텍스트 문자열로 구성
+
+    1. 공백 정리 (코퍼스 문자열의 들여쓰기 / 빈 줄 제거)
+    2. 중복 / 겹친 청크 제거 (같은 내용, 포함된 내용, 인접 청크의 겹침 부분)
+    3. 예산이 남는 동안 검색 순위가 높은 문서부터 포함 (마지막 문서는 잘라서 포함)
+
+    Args:
+        docs: 검색 순위 순서의 문서 목록 (page_content, metadata)
+        budget: 컨텍스트 토큰 예산 (0 이하면 제한 없음)
+
+    Returns:
+        (컨텍스트, 통계 {"docs", "packed_docs", "duplicates", "raw_tokens", "packed_tokens", "saved_tokens"})
+    """
+    if not docs:
+        return "", {"docs": 0, "packed_docs": 0, "duplicates": 0,
+                    "raw_tokens": 0, "packed_tokens": 0, "saved_tokens": 0}
+
+    # 원래 형식 (문서를 그대로 이어 붙인 경우)의 토큰 수
+    raw_tokens = sum(
+        count_tokens(f"{_doc_header(i + 1, doc.metadata)}\n{doc.page_content}\n\n")
+        for i, doc in enumerate(docs)
+    )
+
+    kept: List[str] = []
+    sections: List[str] = []
+    duplicates = 0
+    used = 0
+    for doc in docs:
+        text = normalize_whitespace(doc.page_content)
+        for previous in kept:
+            if text in previous:
+                text = ""
+                break
+            text = _strip_overlap(text, previous)
+        if not text:
+            duplicates += 1
+            continue
+
+        section = f"{_doc_header(len(sections) + 1, doc.metadata)}\n{text}"
+        tokens = count_tokens(section) + 1
+        if budget > 0 and used + tokens > budget:
+            remaining = budget - used
+            if remaining >= MIN_DOC_TOKENS:
+                sections.append(truncate_tokens(section, remaining - count_tokens(TRUNCATED_MARKER)) + TRUNCATED_MARKER)
+                kept.append(text)
+            break
+
+        sections.append(section)
+        kept.append(text)
+        used += tokens
+
+    context = "\n\n".join(sections) + "\n\n" if sections else ""
+    packed_tokens = count_tokens(context)
+    stats = {
+        "docs": len(docs),
+        "packed_docs": len(sections),
+        "duplicates": duplicates,
+        "raw_tokens": raw_tokens,
+        "packed_tokens": packed_tokens,
+        "saved_tokens": raw_tokens - packed_tokens,
+    }
+    context_packing_stats.record(stats)
+    return context, stats
@@ -0,0 +1,82 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from retrieval.vector_store import search_best_practices, search_marketing_trends
+from utils.rate_limiter import priority_scope
+from workflow.prompt import context_token_budget, pack_context
+from workflow.state import AgentType, ContentState
+
+
+def retrieve_trends(state: Dict[str, Any]) -> List:
+    """비즈니스 정보로 마케팅 트렌드 검색"""
+    query = f"{state['business_name']} {state['target_customer']} {state['channel']} 마케팅 트렌드"
+    return search_marketing_trends(query, k=2)
+
+
+def retrieve_best_practices(state: Dict[str, Any]) -> List:
+    """채널별 모범 사례 검색"""
+    return search_best_practices(state["channel"], k=2)
+
+
+class RetrievalStage:
+    """
+    그래프 시작 단계의 검색 노드
+
+    트렌드 검색과 모범 사례 검색은 LLM 결과에 의존하지 않으므로,
+    첫 Agent 실행 전에 두 검색을 동시에 수행하여 결과를 상태에 담아 둡니다.
+    Agent는 상태에 미리 검색된 컨텍스트가 있으면 다시 검색하지 않습니다.
+    """
+
+    def __init__(self, use_rag: bool = True):
+        """
+        Args:
+            use_rag: RAG 사용 여부 (False면 검색하지 않고 빈 컨텍스트 기록)
+        """
+        self.role = AgentType.RETRIEVAL
+        self.use_rag = use_rag
+
+    @staticmethod
+    def _search(search: Callable[[Dict[str, Any]], List], state: ContentState) -> List:
+        """검색 스레드에서 실행 우선순위를 적용하여 검색"""
+        with priority_scope(state.get("priority"), state.get("run_id")):
+            return search(state)
+
+    def run(self, state: ContentState, config: Optional[Dict[str, Any]] = None) -> ContentState:
+        """두 검색을 동시에 실행하고 문서와 컨텍스트를 상태에 저장"""
+        start = time.perf_counter()
+
+        # 멀티 채널 모드에서는 모범 사례를 채널별 분기에서 검색
+        multi_channel = bool(state.get("channels"))
+
+        if self.use_rag:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                trends = executor.submit(self._search, retrieve_trends, state)
+                practices = None if multi_channel else executor.submit(self._search, retrieve_best_practices, state)
+                trend_docs = trends.result() or []
+                practice_docs = (practices.result() or []) if practices else []
+        else:
+            trend_docs, practice_docs = [], []
+
+        # 컨텍스트 패킹 (공백 정리 / 중복 제거 / 토큰 예산)
+        budget = context_token_budget()
+        trend_context, trend_stats = pack_context(trend_docs, budget)
+        practice_context, practice_stats = pack_context(practice_docs, budget)
+
+        run_metadata = {
+            **(state.get("run_metadata") or {}),
+            self.role: {
+                "latency_ms": (time.perf_counter() - start) * 1000,
+                "context_tokens": trend_stats["packed_tokens"] + practice_stats["packed_tokens"],
+                "context_tokens_saved": trend_stats["saved_tokens"] + practice_stats["saved_tokens"],
+            },
+        }
+        return {
+            **state,
+            "trend_docs": [doc.page_content for doc in trend_docs],
+            "best_practice_docs": [doc.page_content for doc in practice_docs],
+            "trend_context": trend_context,
+            "best_practice_context": None if multi_channel else practice_context,
+            "prev_node": self.role,
+            "run_metadata": run_metadata,
+        }
@@ -0,0 +1,233 @@
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from workflow.agents.review_agent import ReviewAgent
+from workflow.state import AgentType, ContentState
+
+
+# 검토 사전 확인 모드
+# - off: 사전 확인 없이 항상 검토
+# - skip: 채널 규칙을 모두 통과하면 검토 LLM 호출 생략 (초안을 최종 콘텐츠로 사용)
+# - edits: 모두 통과하면 편집 목록 모드로 짧게 검토
+REVIEW_GATE_MODES = ["off", "skip", "edits"]
+
+# 행동 유도(CTA) 표현: 행동 동사 + 권유/요청 어미, 또는 링크/DM 안내
+# ("지금", "방문객", "예약 시스템"처럼 단어만 등장하는 문장은 CTA로 보지 않음)
+CTA_VERBS = (
+    r"방문|예약|신청|구매|주문|문의|클릭|팔로우|구독|참여|확인|저장|공유|연락|등록|"
+    r"다운로드|체험|시작|상담|댓글|좋아요"
+)
+CTA_PATTERN = re.compile(
+    rf"(?:{CTA_VERBS})\s*(?:을|를)?\s*(?:하세요|하십시오|하기\b|해\s*(?:주세요|보세요)|주세요|부탁드(?:려요|립니다))"
+    r"|(?:남겨|눌러|들러|와|만나|즐겨|맛보|받아)\s*(?:주세요|보세요)|놀러\s*오세요"
+    r"|https?://\S+|(?:프로필|바이오)\s*(?:의\s*)?링크|링크\s*(?:를|에서|로|클릭|확인|참고)|(?:DM|디엠)\s*(?:으로|로|주세요|보내)|👉"
+)
+
+HASHTAG_PATTERN = re.compile(r"#[^\s#]+")
+HEADING_PATTERN = re.compile(r"^\s*(#{1,6}\s+\S|\*\*[^*]+\*\*\s*$)", re.MULTILINE)
+SUBJECT_PATTERN = re.compile(r"^\W*(?:제목|subject)\W*[:：]\s*(.+)$", re.IGNORECASE | re.MULTILINE)
+
+
+def _check_cta(text: str) -> Optional[str]:
+    return None if CTA_PATTERN.search(text) else "행동 유도(CTA) 문구가 없습니다"
+
+
+def _check_instagram(text: str) -> List[Optional[str]]:
+    hashtags = len(HASHTAG_PATTERN.findall(text))
+    return [None if 5 <= hashtags <= 8 else f"해시태그가 {hashtags}개입니다 (5-8개 필요)"]
+
+
+def _check_blog(text: str) -> List[Optional[str]]:
+    length = len(re.sub(r"\s", "", text))
+    headings = len(HEADING_PATTERN.findall(text))
+    return [
+        None if length >= 500 else f"본문이 {length}자입니다 (500자 이상 필요)",
+        None if headings >= 2 else f"제목/소제목이 {headings}개입니다 (2개 이상 필요)",
+    ]
+
+
+def _check_email(text: str) -> List[Optional[str]]:
+    match = SUBJECT_PATTERN.search(text)
+    if not match:
+        return ["이메일 제목이 없습니다"]
+    subject = match.group(1).strip().strip("*").strip()
+    return [None if len(subject) <= 40 else f"이메일 제목이 {len(subject)}자입니다 (40자 이내 필요)"]
+
+
+# 채널별 규칙 (ContentAgent 작성 지침 / ReviewAgent 체크리스트와 같은 기준)
+CHANNEL_CHECKS: Dict[str, Callable[[str], List[Optional[str]]]] = {
+    "instagram": _check_instagram,
+    "blog": _check_blog,
+    "email": _check_email,
+}
+
+
+def check_draft(channel: str, text: Optional[str]) -> List[str]:
+    """
+    초안이 채널 규칙을 만족하는지 확인
+
+    Args:
+        channel: 채널
+        text: 초안
+
+    Returns:
+        통과하지 못한 규칙 설명 목록 (모두 통과하면 빈 목록)
+    """
+    if not text or not text.strip():
+        return ["초안이 비어 있습니다"]
+    results = [_check_cta(text), *CHANNEL_CHECKS.get(channel, lambda _: [])(text)]
+    return [failure for failure in results if failure]
+
+
+class ReviewGateStats:
+    """검토 생략 통계 (프로세스 전체, 절약 시간은 실제 검토 평균 지연 시간으로 추정)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.passed = 0
+        self.skipped = 0
+        self.reviews = 0
+        self.review_ms = 0.0
+        self.saved_ms = 0.0
+
+    def avg_review_ms(self) -> float:
+        with self._lock:
+            return self.review_ms / self.reviews if self.reviews else 0.0
+
+    def record_check(self, passed: bool, skipped: bool, saved_ms: float):
+        with self._lock:
+            self.checked += 1
+            self.passed += passed
+            self.skipped += skipped
+            self.saved_ms += saved_ms
+
+    def record_review(self, latency_ms: float):
+        with self._lock:
+            self.reviews += 1
+            self.review_ms += latency_ms
+
+    def stats(self) -> Dict[str, Any]:
+        """{"checked", "passed", "skipped", "saved_ms", "avg_review_ms"}"""
+        avg_review_ms = self.avg_review_ms()
+        with self._lock:
+            return {
+                "checked": self.checked,
+                "passed": self.passed,
+                "skipped": self.skipped,
+                "saved_ms": self.saved_ms,
+                "avg_review_ms": avg_review_ms,
+            }
+
+
+review_gate_stats = ReviewGateStats()
+
+
+class ReviewGate:
+    """
+    검토 사전 확인 노드
+
+    초안을 채널 규칙으로 빠르게 확인하여 review_gate 에 결과를 기록합니다.
+    skip 모드에서 모두 통과하면 초안을 최종 콘텐츠로 사용하고, 다음 검토 노드는
+    조건부 엣지로 건너뜁니다.
+    """
+
+    def __init__(self, mode: str):
+        """
+        Args:
+            mode: 사전 확인 모드 (skip, edits)
+        """
+        self.role = AgentType.REVIEW_GATE
+        self.mode = mode
+
+    def run(self, state: ContentState, config: Optional[Dict[str, Any]] = None) -> ContentState:
+        start = time.perf_counter()
+        failures = check_draft(state["channel"], state.get("draft_content"))
+        passed = not failures
+        skipped = passed and self.mode == "skip"
+
+        # 통과하지 못한 규칙은 검토 프롬프트에 전달
+        review_gate = {
+            "passed": passed,
+            "failures": failures,
+            "skip_review": skipped,
+            "review_mode": "edits" if passed and self.mode == "edits" else None,
+        }
+        saved_ms = review_gate_stats.avg_review_ms() if skipped else 0.0
+        review_gate_stats.record_check(passed, skipped, saved_ms)
+
+        run_metadata = {
+            **(state.get("run_metadata") or {}),
+            self.role: {
+                "latency_ms": (time.perf_counter() - start) * 1000,
+                "passed": passed,
+                "failures": failures,
+                "review_skipped": skipped,
+                "saved_ms": saved_ms,
+            },
+        }
+        new_state = {**state, "review_gate": review_gate, "prev_node": self.role, "run_metadata": run_metadata}
+        if skipped:
+            new_state["final_content"] = state.get("draft_content")
+        return new_state
+
+
+class GatedReview:
+    """사전 확인 결과에 따라 실행되는 검토 노드 (실제 검토 지연 시간을 통계에 기록)"""
+
+    def __init__(self, review: ReviewAgent):
+        self.review = review
+
+    def should_run(self, state: ContentState) -> bool:
+        return not (state.get("review_gate") or {}).get("skip_review")
+
+    def run(self, state: ContentState, config: Optional[Dict[str, Any]] = None) -> ContentState:
+        return self._record(self.review.run(state, config))
+
+    def run_direct(self, state: ContentState, config: Optional[Dict[str, Any]] = None) -> ContentState:
+        return self._record(self.review.run_direct(state, config))
+
+    def _record(self, state: ContentState) -> ContentState:
+        metadata = state["run_metadata"].get(AgentType.REVIEW, {})
+        if not metadata.get("cache_hit"):
+            review_gate_stats.record_review(metadata.get("latency_ms", 0.0))
+        return state
+
+
+def _review_gate_mode(mode: Optional[str] = None) -> str:
+    mode = (mode or os.getenv("REVIEW_GATE", "off")).lower()
+    if mode not in REVIEW_GATE_MODES:
+        raise ValueError(f"Unknown REVIEW_GATE: {mode} ({', '.join(REVIEW_GATE_MODES)})")
+    return mode
+
+
+def review_nodes(mode: Optional[str] = None) -> List[str]:
+    """
+    검토 단계 노드 이름 (review_spec과 같은 순서, Agent를 생성하지 않음)
+
+    Args:
+        mode: 사전 확인 모드 (기본값: REVIEW_GATE 환경변수, off)
+    """
+    if _review_gate_mode(mode) == "off":
+        return [AgentType.REVIEW]
+    return [AgentType.REVIEW_GATE, AgentType.REVIEW]
+
+
+def review_spec(mode: Optional[str] = None) -> List:
+    """
+    검토 단계 그래프 명세 (단일 채널 그래프와 채널 분기 그래프가 공유)
+
+    Args:
+        mode: 사전 확인 모드 (기본값: REVIEW_GATE 환경변수, off)
+    """
+    mode = _review_gate_mode(mode)
+    if mode == "off":
+        return [(AgentType.REVIEW, ReviewAgent())]
+    return [
+        (AgentType.REVIEW_GATE, ReviewGate(mode)),
+        (AgentType.REVIEW, GatedReview(ReviewAgent())),
+    ]
+
@@ -1,21 +1,43 @@
-from typing import Dict, List, TypedDict, Optional
+import uuid
+from typing import Any, Dict, List, TypedDict, Optional
+from utils.rate_limiter import INTERACTIVE
 
 
 class AgentType:
     """에이전트 타입 상수"""
+    RETRIEVAL = "RETRIEVAL"
     STRATEGY = "STRATEGY_AGENT"
     CONTENT = "CONTENT_AGENT"
     REVIEW = "REVIEW_AGENT"
+    REVIEW_GATE = "REVIEW_GATE"
+    CHANNELS = "CHANNEL_FANOUT"
+    
+    # 채널별 분기 실행 시 역할 이름에 붙는 구분자 (예: CONTENT_AGENT:blog)
+    SCOPE_SEPARATOR = ":"
+
+    @classmethod
+    def scoped(cls, role: str, scope: str) -> str:
+        """역할 이름에 범위(채널) 추가"""
+        return f"{role}{cls.SCOPE_SEPARATOR}{scope}"
 
     @classmethod
     def to_korean(cls, role: str) -> str:
         """에이전트 역할을 한글로 변환"""
-        if role == cls.STRATEGY:
+        if cls.SCOPE_SEPARATOR in role:
+            base, scope = role.split(cls.SCOPE_SEPARATOR, 1)
+            return f"{cls.to_korean(base)} ({scope})"
+        elif role == cls.RETRIEVAL:
+            return "자료 검색"
+        elif role == cls.STRATEGY:
             return "전략 수립"
         elif role == cls.CONTENT:
             return "콘텐츠 생성"
         elif role == cls.REVIEW:
             return "검토 및 최적화"
+        elif role == cls.REVIEW_GATE:
+            return "검토 사전 확인"
+        elif role == cls.CHANNELS:
+            return "채널별 생성"
         else:
             return role
 
@@ -26,18 +48,76 @@ class ContentState(TypedDict):
     business_name: str
     business_features: str
     target_customer: str
-    channel: str  # blog, instagram, email
+    channel: str  # blog, instagram, email (멀티 채널이면 채널 목록 문자열)
+    channels: List[str]  # 멀티 채널 모드에서 선택된 채널 목록 (단일 채널이면 빈 목록)
     tone: str
+    reuse_strategy: bool  # 같은 브리프의 캐시된 전략 재사용 여부
     
     # Agent 처리 과정
     messages: List[Dict]  # Agent들의 대화 기록
     strategy: Optional[str]  # 전략 수립 결과
     draft_content: Optional[str]  # 초안 콘텐츠
     final_content: Optional[str]  # 최종 콘텐츠
+    review_gate: Optional[Dict[str, Any]]  # 검토 사전 확인 결과 (통과 여부, 실패 규칙, 검토 생략 여부)
     
     # RAG 관련
     trend_docs: List[str]  # 검색된 트렌드 문서
     best_practice_docs: List[str]  # 검색된 모범 사례 문서
+    trend_context: Optional[str]  # 미리 검색된 트렌드 컨텍스트 (None이면 Agent가 직접 검색)
+    best_practice_context: Optional[str]  # 미리 검색된 모범 사례 컨텍스트
+    
+    # 멀티 채널 결과 (채널 → draft_content, final_content, best_practice_docs)
+    channel_results: Dict[str, Dict[str, Any]]
     
     # 상태 추적
+    run_id: str  # 실행 ID (같은 우선순위 클래스 안에서 실행 단위로 공정하게 처리)
+    priority: str  # Azure 호출 우선순위 (interactive, batch, background)
     prev_node: str
+    run_metadata: Dict[str, Dict[str, Any]]  # Agent별 실행 정보 (지연 시간, 캐시 적중 등)
+
+
+def create_initial_state(
+    business_name: str,
+    business_features: str,
+    target_customer: str,
+    channel: str,
+    tone: str,
+    channels: Optional[List[str]] = None,
+    priority: str = INTERACTIVE,
+    run_id: Optional[str] = None,
+    reuse_strategy: bool = False
+) -> ContentState:
+    """
+    그래프 실행용 초기 상태 생성
+
+    Args:
+        channel: 단일 채널 모드의 채널
+        channels: 멀티 채널 모드의 채널 목록 (2개 이상이면 channel 대신 사용)
+        priority: Azure 호출 우선순위 클래스
+        run_id: 실행 ID (기본값: 새 ID, 체크포인트 키로 사용)
+        reuse_strategy: 같은 브리프의 캐시된 전략 재사용 여부
+    """
+    channels = channels if channels and len(channels) > 1 else []
+    return {
+        "business_name": business_name,
+        "business_features": business_features,
+        "target_customer": target_customer,
+        "channel": ", ".join(channels) if channels else channel,
+        "channels": channels,
+        "tone": tone,
+        "reuse_strategy": reuse_strategy,
+        "messages": [],
+        "strategy": None,
+        "draft_content": None,
+        "final_content": None,
+        "review_gate": None,
+        "trend_docs": [],
+        "best_practice_docs": [],
+        "trend_context": None,
+        "best_practice_context": None,
+        "channel_results": {},
+        "run_id": run_id or uuid.uuid4().hex,
+        "priority": priority,
+        "prev_node": "START",
+        "run_metadata": {}
+    }
@@ -0,0 +1,161 @@
+"""
+전략 캐시
+
+같은 비즈니스 브리프(비즈니스명, 비즈니스 특징, 타겟 고객, 채널)로 다시 생성할 때
+(톤만 바꾸거나 초안만 새로 받는 경우) 이전에 수립한 전략을 재사용합니다.
+재사용은 실행마다 선택(reuse_strategy)하며, 새로 수립된 전략은 항상 저장됩니다.
+
+비즈니스 특징이 저장되기 전의 히스토리에서 가져온 전략은 특징을 비운 키로 저장되며,
+같은 비즈니스명 / 타겟 고객 / 채널의 브리프에 정확히 일치하는 전략이 없을 때 사용됩니다.
+
+사용법:
+    python -m workflow.strategy_cache --seed                 # 히스토리의 전략으로 캐시 채우기
+    python -m workflow.strategy_cache --invalidate 비즈니스명  # 비즈니스의 전략 삭제
+    python -m workflow.strategy_cache --clear                # 전체 삭제
+"""
+import argparse
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from database.repository import content_repository, strategy_cache_repository
+from database.session import db_session
+from utils.config import env_bool, env_float, env_int
+
+# 캐시 키를 구성하는 브리프 필드 (톤은 제외)
+STRATEGY_BRIEF_FIELDS = ("business_name", "business_features", "target_customer")
+
+
+def _normalize(value: Any) -> str:
+    """공백 / 대소문자 차이를 무시하도록 정규화"""
+    return " ".join(str(value or "").split()).lower()
+
+
+def brief_channel(brief: Dict[str, Any]) -> str:
+    """캐시 키의 채널 (멀티 채널은 선택 순서와 관계없이 정렬)"""
+    channels = brief.get("channels")
+    return ", ".join(sorted(channels)) if channels else brief["channel"]
+
+
+def strategy_cache_key(brief: Dict[str, Any]) -> str:
+    """
+    정규화한 브리프로 캐시 키 생성
+
+    Args:
+        brief: 브리프 필드와 channel / channels 를 가진 딕셔너리 (ContentState 포함)
+    """
+    payload = {field: _normalize(brief.get(field)) for field in STRATEGY_BRIEF_FIELDS}
+    payload["channel"] = _normalize(brief_channel(brief))
+    return hashlib.sha256(
+        json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def legacy_strategy_cache_key(brief: Dict[str, Any]) -> str:
+    """비즈니스 특징 없이 저장된 이전 히스토리 전략의 캐시 키"""
+    return strategy_cache_key({**brief, "business_features": ""})
+
+
+def _ttl_seconds() -> float:
+    return env_float("STRATEGY_CACHE_TTL_DAYS", 30.0) * 86400
+
+
+def lookup_strategy(brief: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    캐시된 전략 조회 (정확히 일치하는 전략이 없으면 이전 히스토리에서 가져온 전략)
+
+    Returns:
+        {"strategy", "latency_ms"} 또는 None (STRATEGY_CACHE=false면 항상 None)
+    """
+    if not env_bool("STRATEGY_CACHE", True):
+        return None
+    for key in dict.fromkeys([strategy_cache_key(brief), legacy_strategy_cache_key(brief)]):
+        cached = strategy_cache_repository.get(key, ttl_seconds=_ttl_seconds())
+        if cached:
+            return cached
+    return None
+
+
+def _put(brief: Dict[str, Any], key: str, strategy: str, **kwargs) -> bool:
+    return strategy_cache_repository.put(
+        key,
+        business_name=brief["business_name"],
+        channel=brief_channel(brief),
+        strategy=strategy,
+        max_entries=env_int("STRATEGY_CACHE_MAX_ENTRIES", 1000),
+        ttl_seconds=_ttl_seconds(),
+        **kwargs
+    )
+
+
+def store_strategy(brief: Dict[str, Any], strategy: str, latency_ms: Optional[float] = None):
+    """새로 수립된 전략 저장 (같은 브리프의 이전 전략은 교체)"""
+    if not env_bool("STRATEGY_CACHE", True) or not strategy:
+        return
+    _put(brief, strategy_cache_key(brief), strategy, latency_ms=latency_ms)
+
+
+def invalidate_strategy(brief: Dict[str, Any]) -> int:
+    """브리프의 캐시된 전략 삭제 (이전 히스토리에서 가져온 전략 포함)"""
+    return sum(
+        strategy_cache_repository.invalidate(key=key)
+        for key in dict.fromkeys([strategy_cache_key(brief), legacy_strategy_cache_key(brief)])
+    )
+
+
+def seed_from_history() -> int:
+    """
+    히스토리에 저장된 전략으로 캐시 채우기 (이미 캐시된 브리프는 유지)
+
+    비즈니스 특징이 저장되지 않은 이전 레코드는 특징을 비운 키로 저장합니다.
+
+    Returns:
+        추가된 전략 수
+    """
+    # 멀티 채널로 함께 생성된 레코드는 하나의 전략을 공유
+    groups: Dict[str, List] = {}
+    for history in content_repository.get_with_strategy():
+        groups.setdefault(history.group_id or f"id-{history.id}", []).append(history)
+
+    added = 0
+    for histories in groups.values():
+        latest = histories[0]
+        channels = [history.channel for history in histories]
+        brief = {
+            "business_name": latest.business_name,
+            "business_features": latest.business_features or "",
+            "target_customer": latest.target_customer,
+            "channel": channels[0],
+            "channels": channels if len(channels) > 1 else [],
+        }
+        # 최신 레코드부터 처리하므로 같은 브리프는 가장 최근 전략이 남음
+        added += _put(
+            brief,
+            strategy_cache_key(brief),
+            latest.strategy,
+            created_at=datetime.strptime(latest.date, "%Y-%m-%d %H:%M:%S").timestamp(),
+            replace=False
+        )
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전략 캐시 관리")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--seed", action="store_true", help="히스토리의 전략으로 캐시 채우기")
+    group.add_argument("--invalidate", metavar="BUSINESS_NAME", help="비즈니스의 캐시된 전략 삭제")
+    group.add_argument("--clear", action="store_true", help="캐시된 전략 전체 삭제")
+    args = parser.parse_args()
+
+    db_session.initialize()
+    if args.seed:
+        print(f"전략 {seed_from_history()}개 추가")
+    elif args.invalidate:
+        print(f"전략 {strategy_cache_repository.invalidate(business_name=args.invalidate)}개 삭제")
+    else:
+        print(f"전략 {strategy_cache_repository.invalidate()}개 삭제")
+
+
+if __name__ == "__main__":
+    main()
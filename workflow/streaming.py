@@ -0,0 +1,92 @@
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from workflow.state import AgentType, ContentState
+
+
+# 그래프 실행 config의 configurable 에 담기는 토큰 콜백 키
+TOKEN_CALLBACK_KEY = "on_token"
+
+# 토큰 콜백: (에이전트 역할, 토큰 텍스트)
+TokenCallback = Callable[[str, str], None]
+
+
+def get_token_callback(config: Optional[Dict[str, Any]]) -> Optional[TokenCallback]:
+    """그래프 실행 config에서 토큰 콜백 추출 (없으면 None)"""
+    if not config:
+        return None
+    return (config.get("configurable") or {}).get(TOKEN_CALLBACK_KEY)
+
+
+def stream_with_tokens(
+    graph,
+    initial_state: ContentState,
+    configurable: Optional[Dict[str, Any]] = None
+) -> Iterator[Tuple[str, Any]]:
+    """
+    그래프를 백그라운드 스레드에서 실행하며 토큰과 노드 결과를 순서대로 반환
+
+    그래프 노드는 LangGraph 실행기 스레드에서 동작하므로, UI 갱신은 호출한
+    스레드(Streamlit 스크립트 스레드)에서 하도록 이벤트 큐로 전달합니다.
+
+    Args:
+        configurable: 실행 config에 추가할 설정 (예: 응답 캐시 우회)
+
+    Yields:
+        ("token", (역할, 토큰)) 또는 ("update", 노드별 상태 업데이트)
+    """
+    events: queue.Queue = queue.Queue()
+
+    def on_token(role: str, token: str):
+        events.put(("token", (role, token)))
+
+    def worker():
+        try:
+            for chunk in graph.stream(
+                initial_state,
+                config={"configurable": {**(configurable or {}), TOKEN_CALLBACK_KEY: on_token}},
+                stream_mode="updates"
+            ):
+                events.put(("update", chunk))
+        except Exception as e:
+            events.put(("error", e))
+        finally:
+            events.put(("done", None))
+
+    threading.Thread(target=worker, daemon=True).start()
+
+    while True:
+        kind, payload = events.get()
+        if kind == "done":
+            return
+        if kind == "error":
+            raise payload
+        yield kind, payload
+
+
+def without_token_callback(config: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """토큰 콜백을 뺀 config 복사 (화면에 보여줄 필요 없는 중간 응답용)"""
+    if get_token_callback(config) is None:
+        return config
+
+    configurable = dict(config.get("configurable") or {})
+    del configurable[TOKEN_CALLBACK_KEY]
+    return {**config, "configurable": configurable}
+
+
+def with_token_scope(config: Optional[Dict[str, Any]], scope: str) -> Optional[Dict[str, Any]]:
+    """
+    토큰 콜백이 역할 이름에 범위(채널)를 붙여 전달하도록 config 복사
+
+    여러 채널 분기가 같은 역할로 동시에 스트리밍할 때 UI에서 구분하기 위해 사용합니다.
+    """
+    on_token = get_token_callback(config)
+    if on_token is None:
+        return config
+
+    def scoped(role: str, token: str):
+        on_token(AgentType.scoped(role, scope), token)
+
+    configurable = {**(config.get("configurable") or {}), TOKEN_CALLBACK_KEY: scoped}
+    return {**config, "configurable": configurable}